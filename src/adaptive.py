@@ -0,0 +1,54 @@
+from datetime import datetime
+
+def domain_interval(base_interval, changed_at, critical, min_interval, max_interval, recent_window, backoff_factor,
+                    first_seen=None, now=None):
+    """
+    Interval pengecekan satu domain dalam mode adaptif (detik).
+    - Domain kritis atau yang baru berubah status (dalam recent_window) dicek setiap min_interval.
+    - Domain yang stabil makin jarang dicek: 1/backoff_factor dari lamanya status tidak berubah,
+      minimal base_interval dan maksimal max_interval.
+    - changed_at None berarti status belum pernah berubah sejak pertama dicek (first_seen); domain
+      seperti itu dianggap stabil, bukan baru berubah.
+    """
+    now = now or datetime.now()
+    if critical:
+        return min_interval
+    if changed_at is not None:
+        stable_seconds = (now - changed_at).total_seconds()
+        if stable_seconds < recent_window:
+            return min_interval
+    elif first_seen is not None:
+        stable_seconds = (now - first_seen).total_seconds()
+    else:
+        return base_interval
+    return max(base_interval, min(max_interval, stable_seconds / backoff_factor))
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+def select_due_domains(domains, critical_domains, history, base_interval, min_interval, max_interval,
+                       recent_window, backoff_factor, now=None):
+    """
+    Memilih domain yang sudah waktunya dicek dalam mode adaptif berdasarkan kapan
+    terakhir dicek dan kapan terakhir berubah di StatusHistory. Domain yang belum
+    pernah dicek selalu ikut.
+    """
+    now = now or datetime.now()
+    due = []
+    for domain in domains:
+        entry = history.domains.get(domain)
+        if entry is None or not entry.get('checked_at'):
+            due.append(domain)
+            continue
+        interval = domain_interval(
+            base_interval,
+            _parse_time(entry.get('changed_at')),
+            domain in critical_domains,
+            min_interval, max_interval, recent_window, backoff_factor,
+            first_seen=_parse_time(entry.get('first_seen')),
+            now=now,
+        )
+        # Toleransi kecil agar domain tidak terlewat satu putaran karena selisih beberapa detik
+        if (now - datetime.fromisoformat(entry['checked_at'])).total_seconds() >= interval - 60:
+            due.append(domain)
+    return due
@@ -0,0 +1,40 @@
+from config import (
+    WEBSITE_URL, CHROMEDRIVER_PATH, BROWSER_POOL_SIZE, BROWSER_MAX_USES, CHECK_CONCURRENCY,
+    CHROME_LEAN_MODE, CHROME_BLOCKED_URLS,
+    RESULT_ROW_SELECTOR, RESULT_DONE_SELECTOR, RESULT_TIMEOUT_SECONDS,
+    RESULT_SCREENSHOT_SELECTOR, SCREENSHOT_MAX_WIDTH, SCREENSHOT_JPEG_QUALITY,
+    HTTP_CHECK_ENDPOINT, HTTP_CHECK_TIMEOUT_SECONDS,
+)
+from browser_pool import ChromePool
+from checker import SeleniumChecker, FallbackChecker
+from http_checker import HttpChecker
+
+# Dipakai bersama oleh bot (CHECK_MODE=local) dan worker (src/worker.py) agar keduanya mengecek dengan cara yang sama
+
+def build_browser_pool(size=BROWSER_POOL_SIZE):
+    return ChromePool(
+        WEBSITE_URL, CHROMEDRIVER_PATH, size=size, max_uses=BROWSER_MAX_USES,
+        lean=CHROME_LEAN_MODE, extra_blocked_urls=CHROME_BLOCKED_URLS,
+    )
+
+def build_selenium_checker(pool, max_workers=CHECK_CONCURRENCY):
+    """Executor untuk pekerjaan Selenium; maksimal max_workers pengecekan berjalan bersamaan."""
+    return SeleniumChecker(
+        pool,
+        max_workers=max_workers,
+        row_selector=RESULT_ROW_SELECTOR,
+        done_selector=RESULT_DONE_SELECTOR,
+        result_timeout=RESULT_TIMEOUT_SECONDS,
+        screenshot_selector=RESULT_SCREENSHOT_SELECTOR,
+        screenshot_max_width=SCREENSHOT_MAX_WIDTH,
+        screenshot_quality=SCREENSHOT_JPEG_QUALITY,
+    )
+
+def build_checker(backend_name, selenium_checker, max_connections=CHECK_CONCURRENCY):
+    """Memilih backend pengecekan sesuai CHECKER_BACKEND; backend "http" selalu punya cadangan Selenium."""
+    if backend_name == "http":
+        http_checker = HttpChecker(HTTP_CHECK_ENDPOINT, timeout=HTTP_CHECK_TIMEOUT_SECONDS, max_connections=max_connections)
+        return FallbackChecker(http_checker, selenium_checker)
+    if backend_name != "selenium":
+        print(f"CHECKER_BACKEND={backend_name!r} tidak dikenal, memakai selenium.")
+    return selenium_checker
@@ -0,0 +1,158 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from logs import log_message
+
+def chunk_domains(domains, batch_size):
+    """Membagi daftar domain menjadi potongan berisi maksimal batch_size domain."""
+    batch_size = max(1, batch_size)
+    return [domains[i:i + batch_size] for i in range(0, len(domains), batch_size)]
+
+class BatchScheduler:
+    """
+    Penjadwal pusat untuk pengecekan otomatis semua chat.
+    Setiap window_seconds, semua chat yang sudah jatuh tempo dikumpulkan, domain
+    mereka digabung tanpa duplikat lalu dicek dalam submission sesedikit mungkin
+    (maksimal batch_size domain per submission). Hasil per domain kemudian
+    dibagikan kembali ke setiap chat yang memantau domain tersebut.
+    """
+
+    def __init__(self, run_check, load_domains, deliver, deliver_error, on_empty, interval, window_seconds, batch_size,
+                 after_tick=None, jitter_seconds=0, select_domains=None, adaptive_wake_seconds=None):
+        # run_check(domains, label, chat_ids) -> {domain: DomainResult}; load_domains(chat_id) -> list
+        # select_domains(chat_id, domains, interval) -> domain yang jatuh tempo, untuk chat dengan mode adaptif;
+        # chat adaptif dibangunkan setiap adaptive_wake_seconds untuk memilih domain yang perlu dicek
+        # deliver/deliver_error/on_empty(bot, chat_id, username, ...) adalah coroutine pengirim pesan
+        # after_tick() opsional, dipanggil sekali setelah semua hasil satu putaran dikirim
+        self.run_check = run_check
+        self.load_domains = load_domains
+        self.deliver = deliver
+        self.deliver_error = deliver_error
+        self.on_empty = on_empty
+        self.interval = interval
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self.after_tick = after_tick
+        self.jitter_seconds = max(0, jitter_seconds)
+        self.select_domains = select_domains
+        self.adaptive_wake_seconds = adaptive_wake_seconds or interval
+        self.chats = {}
+
+    # --- Pendaftaran chat ---
+
+    def _jitter(self, chat_id, cadence):
+        """
+        Geseran jadwal per chat antara 0 dan jitter_seconds (maksimal satu cadence).
+        Dihitung dari chat_id sehingga tetap sama setiap restart, tetapi chat yang
+        ditambahkan bersamaan tidak jatuh tempo di detik yang sama.
+        """
+        jitter = min(self.jitter_seconds, cadence)
+        if not jitter:
+            return 0
+        return random.Random(chat_id).uniform(0, jitter)
+
+    def _cadence(self, chat):
+        """Seberapa sering chat dibangunkan: interval chat, atau adaptive_wake_seconds dalam mode adaptif."""
+        return self.adaptive_wake_seconds if chat['adaptive'] else chat['interval']
+
+    def add_chat(self, chat_id, username, start_time, interval=None, adaptive=False, now=None):
+        """
+        Mendaftarkan chat; jadwal berikutnya dihitung dari start_time agar tetap sejalan
+        setelah restart. Pengecekan pertama paling cepat satu cadence penuh setelah start_time,
+        ditambah jitter. interval None berarti memakai interval default.
+        """
+        now = now or datetime.now()
+        chat = {'username': username, 'interval': interval or self.interval, 'adaptive': adaptive}
+        cadence = self._cadence(chat)
+        first_due = start_time + timedelta(seconds=cadence + self._jitter(chat_id, cadence))
+        if first_due > now:
+            chat['next_due'] = first_due
+        else:
+            missed = (now - first_due).total_seconds() // cadence + 1
+            chat['next_due'] = first_due + timedelta(seconds=missed * cadence)
+        self.chats[chat_id] = chat
+
+    def remove_chat(self, chat_id):
+        self.chats.pop(chat_id, None)
+
+    def is_active(self, chat_id):
+        return chat_id in self.chats
+
+    def next_due(self, chat_id):
+        chat = self.chats.get(chat_id)
+        return chat['next_due'] if chat else None
+
+    # --- Eksekusi batch ---
+
+    def _collect_due(self, now):
+        """Mengambil chat yang jatuh tempo dan langsung memajukan jadwalnya ke interval berikutnya."""
+        due = []
+        for chat_id, chat in self.chats.items():
+            if chat['next_due'] <= now:
+                while chat['next_due'] <= now:
+                    chat['next_due'] += timedelta(seconds=self._cadence(chat))
+                due.append((chat_id, chat['username'], chat['interval'], chat['adaptive']))
+        return due
+
+    async def tick(self, context):
+        """
+        Callback JobQueue yang dijalankan setiap window_seconds. Putaran dijalankan
+        sebagai task terpisah agar tick berikutnya tetap berjalan tepat waktu walau
+        pengecekan sebelumnya masih menunggu di antrean.
+        """
+        due = self._collect_due(datetime.now())
+        if due:
+            context.application.create_task(self._run_round(context.bot, due))
+
+    async def _run_round(self, bot, due):
+        subscribers = {}
+        for chat_id, username, interval, adaptive in due:
+            domains = self.load_domains(chat_id)
+            if not domains:
+                self.remove_chat(chat_id)
+                await self.on_empty(bot, chat_id, username)
+                continue
+            if adaptive and self.select_domains:
+                # Mode adaptif: hanya domain yang intervalnya sudah lewat yang ikut dicek
+                domains = self.select_domains(chat_id, domains, interval)
+                if not domains:
+                    continue
+            subscribers[chat_id] = (username, domains)
+
+        # Gabungkan domain semua chat tanpa duplikat, urutan kemunculan pertama dipertahankan
+        unique_domains = list(dict.fromkeys(d for _, domains in subscribers.values() for d in domains))
+        if not unique_domains:
+            return
+        batches = chunk_domains(unique_domains, self.batch_size)
+        log_message("scheduler", f"{len(subscribers)} chat jatuh tempo, {len(unique_domains)} domain unik dalam {len(batches)} submission.")
+
+        # Chat mana saja yang menunggu setiap batch, untuk laporan posisi antrean di /status
+        batch_chats = [
+            [chat_id for chat_id, (_, domains) in subscribers.items() if not set(domains).isdisjoint(batch)]
+            for batch in batches
+        ]
+        outcomes = await asyncio.gather(
+            *(self.run_check(batch, f"batch {i + 1}/{len(batches)}", batch_chats[i]) for i, batch in enumerate(batches)),
+            return_exceptions=True,
+        )
+        results = {}
+        errors = {}
+        for batch, outcome in zip(batches, outcomes):
+            for domain in batch:
+                if isinstance(outcome, BaseException):
+                    errors[domain] = outcome
+                else:
+                    results[domain] = outcome.get(domain)
+
+        for chat_id, (username, domains) in subscribers.items():
+            chat_errors = [errors[d] for d in domains if d in errors]
+            try:
+                if chat_errors:
+                    await self.deliver_error(bot, chat_id, username, chat_errors[0])
+                else:
+                    await self.deliver(bot, chat_id, username, {d: results.get(d) for d in domains})
+            except Exception as e:
+                log_message(username, f"ERROR mengirim hasil otomatis ke chat {chat_id}: {e}")
+
+        if self.after_tick:
+            self.after_tick()
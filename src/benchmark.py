@@ -0,0 +1,524 @@
+"""
+Benchmark offline: menjalankan bot (src/main.py) terhadap replika lokal halaman pengecekan
+dan server Bot API tiruan, tanpa menyentuh nawalacheck.skiddle.id maupun api.telegram.org.
+
+    python src/benchmark.py --chats 20 --domains 10 --rounds 5 --result-delay 2
+    python src/benchmark.py --backend http --save hasil.json
+    python src/benchmark.py --baseline hasil.json          # bandingkan dengan hasil sebelumnya
+    python src/benchmark.py --mode webhook                 # update di-POST ke server webhook bot
+
+Setiap putaran, N chat masing-masing mengirim /cek -f dengan M domain secara bersamaan lalu
+menunggu balasan "Hasil pengecekan domain". Yang dilaporkan: pengecekan per menit, latensi
+/cek (p50/p95/p99), puncak RSS bot (dan worker) beserta proses Chrome-nya, dan jumlah sesi Chrome yang dibuat.
+Dengan --auto-seconds, chat juga mendaftarkan domainnya lewat /tambah dan throughput
+pengecekan otomatis diukur selama sekian detik.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from measure_profile import process_tree_rss
+from messages import RESULT_HEADER, CHECK_FAILED_PREFIXES
+
+BENCH_TOKEN = "123456:BENCHMARK"
+
+# --- REPLIKA HALAMAN PENGECEKAN ---
+
+CHECKER_PAGE = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Nawala Check (replika benchmark)</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-top: 1em; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; }
+</style>
+</head>
+<body>
+<h1>Nawala Check</h1>
+<textarea id="domains" rows="10" cols="60"></textarea><br>
+<button onclick="runCheck()">Check Domains</button>
+<table><thead><tr><th>Domain</th><th>Status</th></tr></thead><tbody></tbody></table>
+<script>
+function runCheck() {
+  const domains = document.getElementById('domains').value.split('\\n').map(s => s.trim()).filter(Boolean);
+  fetch('/api/check', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({domains})})
+    .then(r => r.json())
+    .then(data => {
+      const tbody = document.querySelector('table tbody');
+      for (const item of data.results) {
+        const tr = document.createElement('tr');
+        tr.innerHTML = '<td>' + item.domain + '</td><td>' + item.status + '</td>';
+        tbody.appendChild(tr);
+      }
+    });
+}
+</script>
+</body>
+</html>
+"""
+
+def fake_status(domain):
+    """Status tetap per domain (sekitar 1 dari 5 domain diblokir) agar hasil bisa diulang."""
+    return "Blocked" if zlib.crc32(domain.encode()) % 5 == 0 else "Not Blocked"
+
+def make_checker_handler(result_delay, per_domain_delay):
+    class CheckerSiteHandler(BaseHTTPRequestHandler):
+        """Halaman form pengecekan dan endpoint /api/check dengan jeda hasil yang bisa diatur."""
+
+        def do_GET(self):
+            body = CHECKER_PAGE.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != "/api/check":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            domains = json.loads(self.rfile.read(length) or b"{}").get("domains", [])
+            # Jeda meniru situs asli: waktu dasar + per domain, dengan variasi ±20%
+            delay = (result_delay + per_domain_delay * len(domains)) * random.uniform(0.8, 1.2)
+            time.sleep(delay)
+            body = json.dumps({"results": [{"domain": d, "status": fake_status(d)} for d in domains]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CheckerSiteHandler
+
+# --- BOT API TIRUAN ---
+
+class FakeBotApi:
+    """
+    Server Bot API tiruan untuk ApplicationBuilder().base_url(...): update disuntikkan lewat
+    inject_command() lalu diambil bot melalui getUpdates, atau langsung di-POST ke webhook bot
+    (beserta secret token-nya) jika bot sudah memanggil setWebhook. Semua pesan yang dikirim bot dicatat.
+    """
+
+    def __init__(self):
+        self._updates = []
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._cond = threading.Condition()
+        self.polled = threading.Event()
+        self.webhook_set = threading.Event()
+        self.webhook_url = None
+        self.webhook_secret = None
+        self.listeners = []
+        self.sent_count = {}
+
+    def _post_webhook(self, update):
+        request = urllib.request.Request(
+            self.webhook_url,
+            data=json.dumps(update).encode(),
+            headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": self.webhook_secret or ""},
+        )
+        # Server webhook bisa baru saja mulai setelah setWebhook; coba ulang sebentar
+        for attempt in range(20):
+            try:
+                urllib.request.urlopen(request, timeout=10).read()
+                return
+            except urllib.error.URLError:
+                if attempt == 19:
+                    raise
+                time.sleep(0.25)
+
+    def inject_command(self, chat_id, text):
+        command = text.split()[0]
+        with self._cond:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            update = {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "from": {"id": chat_id, "is_bot": False, "first_name": "Bench", "username": f"bench{chat_id}"},
+                    "text": text,
+                    "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+                },
+            }
+            if self.webhook_url is None:
+                self._updates.append(update)
+                self._cond.notify_all()
+                return
+        self._post_webhook(update)
+
+    def _get_updates(self, params):
+        offset = int(params.get("offset") or 0)
+        timeout = min(float(params.get("timeout") or 0), 2.0)
+        self.polled.set()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            # Update dengan id di bawah offset sudah dikonfirmasi bot
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            while not self._updates and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+            return list(self._updates)
+
+    def _message(self, chat_id, **extra):
+        with self._cond:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        message = {"message_id": message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"}}
+        message.update(extra)
+        return message
+
+    def handle(self, api_method, params):
+        self.sent_count[api_method] = self.sent_count.get(api_method, 0) + 1
+        if api_method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if api_method == "getUpdates":
+            return self._get_updates(params)
+        if api_method == "setWebhook":
+            self.webhook_url = params.get("url")
+            self.webhook_secret = params.get("secret_token")
+            self.webhook_set.set()
+            return True
+        chat_id = int(params.get("chat_id") or 0)
+        if api_method == "sendMessage":
+            text = params.get("text", "")
+            for listener in list(self.listeners):
+                listener(chat_id, text)
+            return self._message(chat_id, text=text)
+        if api_method == "sendPhoto":
+            file_id = f"photo{self._next_message_id}"
+            return self._message(chat_id, photo=[{"file_id": file_id, "file_unique_id": file_id, "width": 1, "height": 1}])
+        if api_method == "sendDocument":
+            file_id = f"doc{self._next_message_id}"
+            return self._message(chat_id, document={"file_id": file_id, "file_unique_id": file_id})
+        return True
+
+def make_bot_api_handler(api):
+    class BotApiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            match = re.match(r"^/bot[^/]+/(\w+)", self.path)
+            if not match:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("application/json"):
+                params = json.loads(raw or b"{}")
+            elif content_type.startswith("multipart/form-data"):
+                # Cukup chat_id yang dibutuhkan dari upload foto/dokumen
+                found = re.search(rb'name="chat_id"\r\n\r\n(-?\d+)', raw)
+                params = {"chat_id": found.group(1).decode()} if found else {}
+            else:
+                params = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+            body = json.dumps({"ok": True, "result": api.handle(match.group(1), params)}).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Bot berhenti saat long polling getUpdates masih menunggu
+                pass
+
+        do_GET = do_POST
+
+        def log_message(self, format, *args):
+            pass
+
+    return BotApiHandler
+
+# --- PENGUKURAN ---
+
+def _serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def scrape_metric(metrics_url, name, **labels):
+    """Menjumlahkan nilai satu metrik dari satu endpoint /metrics (0 jika belum ada)."""
+    try:
+        text = urllib.request.urlopen(metrics_url, timeout=5).read().decode()
+    except OSError:
+        return 0
+    total = 0.0
+    for line in text.splitlines():
+        if not line.startswith(name + "{") and not line.startswith(name + " "):
+            continue
+        if all(f'{k}="{v}"' in line for k, v in labels.items()):
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+def scrape_total(metrics_urls, name, **labels):
+    """Menjumlahkan satu metrik dari beberapa proses (bot dan worker)."""
+    return sum(scrape_metric(url, name, **labels) for url in metrics_urls)
+
+class RssSampler(threading.Thread):
+    """
+    Mencatat puncak RSS gabungan beberapa proses (bot dan worker) beserta semua proses
+    turunannya (chromedriver dan Chrome).
+    """
+
+    def __init__(self, pids, interval=0.5):
+        super().__init__(daemon=True)
+        self.pids = list(pids)
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            samples = [process_tree_rss(pid, include_self=True) for pid in self.pids]
+            samples = [rss for rss in samples if rss is not None]
+            if samples:
+                self.peak = max(self.peak or 0, sum(samples))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def percentile(values, pct):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+def run_cek_rounds(api, chat_ids, domains_by_chat, rounds, timeout):
+    """Menjalankan putaran /cek -f bersamaan. Mengembalikan (latensi detik, jumlah gagal, durasi total)."""
+    latencies = []
+    failures = 0
+    pending = {}
+    lock = threading.Lock()
+    done = threading.Condition(lock)
+
+    def on_message(chat_id, text):
+        nonlocal failures
+        with lock:
+            if chat_id not in pending:
+                return
+            if text.startswith(RESULT_HEADER):
+                latencies.append(time.monotonic() - pending.pop(chat_id))
+            elif text.startswith(CHECK_FAILED_PREFIXES):
+                pending.pop(chat_id)
+                failures += 1
+            done.notify_all()
+
+    api.listeners.append(on_message)
+    started = time.monotonic()
+    try:
+        for round_number in range(1, rounds + 1):
+            with lock:
+                for chat_id in chat_ids:
+                    pending[chat_id] = time.monotonic()
+            for chat_id in chat_ids:
+                api.inject_command(chat_id, "/cek -f " + " ".join(domains_by_chat[chat_id]))
+            deadline = time.monotonic() + timeout
+            with lock:
+                while pending and time.monotonic() < deadline:
+                    done.wait(deadline - time.monotonic())
+                if pending:
+                    failures += len(pending)
+                    pending.clear()
+            print(f"  putaran {round_number}/{rounds} selesai ({len(latencies)} berhasil, {failures} gagal)")
+    finally:
+        api.listeners.remove(on_message)
+    return latencies, failures, time.monotonic() - started
+
+def run_benchmark(args):
+    site, site_url = _serve(make_checker_handler(args.result_delay, args.per_domain_delay))
+    api = FakeBotApi()
+    api_server, api_url = _serve(make_bot_api_handler(api))
+    metrics_port = _free_port()
+    metrics_url = f"http://127.0.0.1:{metrics_port}/metrics"
+    data_dir = tempfile.mkdtemp(prefix="nawala_bench_")
+
+    env = dict(os.environ)
+    env.update({
+        "TOKEN": BENCH_TOKEN,
+        "TELEGRAM_API_URL": f"{api_url}/bot",
+        "WEBSITE_URL": site_url,
+        "DATA_FOLDER": data_dir,
+        "METRICS_PORT": str(metrics_port),
+        "CHECKER_BACKEND": args.backend,
+        "PYTHONUNBUFFERED": "1",
+    })
+    if args.mode == "webhook":
+        webhook_port = _free_port()
+        env.update({
+            "BOT_MODE": "webhook",
+            "WEBHOOK_URL": f"http://127.0.0.1:{webhook_port}/telegram",
+            "WEBHOOK_LISTEN": "127.0.0.1",
+            "WEBHOOK_PORT": str(webhook_port),
+        })
+    if args.workers:
+        env["CHECK_MODE"] = "queue"
+    if args.auto_seconds:
+        env.update({
+            "CHECK_INTERVAL_SECONDS": str(args.auto_interval),
+            "BATCH_WINDOW_SECONDS": "5",
+            "SCHEDULE_JITTER_SECONDS": "0",
+        })
+
+    log_path = os.path.join(data_dir, "bot.log")
+    print(f"Replika situs: {site_url} | Bot API tiruan: {api_url} | log bot: {log_path}")
+    main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    with open(log_path, "w") as log_file:
+        bot = subprocess.Popen([sys.executable, main_script], env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    # Mode queue: pengecekan dikerjakan proses worker terpisah yang memakai antrean di DATA_FOLDER yang sama.
+    # Semua sesi Chrome ada di worker, jadi RSS dan metrik browser setiap worker ikut dijumlahkan
+    workers = []
+    worker_metrics_urls = []
+    worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+    for i in range(args.workers):
+        worker_metrics_port = _free_port()
+        worker_metrics_urls.append(f"http://127.0.0.1:{worker_metrics_port}/metrics")
+        with open(os.path.join(data_dir, f"worker{i + 1}.log"), "w") as log_file:
+            workers.append(subprocess.Popen(
+                [sys.executable, worker_script, "--id", f"bench-worker-{i + 1}", "--metrics-port", str(worker_metrics_port)],
+                env=env, stdout=log_file, stderr=subprocess.STDOUT,
+            ))
+    sampler = RssSampler([bot.pid] + [worker.pid for worker in workers])
+    sampler.start()
+    try:
+        ready = api.webhook_set if args.mode == "webhook" else api.polled
+        if not ready.wait(60):
+            raise RuntimeError(f"Bot tidak mulai menerima update ({args.mode}) dalam 60 detik, lihat {log_path}")
+
+        chat_ids = [100000 + i for i in range(args.chats)]
+        domains_by_chat = {
+            chat_id: [f"bench{chat_id}-{j}.example.com" for j in range(args.domains)] for chat_id in chat_ids
+        }
+
+        print(f"/cek: {args.chats} chat x {args.domains} domain, {args.rounds} putaran...")
+        latencies, failures, elapsed = run_cek_rounds(api, chat_ids, domains_by_chat, args.rounds, args.timeout)
+
+        auto = None
+        if args.auto_seconds:
+            print(f"Pengecekan otomatis: /tambah lalu mengukur selama {args.auto_seconds} detik...")
+            before_checks = scrape_metric(metrics_url, "nawala_checks_total", priority="otomatis", result="ok")
+            before_domains = scrape_metric(metrics_url, "nawala_domains_checked_total")
+            for chat_id in chat_ids:
+                api.inject_command(chat_id, "/tambah " + " ".join(domains_by_chat[chat_id]))
+            time.sleep(args.auto_seconds)
+            auto = {
+                "checks": scrape_metric(metrics_url, "nawala_checks_total", priority="otomatis", result="ok") - before_checks,
+                "domains": scrape_metric(metrics_url, "nawala_domains_checked_total") - before_domains,
+                "seconds": args.auto_seconds,
+            }
+
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("save", "baseline")},
+            "cek_completed": len(latencies),
+            "cek_failed": failures,
+            "cek_per_minute": len(latencies) / elapsed * 60 if elapsed else 0,
+            "domains_per_minute": len(latencies) * args.domains / elapsed * 60 if elapsed else 0,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_p99": percentile(latencies, 99),
+            "peak_rss_mb": sampler.peak / 1024 / 1024 if sampler.peak else None,
+            "browser_launches": scrape_total([metrics_url] + worker_metrics_urls, "nawala_browser_launches_total"),
+            "bot_api_calls": dict(api.sent_count),
+            "auto": auto,
+        }
+        return report
+    finally:
+        sampler.stop()
+        for process in [bot] + workers:
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT if os.name != "nt" else signal.SIGTERM)
+        for process in [bot] + workers:
+            try:
+                process.wait(30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        site.shutdown()
+        api_server.shutdown()
+
+def _fmt(value, unit="", digits=2):
+    return "-" if value is None else f"{value:.{digits}f}{unit}"
+
+def print_report(report, baseline=None):
+    rows = [
+        ("/cek berhasil", "cek_completed", "", 0),
+        ("/cek gagal", "cek_failed", "", 0),
+        ("/cek per menit", "cek_per_minute", "", 1),
+        ("domain per menit", "domains_per_minute", "", 1),
+        ("latensi p50", "latency_p50", " dtk", 2),
+        ("latensi p95", "latency_p95", " dtk", 2),
+        ("latensi p99", "latency_p99", " dtk", 2),
+        ("puncak RSS", "peak_rss_mb", " MB", 0),
+        ("sesi Chrome dibuat", "browser_launches", "", 0),
+    ]
+    print("\nHasil benchmark:")
+    for label, key, unit, digits in rows:
+        line = f"  {label:20} {_fmt(report.get(key), unit, digits):>12}"
+        if baseline and baseline.get(key) not in (None, 0) and report.get(key) is not None:
+            change = (report[key] - baseline[key]) / baseline[key] * 100
+            line += f"   (baseline {_fmt(baseline[key], unit, digits)}, {change:+.1f}%)"
+        print(line)
+    if report.get("auto"):
+        auto = report["auto"]
+        print(f"  {'otomatis':20} {auto['checks']:.0f} pengecekan / {auto['domains']:.0f} domain "
+              f"dalam {auto['seconds']} dtk ({auto['domains'] / auto['seconds'] * 60:.1f} domain/menit)")
+    print(f"  {'panggilan Bot API':20} {report['bot_api_calls']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline bot Nawala.")
+    parser.add_argument("--chats", type=int, default=10, help="Jumlah chat yang disimulasikan (N)")
+    parser.add_argument("--domains", type=int, default=5, help="Jumlah domain per chat (M)")
+    parser.add_argument("--rounds", type=int, default=3, help="Jumlah putaran /cek bersamaan")
+    parser.add_argument("--backend", choices=("selenium", "http"), default="selenium", help="CHECKER_BACKEND untuk bot")
+    parser.add_argument("--mode", choices=("polling", "webhook"), default="polling", help="BOT_MODE untuk bot")
+    parser.add_argument("--workers", type=int, default=0, help="Jalankan bot dengan CHECK_MODE=queue dan sekian worker (0 = lokal)")
+    parser.add_argument("--result-delay", type=float, default=1.0, help="Jeda dasar hasil di replika situs (detik)")
+    parser.add_argument("--per-domain-delay", type=float, default=0.05, help="Jeda tambahan per domain (detik)")
+    parser.add_argument("--timeout", type=float, default=300, help="Batas menunggu satu putaran /cek (detik)")
+    parser.add_argument("--auto-seconds", type=int, default=0, help="Lama mengukur pengecekan otomatis (0 = dilewati)")
+    parser.add_argument("--auto-interval", type=int, default=30, help="CHECK_INTERVAL_SECONDS selama pengukuran otomatis")
+    parser.add_argument("--save", help="Simpan hasil ke file JSON untuk dijadikan baseline")
+    parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {args.save}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from logs import log_message
+from metrics import metrics
+
+# Request yang tidak dibutuhkan untuk membaca hasil: gambar, font, CSS, serta analitik/iklan pihak ketiga.
+# Pola memakai wildcard Network.setBlockedURLs milik Chrome DevTools Protocol.
+THIRD_PARTY_BLOCKED_URLS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*", "*cloudflareinsights.com*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+ASSET_BLOCKED_URLS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.css*",
+]
+# Flag tambahan mode ringan: tanpa ekstensi/layanan latar belakang dan lebih hemat memori
+LEAN_CHROME_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-dev-shm-usage",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,site-per-process",
+    "--renderer-process-limit=1",
+    "--js-flags=--max-old-space-size=256",
+]
+
+def build_chrome_options(lean=False):
+    """Opsi Chrome headless yang dipakai untuk semua sesi pengecekan."""
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    chrome_options.add_argument("--log-level=3")
+    if lean:
+        for argument in LEAN_CHROME_ARGUMENTS:
+            chrome_options.add_argument(argument)
+    return chrome_options
+
+def lean_blocked_urls(extra_patterns=()):
+    """Pola URL yang diblokir saat pengecekan biasa (tanpa screenshot)."""
+    return ASSET_BLOCKED_URLS + THIRD_PARTY_BLOCKED_URLS + list(extra_patterns)
+
+def screenshot_blocked_urls(extra_patterns=()):
+    """Saat screenshot, CSS/gambar/font tetap dimuat agar tampilan hasil utuh; hanya pihak ketiga yang diblokir."""
+    return THIRD_PARTY_BLOCKED_URLS + list(extra_patterns)
+
+def apply_blocked_urls(driver, patterns):
+    """Memasang daftar blokir lewat CDP; berlaku untuk request berikutnya di sesi tersebut."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+class BrowserSession:
+    """Satu instance Chrome di dalam pool beserta jumlah pemakaiannya."""
+
+    def __init__(self, driver, session_id):
+        self.driver = driver
+        self.session_id = session_id
+        self.uses = 0
+        self.broken = False
+        # True jika halaman sedang dimuat lengkap (untuk screenshot) walau pool dalam mode ringan
+        self.full_page = False
+
+class ChromePool:
+    """
+    Pool sesi Chrome headless yang sudah membuka halaman pengecekan.
+    Sesi dipinjam dengan acquire() dan dikembalikan dengan release(); sesi yang
+    rusak atau sudah dipakai BROWSER_MAX_USES kali ditutup dan diganti yang baru.
+    Halaman sesi yang dikembalikan dimuat ulang di thread latar, sehingga release()
+    tidak menahan hasil pengecekan. Semua method aman dipanggil dari banyak thread.
+    """
+
+    def __init__(self, url, driver_path, size=2, max_uses=50, lean=False, extra_blocked_urls=()):
+        self.url = url
+        self.driver_path = driver_path
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        # Mode ringan: aset dan request pihak ketiga diblokir, kecuali saat screenshot
+        self.lean = lean
+        self.extra_blocked_urls = list(extra_blocked_urls)
+        self._idle = []
+        self._total = 0
+        self._counter = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._resetter = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="pool-reset")
+
+    # --- Siklus hidup sesi ---
+
+    def _create_session(self):
+        chrome_service = Service(executable_path=self.driver_path, service_log_path=os.devnull)
+        with metrics.span("driver_start"):
+            driver = webdriver.Chrome(service=chrome_service, options=build_chrome_options(self.lean))
+        metrics.inc("nawala_browser_launches_total")
+        try:
+            if self.lean:
+                apply_blocked_urls(driver, lean_blocked_urls(self.extra_blocked_urls))
+            with metrics.span("page_load"):
+                driver.get(self.url)
+        except Exception:
+            driver.quit()
+            raise
+        with self._cond:
+            self._counter += 1
+            session_id = self._counter
+        log_message("Pool", f"Sesi Chrome #{session_id} siap di {self.url}")
+        return BrowserSession(driver, session_id)
+
+    def _destroy_session(self, session, reason):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            log_message("Pool", f"Gagal menutup sesi #{session.session_id}: {e}")
+        log_message("Pool", f"Sesi Chrome #{session.session_id} ditutup ({reason}).")
+
+    def _discard(self, session, reason):
+        """Menutup sesi dan membebaskan tempatnya di pool."""
+        self._destroy_session(session, reason)
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, session):
+        """Memastikan browser masih hidup dan masih berada di halaman pengecekan."""
+        try:
+            ready = session.driver.execute_script("return document.readyState")
+            return ready == "complete" and session.driver.current_url.startswith(self.url)
+        except WebDriverException:
+            return False
+
+    def _reset(self, session):
+        """Memuat ulang halaman agar form kosong untuk pengecekan berikutnya."""
+        if self.lean and session.full_page:
+            apply_blocked_urls(session.driver, lean_blocked_urls(self.extra_blocked_urls))
+            session.full_page = False
+        with metrics.span("page_load"):
+            session.driver.get(self.url)
+
+    def prepare_for_screenshot(self, session):
+        """
+        Dalam mode ringan halaman dimuat tanpa CSS/gambar/font; sebelum screenshot
+        halaman dimuat ulang lengkap agar gambar hasil tetap sama seperti di browser biasa.
+        Saat sesi dikembalikan, daftar blokir mode ringan dipasang lagi.
+        """
+        if not self.lean or session.full_page:
+            return
+        apply_blocked_urls(session.driver, screenshot_blocked_urls(self.extra_blocked_urls))
+        session.full_page = True
+        session.driver.get(self.url)
+
+    # --- API publik ---
+
+    @property
+    def active(self):
+        """Jumlah sesi Chrome yang sedang hidup (menganggur maupun dipakai)."""
+        return self._total
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def start(self):
+        """Menyiapkan semua sesi di awal agar pengecekan pertama tidak menunggu Chrome start."""
+        sessions = []
+        for _ in range(self.size):
+            try:
+                sessions.append(self.acquire())
+            except WebDriverException as e:
+                log_message("Pool", f"Gagal menyiapkan sesi Chrome: {e}")
+                break
+        for session in sessions:
+            self.release(session)
+
+    def acquire(self, timeout=None):
+        """
+        Meminjam sesi dari pool. Jika belum ada sesi menganggur dan pool belum
+        penuh, sesi baru dibuat; jika penuh, tunggu sampai ada yang dikembalikan.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool Chrome sudah ditutup.")
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    session = None
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("Tidak ada sesi Chrome yang tersedia.")
+
+        if session is not None:
+            if self._is_healthy(session):
+                session.uses += 1
+                return session
+            self._destroy_session(session, "gagal health check")
+
+        try:
+            session = self._create_session()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        session.uses += 1
+        return session
+
+    def release(self, session, broken=False):
+        """
+        Mengembalikan sesi ke pool, atau menutupnya jika rusak/sudah terlalu sering dipakai.
+        Tidak menunggu halaman dimuat ulang; sesi baru bisa dipinjam lagi setelah reload selesai.
+        """
+        reason = None
+        if broken or session.broken:
+            reason = "crash saat pengecekan"
+        elif session.uses >= self.max_uses:
+            reason = f"sudah dipakai {session.uses} kali"
+        elif self._closed:
+            reason = "pool ditutup"
+        if reason:
+            self._discard(session, reason)
+            return
+        try:
+            self._resetter.submit(self._reset_and_return, session)
+        except RuntimeError:
+            # Executor sudah dihentikan oleh shutdown()
+            self._discard(session, "pool ditutup")
+
+    def _reset_and_return(self, session):
+        """Dijalankan di thread latar: memuat ulang halaman lalu menaruh sesi kembali sebagai menganggur."""
+        try:
+            self._reset(session)
+        except Exception as e:
+            self._discard(session, f"gagal memuat ulang halaman: {type(e).__name__}")
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append(session)
+                self._cond.notify()
+                return
+        self._discard(session, "pool ditutup")
+
+    def shutdown(self):
+        """
+        Menutup semua sesi yang menganggur dan menunggu reload yang masih berjalan.
+        Sesi yang sedang dipakai ditutup saat release().
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            self._destroy_session(session, "pool ditutup")
+        self._resetter.shutdown(wait=True)
@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from logs import log_message
+from metrics import metrics
+
+# Prioritas: angka lebih kecil dijalankan lebih dulu
+PRIORITY_MANUAL = 0
+PRIORITY_AUTOMATIC = 1
+
+class CheckJob:
+    """Satu permintaan pengecekan yang menunggu giliran di antrean."""
+
+    def __init__(self, priority, seq, domains, label, screenshot, chat_ids, future):
+        self.priority = priority
+        self.seq = seq
+        self.domains = domains
+        self.label = label
+        self.screenshot = screenshot
+        self.chat_ids = set(chat_ids)
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class CheckQueue:
+    """
+    Antrean pusat untuk semua pengecekan (manual maupun otomatis).
+    Sejumlah worker tetap mengambil pekerjaan berdasarkan prioritas lalu urutan
+    masuk, sehingga /cek selalu didahulukan dari pengecekan otomatis yang masih
+    antre dan jumlah pengecekan bersamaan tidak pernah melebihi jumlah worker.
+    """
+
+    def __init__(self, run_check, workers, initial_duration=30.0):
+        # run_check(domains, label, screenshot, priority) -> coroutine hasil pengecekan
+        self.run_check = run_check
+        self.workers = max(1, workers)
+        self._pending = []
+        self._running = {}
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._tasks = []
+        # Rata-rata bergerak durasi satu pengecekan, untuk memperkirakan waktu mulai
+        self._avg_duration = initial_duration
+
+    def start(self):
+        """Membuat task worker; harus dipanggil dari dalam event loop yang berjalan."""
+        self._wakeup = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(i + 1)) for i in range(self.workers)]
+
+    async def stop(self, drain_timeout=0):
+        """
+        Menghentikan worker. Jika drain_timeout diisi, pengecekan yang sedang berjalan
+        dan yang masih antre ditunggu selesai lebih dulu (maksimal drain_timeout detik);
+        sisanya dibatalkan.
+        """
+        if drain_timeout > 0 and (self._pending or self._running):
+            log_message("antrean", f"Menunggu {len(self._running)} pengecekan berjalan dan {len(self._pending)} antre selesai "
+                                   f"(maksimal {drain_timeout} detik)...")
+            deadline = time.monotonic() + drain_timeout
+            while (self._pending or self._running) and time.monotonic() < deadline:
+                await asyncio.sleep(0.5)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._pending:
+            if not job.future.done():
+                job.future.cancel()
+        self._pending = []
+
+    async def submit(self, domains, label, priority=PRIORITY_AUTOMATIC, screenshot=False, chat_ids=()):
+        """Memasukkan pengecekan ke antrean dan menunggu hasilnya."""
+        future = asyncio.get_running_loop().create_future()
+        job = CheckJob(priority, next(self._seq), list(domains), label, screenshot, chat_ids, future)
+        async with self._wakeup:
+            heapq.heappush(self._pending, job)
+            self._wakeup.notify()
+        log_message(label, f"Masuk antrean (prioritas {'manual' if priority == PRIORITY_MANUAL else 'otomatis'}, "
+                           f"{len(self._pending)} menunggu, {len(self._running)} berjalan).")
+        return await future
+
+    async def submit_sharded(self, domains, label, priority=PRIORITY_AUTOMATIC, shard_size=25, retries=1,
+                             screenshot=False, chat_ids=()):
+        """
+        Memecah daftar besar menjadi shard berisi maksimal shard_size domain yang
+        dijalankan paralel oleh worker antrean (masing-masing di sesi Chrome sendiri).
+        Shard yang gagal dicoba ulang hingga retries kali tanpa mengulang shard lain.
+        Mengembalikan ({domain: DomainResult} sesuai urutan input, [screenshot per shard],
+        {domain: exception} untuk domain yang shard-nya tetap gagal).
+        """
+        shard_size = max(1, shard_size)
+        shards = [domains[i:i + shard_size] for i in range(0, len(domains), shard_size)]
+        if len(shards) > 1:
+            log_message(label, f"{len(domains)} domain dibagi menjadi {len(shards)} shard @ maksimal {shard_size} domain.")
+
+        async def run_shard(index, shard):
+            shard_label = label if len(shards) == 1 else f"{label} shard {index}/{len(shards)}"
+            for attempt in range(retries + 1):
+                try:
+                    return await self.submit(shard, shard_label, priority, screenshot=screenshot, chat_ids=chat_ids)
+                except Exception as e:
+                    # Exception dengan retryable=False (misalnya circuit breaker terbuka) tidak dicoba ulang
+                    if attempt == retries or not getattr(e, "retryable", True):
+                        raise
+                    log_message(shard_label, f"Shard gagal ({type(e).__name__}: {e}), mencoba ulang ({attempt + 1}/{retries})...")
+
+        outcomes = await asyncio.gather(
+            *(run_shard(i + 1, shard) for i, shard in enumerate(shards)), return_exceptions=True
+        )
+        merged = {}
+        shots = []
+        errors = {}
+        for shard, outcome in zip(shards, outcomes):
+            if isinstance(outcome, BaseException):
+                errors.update((domain, outcome) for domain in shard)
+                continue
+            shard_results, shot = outcome
+            merged.update(shard_results)
+            if shot:
+                shots.append(shot)
+        ordered = {domain: merged[domain] for domain in domains if domain in merged}
+        return ordered, shots, errors
+
+    async def _worker(self, worker_id):
+        while True:
+            async with self._wakeup:
+                while not self._pending:
+                    await self._wakeup.wait()
+                job = heapq.heappop(self._pending)
+            if job.future.cancelled():
+                continue
+            self._running[id(job)] = (job, time.monotonic())
+            started = time.monotonic()
+            kind = "manual" if job.priority == PRIORITY_MANUAL else "otomatis"
+            metrics.observe("nawala_stage_seconds", started - job.enqueued_at, stage="queue_wait", priority=kind)
+            try:
+                with metrics.span("check", priority=kind):
+                    result = await self.run_check(job.domains, job.label, job.screenshot, job.priority)
+                metrics.inc("nawala_checks_total", priority=kind, result="ok")
+                metrics.inc("nawala_domains_checked_total", len(job.domains))
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                metrics.inc("nawala_checks_total", priority=kind, result="error")
+                metrics.inc("nawala_check_failures_total", exception=type(e).__name__)
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._running.pop(id(job), None)
+                duration = time.monotonic() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+    # --- Informasi antrean untuk /status ---
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    @property
+    def running(self):
+        return len(self._running)
+
+    def position(self, chat_id):
+        """
+        Mengembalikan ("berjalan", 0, 0) jika pengecekan chat sedang berjalan,
+        ("antre", posisi, perkiraan_detik_sampai_mulai) jika masih antre, atau None.
+        """
+        if any(chat_id in job.chat_ids for job, _ in self._running.values()):
+            return ("berjalan", 0, 0)
+        ordered = sorted(self._pending)
+        for index, job in enumerate(ordered):
+            if chat_id in job.chat_ids:
+                free_slots = self.workers - len(self._running)
+                if index < free_slots:
+                    eta = 0
+                else:
+                    eta = math.ceil((index - free_slots + 1) / self.workers) * self._avg_duration
+                return ("antre", index + 1, eta)
+        return None
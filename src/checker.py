@@ -0,0 +1,209 @@
+import abc
+import asyncio
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from logs import log_message
+from metrics import metrics
+from results import DomainResult
+from domains import normalize_domain
+from screenshot import capture_element_png, compress_png
+
+class results_ready:
+    """
+    Kondisi WebDriverWait: terpenuhi saat jumlah baris hasil sudah sama dengan
+    jumlah domain yang dikirim, atau saat elemen penanda "selesai" muncul.
+    Menghitung baris lewat satu execute_script agar polling tetap ringan.
+    """
+
+    def __init__(self, expected_count, row_selector, done_selector=None):
+        self.expected_count = expected_count
+        self.row_selector = row_selector
+        self.done_selector = done_selector
+
+    def __call__(self, driver):
+        rows = driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length;", self.row_selector
+        )
+        if rows >= self.expected_count:
+            return rows
+        if self.done_selector and driver.find_elements(By.CSS_SELECTOR, self.done_selector):
+            return rows
+        return False
+
+def extract_results(driver, row_selector, domain_names_list):
+    """
+    Membaca teks setiap baris hasil dan mencocokkannya dengan domain yang dikirim.
+    Mengembalikan {domain: DomainResult}; domain yang tidak ditemukan punya status None.
+    """
+    rows = driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0])).map("
+        "r => Array.from(r.children).map(c => c.innerText.trim()));",
+        row_selector,
+    )
+    # Baris dicocokkan lewat sel yang isinya persis nama domain (setelah dirapikan), bukan substring,
+    # agar "bc.com" tidak mengambil baris milik "abc.com"
+    wanted = {normalize_domain(domain) or domain.lower(): domain for domain in domain_names_list}
+    statuses = {domain: None for domain in domain_names_list}
+    for cells in rows:
+        for index, cell in enumerate(cells):
+            domain = wanted.get(normalize_domain(cell) or cell.lower())
+            if domain is not None and statuses[domain] is None:
+                # Sel selain nama domain dianggap sebagai status
+                status_cells = [c for i, c in enumerate(cells) if c and i != index]
+                statuses[domain] = " ".join(status_cells) or " ".join(cells)
+                break
+    checked_at = datetime.now()
+    return {domain: DomainResult.from_status(domain, status, checked_at) for domain, status in statuses.items()}
+
+class CheckerBackend(abc.ABC):
+    """
+    Antarmuka backend pengecekan. Setiap backend mengimplementasikan check() yang
+    mengembalikan ({domain: DomainResult}, Screenshot atau None). priority hanya dipakai
+    backend yang meneruskan pekerjaan ke antrean lain (QueueChecker).
+    """
+
+    name = "base"
+    # False jika backend tidak bisa membuat screenshot halaman hasil
+    supports_screenshot = False
+
+    @abc.abstractmethod
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        """Mengecek domain_names_list; backend yang belum mengimplementasikannya gagal saat dibuat."""
+
+    async def aclose(self):
+        """Membersihkan resource backend saat bot berhenti."""
+
+class FallbackChecker(CheckerBackend):
+    """
+    Mencoba backend utama lebih dulu dan beralih ke backend cadangan jika gagal
+    atau jika screenshot diminta tetapi backend utama tidak mendukungnya.
+    """
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+        self.supports_screenshot = fallback.supports_screenshot
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        if screenshot and not self.primary.supports_screenshot:
+            return await self.fallback.check(domain_names_list, username, screenshot=screenshot, priority=priority)
+        try:
+            return await self.primary.check(domain_names_list, username, screenshot=screenshot, priority=priority)
+        except Exception as e:
+            metrics.inc("nawala_backend_fallbacks_total", backend=self.primary.name, exception=type(e).__name__)
+            log_message(username, f"Backend {self.primary.name} gagal ({type(e).__name__}: {e}), beralih ke {self.fallback.name}.")
+            return await self.fallback.check(domain_names_list, username, screenshot=screenshot, priority=priority)
+
+    async def aclose(self):
+        await self.primary.aclose()
+        await self.fallback.aclose()
+
+class SeleniumChecker(CheckerBackend):
+    """
+    Menjalankan pengecekan Nawala di sesi Chrome dari pool.
+    Semua pemanggilan Selenium bersifat blocking, jadi dijalankan di thread
+    executor terpisah; jumlah worker executor menjadi batas pengecekan bersamaan.
+    """
+
+    name = "selenium"
+    supports_screenshot = True
+
+    def __init__(self, pool, max_workers, row_selector, done_selector=None, result_timeout=60,
+                 screenshot_selector=None, screenshot_max_width=0, screenshot_quality=0):
+        self.pool = pool
+        self.row_selector = row_selector
+        self.done_selector = done_selector
+        self.result_timeout = result_timeout
+        self.screenshot_selector = screenshot_selector
+        self.screenshot_max_width = screenshot_max_width
+        self.screenshot_quality = screenshot_quality
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="cek")
+
+    def _check_sync(self, domain_names_list, username, screenshot):
+        """
+        Bagian blocking: isi form, klik, tunggu hasil, baca hasil per domain dan
+        (opsional) ambil screenshot ke memori. Mengembalikan (hasil, Screenshot atau None).
+        """
+        log_message(username, "Mengambil sesi Chrome dari pool...")
+        with metrics.span("pool_acquire"):
+            session = self.pool.acquire()
+        broken = False
+        try:
+            driver = session.driver
+            log_message(username, f"Memakai sesi Chrome #{session.session_id} (pemakaian ke-{session.uses}) di {self.pool.url}")
+            if screenshot:
+                with metrics.span("page_load_full"):
+                    self.pool.prepare_for_screenshot(session)
+
+            wait = WebDriverWait(driver, 20)
+
+            with metrics.span("form_fill"):
+                log_message(username, "Menunggu kolom input siap...")
+                input_field = wait.until(EC.presence_of_element_located((By.ID, "domains")))
+                input_field.send_keys("\n".join(domain_names_list))
+
+                log_message(username, "Menunggu tombol 'Check Domains' siap...")
+                check_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Check Domains')]")))
+
+                log_message(username, "Mengklik tombol...")
+                check_button.click()
+
+            with metrics.span("wait_results"):
+                self._wait_for_results(driver, domain_names_list, username)
+            with metrics.span("extract_results"):
+                results = extract_results(driver, self.row_selector, domain_names_list)
+            if not any(result.found for result in results.values()):
+                # Halaman tanpa satu pun hasil berarti pengecekan gagal (termasuk bagi circuit breaker),
+                # bukan "semua domain tidak ditemukan"
+                raise TimeoutException(f"Halaman hasil tidak memuat satu pun dari {len(domain_names_list)} domain yang dicek.")
+
+            if not screenshot:
+                return results, None
+
+            # Screenshot langsung ke memori (tanpa file sementara), hanya bagian hasil
+            log_message(username, "Mengambil screenshot...")
+            with metrics.span("screenshot"):
+                png_bytes = capture_element_png(driver, self.screenshot_selector)
+                shot = compress_png(png_bytes, self.screenshot_max_width, self.screenshot_quality)
+            log_message(username, f"Screenshot {len(png_bytes) // 1024} KB -> {len(shot.data) // 1024} KB ({shot.filename}).")
+            return results, shot
+        except (TimeoutException, NoSuchElementException):
+            # Halaman lambat/berubah, browser sendiri masih sehat
+            raise
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            with metrics.span("pool_release"):
+                self.pool.release(session, broken=broken)
+            log_message(username, "Sesi Chrome dikembalikan ke pool.")
+
+    def _wait_for_results(self, driver, domain_names_list, username):
+        """Menunggu sampai setiap domain punya baris hasil, maksimal result_timeout detik."""
+        expected = len(set(domain_names_list))
+        log_message(username, f"Menunggu {expected} baris hasil (maksimal {self.result_timeout} detik)...")
+        started = time.monotonic()
+        try:
+            rows = WebDriverWait(driver, self.result_timeout, poll_frequency=0.5).until(
+                results_ready(expected, self.row_selector, self.done_selector)
+            )
+            log_message(username, f"Hasil siap dalam {time.monotonic() - started:.1f} detik ({rows}/{expected} baris).")
+        except TimeoutException:
+            # Tetap pakai hasil yang sudah ada daripada gagal total; gagal jika tidak ada satu pun
+            log_message(username, f"Hasil belum lengkap setelah {time.monotonic() - started:.1f} detik, memakai hasil yang ada.")
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        """Versi async: event loop hanya menunggu hasil dari executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self._check_sync, domain_names_list, username, screenshot))
+
+    async def aclose(self):
+        """Menunggu pengecekan yang masih berjalan lalu menutup executor."""
+        await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
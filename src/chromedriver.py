@@ -1,87 +1,278 @@
-import os
-import sys
-import requests
-import zipfile
+"""
+Menyiapkan chromedriver yang cocok dengan Google Chrome/Chromium yang terpasang (Windows, Linux, macOS).
+
+Jika chromedriver yang tersimpan sudah cocok dengan versi utama Chrome, skrip selesai tanpa akses
+internet sama sekali. Jika belum, daftar versi per milestone diambil (dengan cache ETag /
+If-Modified-Since), arsip driver diunduh, diverifikasi, lalu dipasang di CHROMEDRIVER_PATH.
+
+    python src/chromedriver.py [--force] [--chrome /jalur/ke/chrome]
+"""
+import argparse
+import base64
+import binascii
+import hashlib
 import io
+import json
+import os
+import platform
+import plistlib
+import re
 import shutil
 import subprocess
+import sys
+import tempfile
+import zipfile
+import requests
+from config import CHROMEDRIVER_PATH, CHROMEDRIVER_MANIFEST_URL
+
+# Tentukan lokasi penyimpanan chromedriver beserta catatan versinya dan cache daftar versi
+SAVE_PATH = CHROMEDRIVER_PATH
+STATE_PATH = SAVE_PATH + ".json"
+MANIFEST_CACHE_PATH = os.path.join(os.path.dirname(SAVE_PATH), "chromedriver-manifest.json")
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+# Lokasi umum Chrome/Chromium di Linux (dicari lewat PATH)
+LINUX_CHROME_COMMANDS = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+MAC_CHROME_APPS = ("Google Chrome.app", "Chromium.app")
 
-# Tentukan lokasi penyimpanan untuk chromedriver.exe
-SAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.exe')
+class DriverError(Exception):
+    """chromedriver tidak bisa disiapkan (versi tidak ditemukan, unduhan rusak, dll)."""
 
-def find_chrome_version():
-    """Mencari versi Google Chrome yang terinstal di Windows."""
+def platform_name():
+    """Nama platform Chrome for Testing untuk mesin ini."""
+    machine = platform.machine().lower()
+    if sys.platform.startswith("win"):
+        return "win64" if machine.endswith("64") else "win32"
+    if sys.platform == "darwin":
+        return "mac-arm64" if machine in ("arm64", "aarch64") else "mac-x64"
+    if machine not in ("x86_64", "amd64"):
+        print(f"Peringatan: Chrome for Testing hanya menyediakan linux64, mesin ini {machine}.")
+    return "linux64"
+
+def _version_from_output(output):
+    match = VERSION_PATTERN.search(output or "")
+    return match.group(0) if match else None
+
+def _run_version(command):
     try:
-        # Perintah untuk mendapatkan versi Chrome dari registry
-        output = subprocess.check_output(
-            'reg query "HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon" /v version',
-            shell=True,
-            text=True
-        )
-        version_line = [line for line in output.split('\n') if 'REG_SZ' in line]
-        if version_line:
-            full_version = version_line[0].split('REG_SZ')[-1].strip()
-            return full_version
-    except Exception as e:
-        print(f"Gagal menemukan versi Chrome: {e}")
+        output = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return _version_from_output(output)
+
+def _windows_chrome_version():
+    import winreg
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+def _mac_chrome_version():
+    for folder in ("/Applications", os.path.expanduser("~/Applications")):
+        for app in MAC_CHROME_APPS:
+            # Info.plist dibaca langsung agar Chrome tidak perlu dijalankan
+            try:
+                with open(os.path.join(folder, app, "Contents", "Info.plist"), "rb") as f:
+                    return plistlib.load(f).get("CFBundleShortVersionString")
+            except (OSError, plistlib.InvalidFileException):
+                continue
+    return None
+
+def find_chrome_version(chrome_binary=None):
+    """Mencari versi Google Chrome/Chromium yang terinstal, misalnya "126.0.6478.126"."""
+    if chrome_binary:
+        return _run_version(chrome_binary)
+    if sys.platform.startswith("win"):
+        return _windows_chrome_version()
+    if sys.platform == "darwin":
+        return _mac_chrome_version()
+    for command in LINUX_CHROME_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            version = _run_version(path)
+            if version:
+                return version
     return None
 
-def download_and_extract_chromedriver(chrome_version):
+def major_version(version):
+    return version.split(".")[0]
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def installed_driver_matches(chrome_version, platform_key):
     """
-    Mengunduh chromedriver.exe yang sesuai dengan versi Chrome dan 
-    menyimpannya di folder yang sama.
+    True jika chromedriver tersimpan cocok dengan versi utama Chrome dan isinya tidak berubah
+    sejak dipasang. Tidak ada akses jaringan maupun menjalankan driver.
     """
-    print("Mencari URL chromedriver yang cocok...")
-    
-    major_version = chrome_version.split('.')[0]
-    
+    state = _read_json(STATE_PATH)
+    if not state or not os.path.exists(SAVE_PATH):
+        return False
+    return (
+        state.get("platform") == platform_key
+        and major_version(state.get("driver_version", "")) == major_version(chrome_version)
+        and state.get("sha256") == _file_sha256(SAVE_PATH)
+    )
+
+def fetch_manifest(session, url=CHROMEDRIVER_MANIFEST_URL):
+    """
+    Mengambil daftar versi per milestone. Permintaan dikirim dengan ETag/Last-Modified dari cache
+    sehingga server cukup menjawab 304 jika tidak ada yang berubah. Jika jaringan gagal, cache dipakai.
+    """
+    cache = _read_json(MANIFEST_CACHE_PATH)
+    headers = {}
+    if cache and cache.get("url") == url:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+    else:
+        cache = None
+
+    try:
+        response = session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304 and cache:
+            print("Daftar versi chromedriver tidak berubah (304), memakai cache.")
+            return cache["manifest"]
+        response.raise_for_status()
+        manifest = response.json()
+    except (requests.RequestException, ValueError) as e:
+        if cache:
+            print(f"Gagal mengambil daftar versi ({e}), memakai cache.")
+            return cache["manifest"]
+        raise DriverError(f"Gagal mengambil daftar versi chromedriver: {e}") from e
+
+    _write_json(MANIFEST_CACHE_PATH, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "manifest": manifest,
+    })
+    return manifest
+
+def find_download(manifest, chrome_version, platform_key):
+    """Mengembalikan (versi driver, URL arsip) untuk versi utama Chrome dan platform ini."""
+    milestone = manifest.get("milestones", {}).get(major_version(chrome_version))
+    if not milestone:
+        raise DriverError(f"Tidak ada chromedriver untuk Chrome versi {major_version(chrome_version)}.")
+    for download in milestone.get("downloads", {}).get("chromedriver", []):
+        if download.get("platform") == platform_key:
+            return milestone["version"], download["url"]
+    raise DriverError(f"Tidak ada chromedriver {milestone['version']} untuk platform {platform_key}.")
+
+def _verify_archive(response, data):
+    """Memastikan arsip utuh: ukuran sesuai Content-Length, MD5 sesuai x-goog-hash, dan CRC zip benar."""
+    expected_length = response.headers.get("Content-Length")
+    # Content-Length hanya bisa dibandingkan jika arsip tidak dikirim terkompresi (gzip)
+    if expected_length and not response.headers.get("Content-Encoding") and int(expected_length) != len(data):
+        raise DriverError(f"Unduhan tidak lengkap ({len(data)} dari {expected_length} byte).")
+    # Google Cloud Storage mengirim MD5 arsip di header x-goog-hash: crc32c=...,md5=...
+    for part in response.headers.get("x-goog-hash", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name != "md5":
+            continue
+        try:
+            expected_md5 = base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise DriverError(f"Header x-goog-hash tidak valid: {e}") from e
+        if expected_md5 != hashlib.md5(data).digest():
+            raise DriverError("MD5 arsip chromedriver tidak cocok.")
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        broken = archive.testzip()
+    except zipfile.BadZipFile as e:
+        raise DriverError(f"Arsip chromedriver rusak: {e}") from e
+    if broken:
+        raise DriverError(f"Arsip chromedriver rusak pada {broken}.")
+    return archive
+
+def download_and_extract_chromedriver(session, driver_version, download_url, platform_key):
+    """Mengunduh, memverifikasi dan memasang chromedriver di SAVE_PATH, lalu mencatat versinya."""
+    print(f"Mengunduh chromedriver {driver_version} dari: {download_url}")
     try:
-        # Menggunakan API untuk menemukan versi driver yang cocok
-        url_api = "https://googlechromelabs.github.io/chrome-for-testing/known-good-versions-with-downloads.json"
-        
-        response = requests.get(url_api)
-        data = response.json()
-        
-        download_url = None
-        for version_info in data['versions']:
-            # Cocokkan versi utama
-            if version_info['version'].startswith(major_version):
-                # Cari URL untuk win64
-                for download in version_info['downloads']['chromedriver']:
-                    if download['platform'] == 'win64':
-                        download_url = download['url']
-                        break
-            if download_url:
-                break
-        
-        if not download_url:
-            print(f"Error: Tidak dapat menemukan chromedriver untuk versi {major_version}. Silakan unduh manual.")
-            return False
-
-        print(f"URL ditemukan. Mengunduh dari: {download_url}")
-        
-        # Mengunduh file zip
-        file_request = requests.get(download_url)
-        zip_file = zipfile.ZipFile(io.BytesIO(file_request.content))
-        
-        # Mengekstrak chromedriver.exe ke lokasi yang ditentukan oleh SAVE_PATH
-        for member in zip_file.namelist():
-            if member.endswith('chromedriver.exe'):
-                with open(SAVE_PATH, "wb") as output_file:
-                    shutil.copyfileobj(zip_file.open(member), output_file)
-                print("chromedriver.exe berhasil diupdate!")
-                return True
-        
-    except Exception as e:
-        print(f"Terjadi error saat mengunduh/mengekstrak chromedriver: {e}")
+        response = session.get(download_url, timeout=120)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise DriverError(f"Gagal mengunduh chromedriver: {e}") from e
+    archive = _verify_archive(response, response.content)
+
+    executable = "chromedriver.exe" if platform_key.startswith("win") else "chromedriver"
+    member = next((name for name in archive.namelist() if name.rsplit("/", 1)[-1] == executable), None)
+    if member is None:
+        raise DriverError(f"{executable} tidak ada di dalam arsip.")
+
+    # Ditulis ke file sementara di folder yang sama, dicek, lalu diganti sekaligus agar driver lama tetap utuh jika gagal
+    fd, tmp_path = tempfile.mkstemp(prefix=".chromedriver-", dir=os.path.dirname(SAVE_PATH))
+    try:
+        with os.fdopen(fd, "wb") as output_file, archive.open(member) as source:
+            shutil.copyfileobj(source, output_file)
+        os.chmod(tmp_path, 0o755)
+        reported = _run_version(tmp_path)
+        if reported is not None and reported != driver_version:
+            raise DriverError(f"chromedriver melaporkan versi {reported}, seharusnya {driver_version}.")
+        os.replace(tmp_path, SAVE_PATH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _write_json(STATE_PATH, {
+        "driver_version": driver_version,
+        "platform": platform_key,
+        "sha256": _file_sha256(SAVE_PATH),
+    })
+    print(f"chromedriver {driver_version} berhasil dipasang di {SAVE_PATH}")
+
+def ensure_chromedriver(chrome_binary=None, force=False, manifest_url=CHROMEDRIVER_MANIFEST_URL):
+    """Memastikan chromedriver yang cocok tersedia. Mengembalikan True jika siap dipakai."""
+    print("Mengecek versi Google Chrome...")
+    chrome_version = find_chrome_version(chrome_binary)
+    if not chrome_version:
+        print("Gagal menemukan versi Chrome. Silakan unduh driver secara manual atau gunakan --chrome.")
         return False
+    print(f"Versi Chrome yang ditemukan: {chrome_version}")
+
+    platform_key = platform_name()
+    if not force and installed_driver_matches(chrome_version, platform_key):
+        print("chromedriver sudah cocok, tidak perlu diunduh.")
+        return True
+
+    try:
+        with requests.Session() as session:
+            manifest = fetch_manifest(session, manifest_url)
+            driver_version, download_url = find_download(manifest, chrome_version, platform_key)
+            download_and_extract_chromedriver(session, driver_version, download_url, platform_key)
+    except DriverError as e:
+        print(f"Error: {e} Silakan unduh manual.")
+        return False
+    return True
 
 if __name__ == "__main__":
-    print("Mengecek versi Google Chrome...")
-    chrome_version = find_chrome_version()
-    
-    if chrome_version:
-        print(f"Versi Chrome yang ditemukan: {chrome_version}")
-        download_and_extract_chromedriver(chrome_version)
-    else:
-        print("Gagal menemukan versi Chrome. Silakan unduh driver secara manual.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Menyiapkan chromedriver yang cocok dengan Chrome terpasang.")
+    parser.add_argument("--chrome", help="Jalur ke Chrome/Chromium jika tidak ditemukan otomatis")
+    parser.add_argument("--force", action="store_true", help="Unduh ulang walau driver tersimpan sudah cocok")
+    parser.add_argument("--manifest-url", default=CHROMEDRIVER_MANIFEST_URL, help="Alamat daftar versi per milestone")
+    args = parser.parse_args()
+    sys.exit(0 if ensure_chromedriver(args.chrome, args.force, args.manifest_url) else 1)
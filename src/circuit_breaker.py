@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import deque
+from checker import CheckerBackend
+from logs import log_message
+from metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Pengecekan tidak dijalankan karena situs pengecekan sedang dianggap bermasalah."""
+
+    # Tidak ada gunanya dicoba ulang per shard; breaker sendiri yang mengatur kapan mencoba lagi
+    retryable = False
+
+    def __init__(self, retry_in):
+        super().__init__(f"Circuit breaker terbuka, dicoba lagi dalam {retry_in:.0f} detik.")
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    Circuit breaker bersama untuk semua pengecekan.
+
+    - closed: pengecekan berjalan normal; hasilnya dicatat dalam jendela window_seconds.
+      Jika minimal min_calls pengecekan tercatat dan rasio gagalnya >= failure_ratio, breaker terbuka.
+    - open: semua pengecekan langsung ditolak dengan CircuitOpenError (tanpa membuka browser)
+      selama cooldown.
+    - half_open: setelah cooldown, satu pengecekan dijalankan sebagai percobaan. Pengecekan lain
+      menunggu hasilnya. Jika berhasil breaker tertutup lagi; jika gagal breaker terbuka lagi
+      dengan cooldown dua kali lipat (maksimal max_cooldown).
+
+    on_change(state_lama, state_baru) opsional, dipanggil setiap kali state berubah.
+    """
+
+    def __init__(self, failure_ratio=0.5, min_calls=5, window_seconds=300, cooldown=30, max_cooldown=900,
+                 on_change=None, clock=time.monotonic):
+        self.failure_ratio = failure_ratio
+        self.min_calls = max(1, min_calls)
+        self.window_seconds = window_seconds
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.on_change = on_change
+        self.clock = clock
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.opened_at = None
+        self._outcomes = deque()
+        self._probe_done = None
+
+    # --- Status ---
+
+    @property
+    def retry_in(self):
+        """Sisa detik sampai percobaan berikutnya (0 jika tidak sedang terbuka)."""
+        if self.state != OPEN:
+            return 0
+        return max(0.0, self.opened_at + self.cooldown - self.clock())
+
+    def failure_stats(self):
+        """(jumlah gagal, jumlah pengecekan) dalam jendela pengamatan."""
+        self._trim()
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures, len(self._outcomes)
+
+    # --- Transisi ---
+
+    def _set_state(self, state):
+        previous, self.state = self.state, state
+        if previous != state:
+            log_message("breaker", f"Circuit breaker: {previous} -> {state}")
+            if self.on_change:
+                self.on_change(previous, state)
+
+    def _trim(self):
+        cutoff = self.clock() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _open(self):
+        self.opened_at = self.clock()
+        self._outcomes.clear()
+        metrics.inc("nawala_circuit_opened_total")
+        self._set_state(OPEN)
+
+    def record(self, ok):
+        """Mencatat hasil satu pengecekan biasa (bukan percobaan half-open)."""
+        if self.state != CLOSED:
+            # Pengecekan yang sudah berjalan sebelum breaker terbuka tidak mengubah keputusan
+            return
+        self._outcomes.append((self.clock(), ok))
+        failures, total = self.failure_stats()
+        if total >= self.min_calls and failures / total >= self.failure_ratio:
+            log_message("breaker", f"{failures} dari {total} pengecekan terakhir gagal, pengecekan dihentikan "
+                                   f"sementara selama {self.cooldown:.0f} detik.")
+            self._open()
+
+    def _finish_probe(self, ok):
+        if ok:
+            self.cooldown = self.base_cooldown
+            self._set_state(CLOSED)
+        else:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            log_message("breaker", f"Percobaan gagal, dicoba lagi dalam {self.cooldown:.0f} detik.")
+            self._open()
+        probe_done, self._probe_done = self._probe_done, None
+        probe_done.set()
+
+    async def call(self, run):
+        """Menjalankan coroutine dari run() melalui breaker."""
+        while True:
+            if self.state == OPEN:
+                if self.retry_in > 0:
+                    metrics.inc("nawala_circuit_rejections_total")
+                    raise CircuitOpenError(self.retry_in)
+                self._probe_done = asyncio.Event()
+                self._set_state(HALF_OPEN)
+                return await self._probe(run)
+            if self.state == HALF_OPEN:
+                # Pengecekan lain menunggu hasil percobaan, lalu mengikuti state barunya
+                await self._probe_done.wait()
+                continue
+            break
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.record(False)
+            raise
+        self.record(True)
+        return result
+
+    async def _probe(self, run):
+        log_message("breaker", "Menjalankan pengecekan percobaan (half-open)...")
+        ok = False
+        try:
+            result = await run()
+            ok = True
+            return result
+        finally:
+            self._finish_probe(ok)
+
+class CircuitBreakerChecker(CheckerBackend):
+    """Membungkus backend pengecekan mana pun dengan CircuitBreaker."""
+
+    def __init__(self, backend, breaker):
+        self.backend = backend
+        self.breaker = breaker
+        self.name = backend.name
+        self.supports_screenshot = backend.supports_screenshot
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        return await self.breaker.call(
+            lambda: self.backend.check(domain_names_list, username, screenshot=screenshot, priority=priority)
+        )
+
+    async def aclose(self):
+        await self.backend.aclose()
@@ -0,0 +1,173 @@
+import os
+from dotenv import load_dotenv
+
+# Memuat variabel dari file .env
+load_dotenv()
+
+def _env_int(name, default):
+    """Membaca environment variable sebagai angka, kembali ke default jika kosong/tidak valid."""
+    value = os.getenv(name)
+    try:
+        return int(value) if value not in (None, "") else default
+    except ValueError:
+        print(f"Nilai {name}={value!r} tidak valid, memakai default {default}.")
+        return default
+
+# Mengambil TOKEN dari environment variable
+# Ini lebih aman karena token tidak ditulis langsung di dalam kode
+TOKEN = os.getenv("TOKEN")
+# Alamat Bot API lain selain api.telegram.org (misalnya server Bot API tiruan untuk benchmark)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL") or None
+
+# Tentukan jalur dasar, yaitu satu folder di atas lokasi skrip ini
+# Karena config.py berada di src/, ini akan mengarah ke folder utama botmu
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tentukan folder tempat file user disimpan (bisa diganti lewat DATA_FOLDER, misalnya untuk benchmark)
+DATA_FOLDER = os.getenv("DATA_FOLDER") or os.path.join(BASE_DIR, "user")
+# Database SQLite untuk daftar domain dan jadwal semua chat
+DATABASE_FILE = os.path.join(DATA_FOLDER, "bot.db")
+# Jumlah domain maksimal yang ditampilkan di /daftar dan /status (daftar lengkap lewat /export)
+DOMAIN_LIST_PREVIEW_LIMIT = 100
+# Interval pengecekan otomatis default dalam detik (1 jam); tiap chat bisa mengubahnya lewat /interval
+CHECK_INTERVAL_SECONDS = _env_int("CHECK_INTERVAL_SECONDS", 3600)
+# Interval terpendek yang boleh dipilih, sekaligus interval domain kritis/baru berubah dalam mode adaptif
+MIN_CHECK_INTERVAL_SECONDS = _env_int("MIN_CHECK_INTERVAL_MINUTES", 15) * 60
+# Mode adaptif: domain yang stabil makin jarang dicek, paling jarang sekali per sekian detik
+ADAPTIVE_MAX_INTERVAL_SECONDS = _env_int("ADAPTIVE_MAX_INTERVAL_HOURS", 24) * 3600
+# Mode adaptif: domain yang berubah status dalam rentang ini dianggap "baru berubah" dan dicek lebih sering
+ADAPTIVE_RECENT_CHANGE_SECONDS = _env_int("ADAPTIVE_RECENT_CHANGE_HOURS", 6) * 3600
+# Mode adaptif: interval = lamanya status tidak berubah dibagi angka ini (dibatasi interval chat dan maksimum)
+ADAPTIVE_BACKOFF_FACTOR = 4
+
+# --- PENGATURAN BROWSER ---
+
+# Halaman pengecekan Nawala (bisa diarahkan ke replika lokal untuk benchmark)
+WEBSITE_URL = os.getenv("WEBSITE_URL", "https://nawalacheck.skiddle.id").rstrip("/")
+# Jalur ke chromedriver di folder src/ (chromedriver.exe di Windows), bisa diganti lewat CHROMEDRIVER_PATH
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'chromedriver.exe' if os.name == 'nt' else 'chromedriver'
+)
+# Daftar chromedriver terbaru per versi utama Chrome (Chrome for Testing), dipakai src/chromedriver.py
+CHROMEDRIVER_MANIFEST_URL = os.getenv(
+    "CHROMEDRIVER_MANIFEST_URL",
+    "https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json",
+)
+# Jumlah sesi Chrome yang disiapkan (sudah membuka halaman cek) di dalam pool
+BROWSER_POOL_SIZE = _env_int("BROWSER_POOL_SIZE", 2)
+# Sesi Chrome didaur ulang (ditutup lalu dibuat baru) setelah dipakai sebanyak ini
+BROWSER_MAX_USES = _env_int("BROWSER_MAX_USES", 50)
+# Mode ringan Chrome: gambar, font, CSS dan request analitik/iklan pihak ketiga diblokir saat pengecekan
+# (halaman tetap dimuat lengkap untuk /cek -s), ditambah flag hemat memori. 0 untuk mematikan.
+CHROME_LEAN_MODE = _env_int("CHROME_LEAN_MODE", 1) == 1
+# Pola URL tambahan yang diblokir (pisahkan dengan koma), misalnya "*cdn.iklan.com*"
+CHROME_BLOCKED_URLS = [p.strip() for p in os.getenv("CHROME_BLOCKED_URLS", "").split(",") if p.strip()]
+# Batas pengecekan yang berjalan bersamaan (jumlah worker antrean dan thread executor Selenium)
+CHECK_CONCURRENCY = _env_int("CHECK_CONCURRENCY", BROWSER_POOL_SIZE)
+
+# --- BACKEND PENGECEKAN ---
+
+# "selenium" (default, lewat Chrome) atau "http" (langsung ke endpoint, cadangan Selenium jika gagal)
+CHECKER_BACKEND = os.getenv("CHECKER_BACKEND", "selenium").strip().lower()
+# Endpoint JSON yang dipanggil halaman pengecekan saat tombol "Check Domains" diklik
+HTTP_CHECK_ENDPOINT = os.getenv("HTTP_CHECK_ENDPOINT", f"{WEBSITE_URL}/api/check")
+# Batas waktu satu request ke endpoint pengecekan (detik)
+HTTP_CHECK_TIMEOUT_SECONDS = _env_int("HTTP_CHECK_TIMEOUT_SECONDS", 30)
+# Circuit breaker: jika minimal CIRCUIT_MIN_CHECKS pengecekan dalam CIRCUIT_WINDOW_SECONDS terakhir
+# dan CIRCUIT_FAILURE_PERCENT persen di antaranya gagal, pengecekan dihentikan sementara (0 = nonaktif)
+CIRCUIT_FAILURE_PERCENT = min(100, max(0, _env_int("CIRCUIT_FAILURE_PERCENT", 50)))
+CIRCUIT_MIN_CHECKS = max(1, _env_int("CIRCUIT_MIN_CHECKS", 4))
+CIRCUIT_WINDOW_SECONDS = _env_int("CIRCUIT_WINDOW_SECONDS", 300)
+# Jeda sebelum pengecekan percobaan pertama; berlipat dua setiap percobaan gagal sampai batas maksimal
+CIRCUIT_COOLDOWN_SECONDS = max(1, _env_int("CIRCUIT_COOLDOWN_SECONDS", 30))
+CIRCUIT_MAX_COOLDOWN_SECONDS = _env_int("CIRCUIT_MAX_COOLDOWN_SECONDS", 900)
+
+# --- DETEKSI HASIL PENGECEKAN ---
+
+# Selector CSS untuk satu baris hasil per domain di halaman pengecekan
+RESULT_ROW_SELECTOR = os.getenv("RESULT_ROW_SELECTOR", "table tbody tr")
+# Selector CSS opsional untuk penanda bahwa pengecekan sudah selesai (kosong = tidak dipakai)
+RESULT_DONE_SELECTOR = os.getenv("RESULT_DONE_SELECTOR") or None
+# Batas maksimal menunggu hasil setelah tombol diklik (detik)
+RESULT_TIMEOUT_SECONDS = _env_int("RESULT_TIMEOUT_SECONDS", 60)
+# Elemen yang di-screenshot untuk /cek -s (bukan seluruh halaman); body dipakai jika tidak ditemukan
+RESULT_SCREENSHOT_SELECTOR = os.getenv("RESULT_SCREENSHOT_SELECTOR", "table")
+# Pengecilan screenshot sebelum dikirim (butuh Pillow): lebar maksimal dalam piksel dan kualitas JPEG
+# (0 = tidak diperkecil / tetap PNG)
+SCREENSHOT_MAX_WIDTH = _env_int("SCREENSHOT_MAX_WIDTH", 1280)
+SCREENSHOT_JPEG_QUALITY = _env_int("SCREENSHOT_JPEG_QUALITY", 80)
+
+# --- PENJADWALAN OTOMATIS ---
+
+# Seberapa sering penjadwal mengumpulkan chat yang jatuh tempo (detik)
+BATCH_WINDOW_SECONDS = _env_int("BATCH_WINDOW_SECONDS", 60)
+# Jadwal setiap chat digeser acak (tetap per chat) hingga sekian detik agar tidak jatuh tempo bersamaan
+SCHEDULE_JITTER_SECONDS = _env_int("SCHEDULE_JITTER_SECONDS", 600)
+# Jumlah maksimal domain dalam satu kali submit ke halaman pengecekan
+MAX_DOMAINS_PER_SUBMISSION = _env_int("MAX_DOMAINS_PER_SUBMISSION", 100)
+# Daftar domain besar pada /cek dipecah menjadi shard berisi maksimal sekian domain yang dicek paralel
+# di sesi Chrome berbeda; shard yang gagal dicoba ulang sebanyak CHECK_SHARD_RETRIES kali
+CHECK_SHARD_SIZE = min(_env_int("CHECK_SHARD_SIZE", 25), MAX_DOMAINS_PER_SUBMISSION)
+CHECK_SHARD_RETRIES = _env_int("CHECK_SHARD_RETRIES", 1)
+# Riwayat status per domain, dipakai untuk mengirim notifikasi hanya saat status berubah
+STATUS_HISTORY_FILE = os.path.join(DATA_FOLDER, "status_history.json")
+# Ringkasan lengkap dikirim setiap sekian jam walau tidak ada perubahan (0 = tidak pernah)
+SUMMARY_INTERVAL_SECONDS = _env_int("SUMMARY_INTERVAL_HOURS", 24) * 3600
+
+# --- CACHE HASIL PENGECEKAN ---
+
+# Berapa lama hasil pengecekan satu domain dianggap masih segar (detik)
+RESULT_CACHE_TTL_SECONDS = _env_int("RESULT_CACHE_TTL_SECONDS", 300)
+# Jumlah maksimal domain di cache; yang paling lama tidak dipakai dibuang lebih dulu
+RESULT_CACHE_MAX_ENTRIES = _env_int("RESULT_CACHE_MAX_ENTRIES", 10000)
+# Simpan cache ke folder user/ saat bot berhenti (isi RESULT_CACHE_PERSIST=0 untuk mematikan)
+RESULT_CACHE_FILE = os.path.join(DATA_FOLDER, "result_cache.json") if _env_int("RESULT_CACHE_PERSIST", 1) else None
+
+# Endpoint metrik gaya Prometheus di http://METRICS_HOST:METRICS_PORT/metrics (0 = tidak dijalankan)
+METRICS_PORT = _env_int("METRICS_PORT", 0)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# ID pengguna Telegram yang boleh memakai perintah admin seperti /metrics (pisahkan dengan koma)
+ADMIN_IDS = {int(i) for i in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if i.lstrip("-").isdigit()}
+
+# --- PENGATURAN MODE BOT ---
+
+# "polling" (default) atau "webhook": Telegram mengirim update langsung ke server bawaan bot
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+# URL publik yang didaftarkan ke Telegram, misalnya https://bot.domainku.com/telegram (wajib untuk webhook)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL") or None
+# Alamat dan port server webhook bawaan (biasanya di belakang reverse proxy HTTPS)
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = _env_int("WEBHOOK_PORT", 8443)
+# Path yang diterima server webhook; default diambil dari path WEBHOOK_URL
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH")
+# Token rahasia yang wajib dikirim Telegram di header X-Telegram-Bot-Api-Secret-Token;
+# jika kosong dibuat acak setiap kali bot dijalankan
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+# Batas koneksi bersamaan dari Telegram ke webhook (1-100)
+WEBHOOK_MAX_CONNECTIONS = _env_int("WEBHOOK_MAX_CONNECTIONS", 40)
+# Jumlah update yang boleh diproses bersamaan (polling maupun webhook)
+UPDATE_CONCURRENCY = max(1, _env_int("UPDATE_CONCURRENCY", 256))
+# Saat bot berhenti, tunggu pengecekan yang masih berjalan/antre selesai maksimal sekian detik
+SHUTDOWN_DRAIN_SECONDS = _env_int("SHUTDOWN_DRAIN_SECONDS", 120)
+
+# --- PENGATURAN WORKER PENGECEKAN ---
+
+# "local" (default): bot mengecek sendiri. "queue": bot hanya memasukkan pekerjaan ke antrean bersama
+# dan menunggu hasilnya dari satu atau lebih worker (python src/worker.py) di core lain mesin yang sama
+CHECK_MODE = os.getenv("CHECK_MODE", "local").strip().lower()
+# File SQLite antrean bersama. SQLite mode WAL tidak aman di folder jaringan (NFS/SMB), jadi bot dan
+# semua worker harus berjalan di satu mesin dengan file di disk lokal
+JOB_QUEUE_FILE = os.getenv("JOB_QUEUE_FILE") or os.path.join(DATA_FOLDER, "jobs.db")
+# Lama lease satu pekerjaan; worker memperpanjangnya selama masih mengecek. Jika worker mati,
+# pekerjaannya diambil worker lain setelah lease habis
+JOB_LEASE_SECONDS = max(10, _env_int("JOB_LEASE_SECONDS", 120))
+# Berapa kali satu pekerjaan boleh diambil worker (diulang hanya jika worker mati/lease habis)
+JOB_MAX_ATTEMPTS = max(1, _env_int("JOB_MAX_ATTEMPTS", 3))
+# Batas waktu bot menunggu hasil satu pekerjaan dari worker
+JOB_WAIT_TIMEOUT_SECONDS = _env_int("JOB_WAIT_TIMEOUT_SECONDS", 600)
+# Jeda bot memeriksa hasil dan worker memeriksa pekerjaan baru (milidetik)
+JOB_POLL_SECONDS = max(50, _env_int("JOB_POLL_MS", 500)) / 1000
+# Jumlah pekerjaan yang boleh dikirim bot ke antrean bersamaan pada mode queue
+JOB_MAX_IN_FLIGHT = max(1, _env_int("JOB_MAX_IN_FLIGHT", 64))
+# Jumlah pengecekan bersamaan per proses worker
+WORKER_CONCURRENCY = max(1, _env_int("WORKER_CONCURRENCY", CHECK_CONCURRENCY))
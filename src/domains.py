@@ -0,0 +1,50 @@
+import csv
+import re
+
+# Satu label hostname: huruf/angka/tanda hubung, tidak diawali/diakhiri tanda hubung, maksimal 63 karakter
+_LABEL_RE = re.compile(r"^(?!-)[a-z0-9-]{1,63}(?<!-)$")
+
+def normalize_domain(raw):
+    """
+    Merapikan input menjadi nama domain: huruf kecil, tanpa skema (http://),
+    path, port atau titik di akhir. Mengembalikan None jika bukan domain yang valid.
+    """
+    domain = raw.strip().strip('"\'').lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    domain = domain.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    if not domain or len(domain) > 253 or "." not in domain:
+        return None
+    try:
+        # Domain internasional (IDN) disimpan dalam bentuk punycode
+        domain = domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    labels = domain.split(".")
+    if not all(_LABEL_RE.match(label) for label in labels) or labels[-1].isdigit():
+        return None
+    return domain
+
+def parse_domain_lines(lines):
+    """
+    Membaca domain dari baris-baris file .txt/.csv secara bertahap (tidak memuat
+    seluruh file sebagai list). Setiap sel CSV / kata dianggap kandidat domain;
+    baris kosong dan komentar (#) dilewati. Mengembalikan (domain valid unik
+    sesuai urutan, jumlah entri tidak valid).
+    """
+    seen = set()
+    domains = []
+    invalid = 0
+    for row in csv.reader(lines):
+        for cell in row:
+            for token in cell.split():
+                if token.startswith("#"):
+                    break
+                domain = normalize_domain(token)
+                if domain is None:
+                    invalid += 1
+                elif domain not in seen:
+                    seen.add(domain)
+                    domains.append(domain)
+    return domains, invalid
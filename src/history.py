@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from datetime import datetime
+from results import DomainResult
+
+class StatusHistory:
+    """
+    Riwayat status per domain (status terakhir, kapan terakhir berubah dan dicek)
+    beserta status terakhir yang sudah diberitahukan ke setiap chat.
+    Disimpan sebagai satu file JSON di folder user/.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.domains = {}
+        self.notified = {}
+        self.last_summary = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error membaca file riwayat {self.path}: {e}")
+            return
+        with self._lock:
+            self.domains = data.get('domains', {})
+            # Kunci JSON selalu string, kembalikan chat_id ke int
+            self.notified = {int(chat_id): states for chat_id, states in data.get('notified', {}).items()}
+            self.last_summary = {
+                int(chat_id): datetime.fromisoformat(value) for chat_id, value in data.get('last_summary', {}).items()
+            }
+
+    def save(self):
+        """Menulis file hanya jika ada perubahan sejak penyimpanan terakhir."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'domains': self.domains,
+                'notified': {str(chat_id): states for chat_id, states in self.notified.items()},
+                'last_summary': {str(chat_id): value.isoformat() for chat_id, value in self.last_summary.items()},
+            }
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f)
+        except IOError as e:
+            print(f"Error menulis ke file riwayat {self.path}: {e}")
+
+    def record(self, results):
+        """
+        Mencatat hasil pengecekan. Hasil pertama sebuah domain hanya mencatat first_seen
+        (changed_at None); changed_at baru diisi saat status blokirnya benar-benar berubah.
+        """
+        with self._lock:
+            for result in results.values():
+                if not result.found:
+                    continue
+                checked_at = result.checked_at.isoformat()
+                entry = self.domains.get(result.domain)
+                if entry is None:
+                    entry = {'blocked': result.blocked, 'first_seen': checked_at, 'changed_at': None}
+                    self.domains[result.domain] = entry
+                elif entry['blocked'] != result.blocked:
+                    entry['blocked'] = result.blocked
+                    entry['changed_at'] = checked_at
+                entry['status'] = result.status
+                entry['checked_at'] = checked_at
+            self._dirty = True
+
+    def latest(self, domain):
+        """Hasil terakhir yang tercatat untuk domain sebagai DomainResult, atau None."""
+        entry = self.domains.get(domain)
+        if entry is None:
+            return None
+        return DomainResult(domain, entry['blocked'], entry['status'], datetime.fromisoformat(entry['checked_at']))
+
+    def changed_at(self, domain):
+        entry = self.domains.get(domain)
+        return datetime.fromisoformat(entry['changed_at']) if entry and entry.get('changed_at') else None
+
+    def changes_for_chat(self, chat_id, results):
+        """
+        Mengembalikan [(DomainResult, status_sebelumnya)] untuk domain yang statusnya
+        berbeda dari yang terakhir diberitahukan ke chat ini. Domain yang belum pernah
+        diberitahukan punya status_sebelumnya None. Panggil mark_notified setelah pesannya
+        benar-benar terkirim.
+        """
+        changes = []
+        with self._lock:
+            states = self.notified.get(chat_id, {})
+            for result in results.values():
+                if not result.found:
+                    continue
+                if result.domain not in states or states[result.domain] != result.blocked:
+                    changes.append((result, states.get(result.domain)))
+        return changes
+
+    def mark_notified(self, chat_id, changes):
+        """Mencatat perubahan dari changes_for_chat sebagai sudah diberitahukan ke chat."""
+        if not changes:
+            return
+        with self._lock:
+            states = self.notified.setdefault(chat_id, {})
+            for result, _ in changes:
+                states[result.domain] = result.blocked
+            self._dirty = True
+
+    def summary_due(self, chat_id, interval_seconds, now=None):
+        """True jika chat sudah waktunya menerima ringkasan berkala (interval 0 = tidak pernah)."""
+        if interval_seconds <= 0:
+            return False
+        now = now or datetime.now()
+        last = self.last_summary.get(chat_id)
+        if last is None:
+            # Mulai hitung dari sekarang agar chat baru tidak langsung mendapat ringkasan ganda
+            with self._lock:
+                self.last_summary[chat_id] = now
+                self._dirty = True
+            return False
+        return (now - last).total_seconds() >= interval_seconds
+
+    def mark_summary_sent(self, chat_id, now=None):
+        with self._lock:
+            self.last_summary[chat_id] = now or datetime.now()
+            self._dirty = True
+
+    def forget_chat(self, chat_id, domains=None):
+        """Menghapus status yang sudah diberitahukan untuk chat (semua domain atau domain tertentu)."""
+        with self._lock:
+            if domains is None:
+                self.notified.pop(chat_id, None)
+                self.last_summary.pop(chat_id, None)
+            else:
+                states = self.notified.get(chat_id, {})
+                for domain in domains:
+                    states.pop(domain, None)
+            self._dirty = True
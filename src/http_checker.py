@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+import httpx
+from checker import CheckerBackend
+from logs import log_message
+from metrics import metrics
+from results import DomainResult, parse_blocked
+
+def parse_http_results(payload, domain_names_list):
+    """
+    Mengubah respons JSON endpoint pengecekan menjadi {domain: DomainResult}.
+    Menerima list hasil langsung atau dibungkus di kunci "results"/"data"; setiap
+    item minimal punya "domain" dan salah satu dari "blocked" atau "status".
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("results", payload.get("data", []))
+    if not isinstance(payload, list):
+        raise ValueError("Format respons endpoint pengecekan tidak dikenali.")
+
+    checked_at = datetime.now()
+    by_domain = {}
+    for item in payload:
+        if not isinstance(item, dict) or "domain" not in item:
+            continue
+        domain = str(item["domain"]).strip().lower()
+        status = item.get("status")
+        blocked = item.get("blocked")
+        if blocked is None:
+            blocked = parse_blocked(status)
+        if status is None and blocked is not None:
+            status = "Blocked" if blocked else "Not Blocked"
+        by_domain[domain] = DomainResult(domain, blocked, status, checked_at)
+
+    return {
+        domain: by_domain.get(domain.strip().lower()) or DomainResult(domain, None, None, checked_at)
+        for domain in domain_names_list
+    }
+
+class HttpChecker(CheckerBackend):
+    """
+    Backend tanpa browser: mengirim daftar domain langsung ke endpoint yang dipakai
+    halaman pengecekan, memakai satu httpx.AsyncClient dengan koneksi keep-alive.
+    """
+
+    name = "http"
+    supports_screenshot = False
+
+    def __init__(self, endpoint, timeout=30, max_connections=10):
+        self.endpoint = endpoint
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"Accept": "application/json"},
+        )
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        log_message(username, f"Mengirim {len(domain_names_list)} domain ke {self.endpoint}...")
+        started = time.monotonic()
+        with metrics.span("http_request"):
+            response = await self.client.post(self.endpoint, json={"domains": list(domain_names_list)})
+        response.raise_for_status()
+        results = parse_http_results(response.json(), domain_names_list)
+        if not any(result.found for result in results.values()):
+            raise ValueError("Respons endpoint pengecekan tidak berisi hasil untuk domain yang dikirim.")
+        log_message(username, f"Respons HTTP diterima dalam {time.monotonic() - started:.2f} detik.")
+        return results, None
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,7 @@
+from datetime import datetime
+
+# --- FUNGSI UNTUK LOGGING YANG LEBIH RAPI ---
+def log_message(username, message):
+    """Fungsi pembantu untuk mencetak pesan log dengan format yang konsisten."""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] User: {username} | {message}")
@@ -1,133 +1,168 @@
-import os
-import re
+import io
 import sys
 import asyncio
-import glob
-import json
+import math
+import secrets
+from functools import partial
+from urllib.parse import urlparse
 from datetime import timedelta, datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from telegram import Update, InputFile
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, JobQueue
-from dotenv import load_dotenv
-
-# Memuat variabel dari file .env
-load_dotenv()
-
-# Mengambil TOKEN dari environment variable
-# Ini lebih aman karena token tidak ditulis langsung di dalam kode
-TOKEN = os.getenv("TOKEN")
-
-# Tentukan jalur dasar, yaitu satu folder di atas lokasi skrip ini
-# Karena main.py berada di src/, ini akan mengarah ke folder utama botmu
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Tentukan folder tempat file user disimpan
-DATA_FOLDER = os.path.join(BASE_DIR, "user")
-# Gabungkan dengan nama file dasar
-DOMAIN_FILE_BASE = os.path.join(DATA_FOLDER, "domains")
-SCHEDULE_FILE_BASE = os.path.join(DATA_FOLDER, "schedule")
-# Interval pengecekan otomatis dalam detik (1 jam)
-CHECK_INTERVAL_SECONDS = 3600
-
-# --- FUNGSI UNTUK MENGELOLA FILE DOMAIN PER PENGGUNA ---
-
-def get_domain_filename(chat_id, username=None):
+from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
+from config import (
+    TOKEN, DATA_FOLDER, CHECK_INTERVAL_SECONDS, CHECK_CONCURRENCY,
+    BATCH_WINDOW_SECONDS, MAX_DOMAINS_PER_SUBMISSION, CHECK_SHARD_SIZE, CHECK_SHARD_RETRIES,
+    RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_FILE,
+    CHECKER_BACKEND, CHECK_MODE, JOB_QUEUE_FILE, JOB_POLL_SECONDS, JOB_WAIT_TIMEOUT_SECONDS,
+    JOB_MAX_ATTEMPTS, JOB_MAX_IN_FLIGHT, CIRCUIT_FAILURE_PERCENT, CIRCUIT_MIN_CHECKS, CIRCUIT_WINDOW_SECONDS,
+    CIRCUIT_COOLDOWN_SECONDS, CIRCUIT_MAX_COOLDOWN_SECONDS,
+    STATUS_HISTORY_FILE, SUMMARY_INTERVAL_SECONDS, DATABASE_FILE, DOMAIN_LIST_PREVIEW_LIMIT,
+    SCHEDULE_JITTER_SECONDS, MIN_CHECK_INTERVAL_SECONDS, ADAPTIVE_MAX_INTERVAL_SECONDS,
+    ADAPTIVE_RECENT_CHANGE_SECONDS, ADAPTIVE_BACKOFF_FACTOR,
+    METRICS_PORT, METRICS_HOST, ADMIN_IDS, TELEGRAM_API_URL,
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONNECTIONS, UPDATE_CONCURRENCY, SHUTDOWN_DRAIN_SECONDS,
+)
+from backends import build_browser_pool, build_selenium_checker, build_checker
+from shared_queue import SharedJobQueue, QueueChecker
+from circuit_breaker import CircuitBreaker, CircuitBreakerChecker, CircuitOpenError, CLOSED, HALF_OPEN
+from batch_scheduler import BatchScheduler
+from result_cache import ResultCache
+from history import StatusHistory
+from check_queue import CheckQueue, PRIORITY_MANUAL, PRIORITY_AUTOMATIC
+from storage import DomainStore, migrate_from_files
+from screenshot import FileIdCache
+from metrics import metrics, timed_handler, InstrumentedRequest, start_metrics_server
+from adaptive import select_due_domains
+from domains import normalize_domain, parse_domain_lines
+from messages import split_message, RESULT_HEADER, ERROR_PREFIX, DEFERRED_PREFIX, PARTIAL_FAILURE_PREFIX
+from logs import log_message
+
+# Pool sesi Chrome yang dipakai bersama oleh semua pengecekan.
+# Sesi baru disiapkan saat bot mulai (post_init) dan ditutup saat bot berhenti (post_shutdown).
+browser_pool = build_browser_pool()
+selenium_checker = build_selenium_checker(browser_pool)
+
+if CHECK_MODE == "queue":
+    # Pengecekan dikerjakan worker terpisah (src/worker.py); bot hanya mengantre dan mengirim hasil
+    shared_job_queue = SharedJobQueue(JOB_QUEUE_FILE)
+    backend = QueueChecker(
+        shared_job_queue, poll_seconds=JOB_POLL_SECONDS, wait_timeout=JOB_WAIT_TIMEOUT_SECONDS, max_attempts=JOB_MAX_ATTEMPTS,
+    )
+    check_workers = JOB_MAX_IN_FLIGHT
+else:
+    if CHECK_MODE != "local":
+        print(f"CHECK_MODE={CHECK_MODE!r} tidak dikenal, memakai local.")
+    shared_job_queue = None
+    backend = build_checker(CHECKER_BACKEND, selenium_checker)
+    check_workers = CHECK_CONCURRENCY
+# Circuit breaker bersama: saat situs pengecekan bermasalah, pengecekan langsung ditolak tanpa membuka
+# browser, lalu dicoba lagi satu per satu dengan jeda yang makin panjang sampai situs pulih
+if CIRCUIT_FAILURE_PERCENT:
+    circuit_breaker = CircuitBreaker(
+        failure_ratio=CIRCUIT_FAILURE_PERCENT / 100,
+        min_calls=CIRCUIT_MIN_CHECKS,
+        window_seconds=CIRCUIT_WINDOW_SECONDS,
+        cooldown=CIRCUIT_COOLDOWN_SECONDS,
+        max_cooldown=CIRCUIT_MAX_COOLDOWN_SECONDS,
+    )
+    checker = CircuitBreakerChecker(backend, circuit_breaker)
+else:
+    circuit_breaker = None
+    checker = backend
+# Semua pengecekan (manual dan otomatis) lewat satu antrean berprioritas; prioritasnya ikut diteruskan ke worker
+check_queue = CheckQueue(
+    run_check=lambda domains, label, screenshot, priority: checker.check(domains, label, screenshot=screenshot, priority=priority),
+    workers=check_workers,
+)
+# Cache hasil per domain agar /cek untuk domain yang baru saja dicek tidak membuka browser lagi
+result_cache = ResultCache(RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_MAX_ENTRIES, path=RESULT_CACHE_FILE)
+# Database domain dan jadwal semua chat (menggantikan file domains_*.txt dan schedule_*.json)
+domain_store = DomainStore(DATABASE_FILE)
+# Riwayat status per domain; pengecekan otomatis hanya mengirim pesan jika ada perubahan
+status_history = StatusHistory(STATUS_HISTORY_FILE)
+# Chat yang sudah diberi tahu bahwa pengecekan otomatis ditunda karena situs pengecekan bermasalah
+outage_notified_chats = set()
+# file_id Telegram dari screenshot yang sudah diunggah, berdasarkan hash isi gambar
+screenshot_file_ids = FileIdCache()
+# Argumen /cek untuk memaksa pengecekan baru tanpa cache
+FORCE_CHECK_FLAGS = ("-f", "--baru")
+# Argumen /cek untuk ikut mengirim screenshot halaman hasil
+SCREENSHOT_FLAGS = ("-s", "--gambar")
+
+def _describe_error(e):
     """
-    Membuat nama file unik untuk setiap chat_id, termasuk username untuk kemudahan
-    identifikasi manual.
+    Menerjemahkan exception pengecekan menjadi pesan singkat untuk pengguna dan awalan log.
+    Teks asli exception hanya masuk log (lihat _error_detail), tidak dikirim ke pengguna.
     """
-    if username:
-        safe_username = "".join(c for c in username if c.isalnum() or c in ('_', '-')).rstrip()
-        return os.path.join(DATA_FOLDER, f"domains_{safe_username}_{chat_id}.txt")
-    else:
-        return os.path.join(DATA_FOLDER, f"domains_{chat_id}.txt")
-
-def load_domains(chat_id, username=None):
-    """Membaca daftar domain dari file untuk chat_id tertentu."""
-    filename = get_domain_filename(chat_id, username)
-    try:
-        if not os.path.exists(filename):
-            # Mencoba mencari file lama jika format baru tidak ditemukan
-            filename_old = os.path.join(DATA_FOLDER, f"domains_{chat_id}.txt")
-            if os.path.exists(filename_old):
-                os.rename(filename_old, filename)
-            else:
-                return []
-        with open(filename, "r") as f:
-            return [line.strip() for line in f if line.strip()]
-    except IOError as e:
-        print(f"Error membaca file {filename}: {e}")
-        return []
-
-def save_domains(domains, chat_id, username=None):
-    """Menyimpan daftar domain ke file untuk chat_id tertentu."""
-    filename = get_domain_filename(chat_id, username)
-    # Pastikan direktori ada sebelum menulis file
-    os.makedirs(DATA_FOLDER, exist_ok=True)
-    try:
-        with open(filename, "w") as f:
-            for domain in domains:
-                f.write(f"{domain}\n")
-    except IOError as e:
-        print(f"Error menulis ke file {filename}: {e}")
-
-# --- FUNGSI BARU: MENGELOLA FILE JADWAL PENGECETAN OTOMATIS ---
-
-def get_schedule_filename(chat_id, username=None):
-    """Membuat nama file jadwal unik untuk setiap chat_id."""
-    if username:
-        safe_username = "".join(c for c in username if c.isalnum() or c in ('_', '-')).rstrip()
-        return os.path.join(DATA_FOLDER, f"schedule_{safe_username}_{chat_id}.json")
-    else:
-        return os.path.join(DATA_FOLDER, f"schedule_{chat_id}.json")
-
-def save_schedule(chat_id, username, start_time):
-    """Menyimpan waktu mulai job ke file JSON."""
-    filename = get_schedule_filename(chat_id, username)
-    os.makedirs(DATA_FOLDER, exist_ok=True)
-    try:
-        with open(filename, 'w') as f:
-            json.dump({'start_time': start_time.isoformat()}, f)
-    except IOError as e:
-        print(f"Error menulis ke file jadwal {filename}: {e}")
-
-def load_schedule(chat_id, username):
-    """Membaca waktu mulai job dari file JSON."""
-    filename = get_schedule_filename(chat_id, username)
-    try:
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                data = json.load(f)
-            return datetime.fromisoformat(data['start_time'])
-        return None
-    except (IOError, json.JSONDecodeError, KeyError) as e:
-        print(f"Error membaca atau memproses file jadwal {filename}: {e}")
-        return None
-
-def delete_schedule_file(chat_id, username):
-    """Menghapus file jadwal."""
-    filename = get_schedule_filename(chat_id, username)
-    if os.path.exists(filename):
-        os.remove(filename)
-
-# --- FUNGSI UNTUK LOGGING YANG LEBIH RAPI ---
-def log_message(username, message):
-    """Fungsi pembantu untuk mencetak pesan log dengan format yang konsisten."""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] User: {username} | {message}")
-
-# Fungsi inti yang menjalankan proses web scraping dan screenshot
-async def _perform_domain_check(domain_names_list, username, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if isinstance(e, CircuitOpenError):
+        # Hanya dipakai untuk /cek yang tidak diulang otomatis; pengecekan terjadwal punya pesan sendiri (_send_auto_error)
+        return (f"{DEFERRED_PREFIX}, jadi pengecekan ditunda sementara. "
+                f"Coba lagi dalam sekitar {math.ceil(e.retry_in)} detik."), "DITUNDA"
+    if isinstance(e, TimeoutException):
+        return f"{ERROR_PREFIX} saat mengecek domain. Bot kehabisan waktu saat menunggu elemen di halaman. Coba lagi atau periksa koneksi internetmu.", "ERROR"
+    if isinstance(e, NoSuchElementException):
+        return f"{ERROR_PREFIX} saat mengecek domain. Bot tidak dapat menemukan elemen di halaman web.", "ERROR"
+    if isinstance(e, WebDriverException):
+        return f"{ERROR_PREFIX} pada WebDriver Selenium. Pastikan semua dependensi sudah terpasang.", "ERROR WebDriver"
+    return f"{ERROR_PREFIX} tak terduga saat mengecek domain. Coba lagi nanti.", "ERROR tak terduga"
+
+def _error_detail(e):
+    """Teks exception untuk log."""
+    return f"[{type(e).__name__}: {str(e).strip()}]"
+
+def _status_label(blocked, status=None):
+    """Label status yang ditampilkan ke pengguna."""
+    if blocked is True:
+        return "DIBLOKIR"
+    if blocked is False:
+        return "Tidak diblokir"
+    return status or "hasil tidak ditemukan"
+
+def _format_results(results, show_age=False, limit=None):
     """
-    Melakukan pengecekan domain Nawala menggunakan Selenium dan mengirimkan screenshot.
-    Fungsi ini dipanggil oleh perintah manual (/cek) dan pengecekan otomatis.
+    Menyusun DomainResult menjadi teks ringkas bernomor, satu baris per domain.
+    Jika limit diisi, hanya limit domain pertama yang ditampilkan.
+    """
+    now = datetime.now()
+    lines = []
+    for i, result in enumerate(results[:limit]):
+        line = f"{i+1}. {result.domain} — {_status_label(result.blocked, result.status)}"
+        if show_age:
+            age_minutes = int((now - result.checked_at).total_seconds() // 60)
+            line += f" (dicek {age_minutes} menit lalu)"
+        lines.append(line)
+    if limit is not None and len(results) > limit:
+        lines.append(f"... dan {len(results) - limit} domain lainnya.")
+    return "\n".join(lines)
+
+async def _send_text(send, text):
+    """Mengirim teks lewat send(text), dipecah menjadi beberapa pesan jika melewati batas Telegram."""
+    for chunk in split_message(text):
+        await send(chunk)
+
+async def _send_screenshot(update: Update, shot, username):
+    """Mengirim screenshot dari memori; gambar yang sama dikirim ulang lewat file_id tanpa upload."""
+    caption = "Screenshot hasil pengecekan domain."
+    file_id = screenshot_file_ids.get(shot.digest)
+    if file_id:
+        log_message(username, "Mengirim ulang screenshot yang sama lewat file_id Telegram...")
+        await update.message.reply_photo(photo=file_id, caption=caption)
+        return
+    log_message(username, "Mengirim screenshot ke Telegram...")
+    with metrics.span("screenshot_upload"):
+        message = await update.message.reply_photo(photo=InputFile(shot.as_file(), filename=shot.filename), caption=caption)
+    if message.photo:
+        screenshot_file_ids.put(shot.digest, message.photo[-1].file_id)
+
+# Fungsi inti yang menjalankan proses web scraping dan (opsional) screenshot
+async def _perform_domain_check(domain_names_list, username, update: Update, context: ContextTypes.DEFAULT_TYPE, screenshot=False):
+    """
+    Melakukan pengecekan domain Nawala menggunakan Selenium untuk perintah manual (/cek).
+    Mengembalikan {domain: DomainResult}, atau None jika pengecekan gagal (pesan error
+    sudah dikirim ke pengguna). Screenshot hanya diambil dan dikirim jika diminta.
+    Pekerjaan Selenium berjalan di executor checker sehingga handler lain tidak ikut tertahan.
     """
-    driver = None
     try:
         # Perubahan di sini: Menggabungkan domain dengan nomor urut
         formatted_domains = [f"{i+1}. {domain}" for i, domain in enumerate(domain_names_list)]
@@ -135,90 +170,37 @@ async def _perform_domain_check(domain_names_list, username, update: Update, con
         
         log_message(username, f"Pengecekan dimulai. Domain:\n{domain_names_log}")
 
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--window-size=1920,1080") 
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        chrome_options.add_argument("--log-level=3") 
-        
-        log_message(username, "Menginisialisasi browser Chrome...")
-        
-        # Tentukan jalur ke chromedriver.exe di folder src/
-        driver_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.exe')
-        
-        # Buat objek Service yang menunjuk ke chromedriver.exe
-        chrome_service = Service(executable_path=driver_path, service_log_path=os.devnull)
-        
-        driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
-        
-        website_url = "https://nawalacheck.skiddle.id"
-        log_message(username, f"Membuka halaman web: {website_url}")
-        driver.get(website_url)
-        
-        wait = WebDriverWait(driver, 20)
-        
-        log_message(username, "Menunggu kolom input siap...")
-        input_field = wait.until(EC.presence_of_element_located((By.ID, "domains")))
-        input_field.send_keys("\n".join(domain_names_list)) 
-        
-        log_message(username, "Menunggu tombol 'Check Domains' siap...")
-        check_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Check Domains')]")))
-        
-        log_message(username, "Mengklik tombol...")
-        check_button.click()
-        
-        log_message(username, "Menunggu hasil pengecekan (15 detik)...")
-        await asyncio.sleep(15) 
+        # Prioritas manual: didahulukan dari pengecekan otomatis yang masih antre
+        # Daftar besar dipecah menjadi shard yang dicek paralel dan dicoba ulang sendiri-sendiri
+        results, shots, errors = await check_queue.submit_sharded(
+            domain_names_list, username, PRIORITY_MANUAL, CHECK_SHARD_SIZE, CHECK_SHARD_RETRIES,
+            screenshot=screenshot, chat_ids=[update.message.chat_id]
+        )
+        if errors and not results:
+            raise next(iter(errors.values()))
+        result_cache.put_many(results)
+        status_history.record(results)
         
-        screenshot_filename = "nawala_check.png"
-        log_message(username, "Mengambil screenshot...")
-        body_element = driver.find_element(By.TAG_NAME, 'body')
-        body_element.screenshot(screenshot_filename)
-        
-        log_message(username, "Mengirim screenshot ke Telegram...")
-        with open(screenshot_filename, "rb") as image_file:
-            if update:
-                await update.message.reply_photo(photo=InputFile(image_file), caption="Hasil pengecekan domain sudah selesai!")
-            else:
-                await context.bot.send_photo(chat_id=context.job.chat_id, photo=InputFile(image_file), caption="Hasil pengecekan otomatis domain sudah selesai!")
-            
-        os.remove(screenshot_filename)
+        for shot in shots:
+            await _send_screenshot(update, shot, username)
+
+        if errors:
+            # Sebagian shard tetap gagal: hasil yang ada tetap dikirim, domain yang gagal disebutkan
+            error = next(iter(errors.values()))
+            error_message, log_prefix = _describe_error(error)
+            log_message(username, f"{log_prefix}: {len(errors)} domain gagal dicek: {error_message} {_error_detail(error)}")
+            await update.message.reply_text(
+                f"{PARTIAL_FAILURE_PREFIX} setelah dicoba ulang ({len(errors)}): {_short_list(list(errors))}.\n{error_message}"
+            )
+
+        log_message(username, "Proses pengecekan selesai.")
+        return results
             
-    except TimeoutException:
-        error_message = "Terjadi error saat mengecek domain. Bot kehabisan waktu saat menunggu elemen di halaman. Coba lagi atau periksa koneksi internetmu."
-        if update:
-            await update.message.reply_text(error_message)
-        else:
-            await context.bot.send_message(chat_id=context.job.chat_id, text=error_message)
-        log_message(username, f"ERROR: {error_message}")
-    except NoSuchElementException:
-        error_message = "Terjadi error saat mengecek domain. Bot tidak dapat menemukan elemen di halaman web."
-        if update:
-            await update.message.reply_text(error_message)
-        else:
-            await context.bot.send_message(chat_id=context.job.chat_id, text=error_message)
-        log_message(username, f"ERROR: {error_message}")
-    except WebDriverException as e:
-        error_message = f"Terjadi error pada WebDriver Selenium. Pastikan semua dependensi sudah terpasang. Error: {e}"
-        if update:
-            await update.message.reply_text(error_message)
-        else:
-            await context.bot.send_message(chat_id=context.job.chat_id, text=error_message)
-        log_message(username, f"ERROR WebDriver: {error_message}")
     except Exception as e:
-        error_message = f"Terjadi error tak terduga saat mengecek domain. Error: {e}"
-        if update:
-            await update.message.reply_text(error_message)
-        else:
-            await context.bot.send_message(chat_id=context.job.chat_id, text=error_message)
-        log_message(username, f"ERROR tak terduga: {e}")
-    
-    finally:
-        if driver:
-            driver.quit()
-            log_message(username, "Browser ditutup. Proses pengecekan selesai.")
+        error_message, log_prefix = _describe_error(e)
+        await update.message.reply_text(error_message)
+        log_message(username, f"{log_prefix}: {error_message} {_error_detail(e)}")
+        return None
 
 # Fungsi untuk perintah /start
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -227,12 +209,18 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     log_message(username, "Perintah /start")
     await update.message.reply_text(
         f'Halo {user_first_name}! Aku adalah bot untuk mengecek domain Nawala.\n'
-        'Ketik /cek [domain_mu] untuk memulai.\n'
+        'Ketik /cek [domain_mu] untuk memulai (tambahkan -f untuk memaksa cek ulang tanpa cache, '
+        'atau -s untuk ikut menerima screenshot).\n'
         '\nBerikut cara untuk mengatur pengecekan otomatis:\n'
         '- /tambah [domain] untuk menambahkan domain dan memulai pengecekan otomatis\n'
-        '- /hapus untuk menghapus semua domain\n'
+        '- /hapus untuk menghapus semua domain, atau /hapus [domain] untuk domain tertentu\n'
+        '- Kirim file .txt/.csv berisi daftar domain untuk menambahkan banyak domain sekaligus\n'
+        '- /export untuk mengunduh daftar domain sebagai file\n'
         '- /daftar untuk melihat daftar domain\n'
-        '- /status untuk melihat status pengecekan otomatis'
+        '- /status untuk melihat status pengecekan otomatis\n'
+        '- /interval untuk mengatur seberapa sering domain dicek (termasuk mode adaptif)\n'
+        '- /kritis [domain] untuk menandai domain yang harus selalu sering dicek\n'
+        '- /cache untuk melihat statistik cache hasil pengecekan'
     )
     
 # Fungsi untuk perintah /cek (manual)
@@ -243,9 +231,73 @@ async def cek_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Silakan masukkan domain setelah perintah /cek. Contoh: /cek cek.com")
         return
     
-    domain_names_list = context.args
-    await update.message.reply_text(f"Sedang mengecek domain:\n**{'\n'.join(domain_names_list)}**\n... Mohon tunggu sebentar.")
-    await _perform_domain_check(domain_names_list, username, update, context)
+    want_screenshot = any(arg in SCREENSHOT_FLAGS for arg in context.args)
+    # Screenshot hanya bisa diambil dari pengecekan baru, jadi otomatis melewati cache
+    force_check = want_screenshot or any(arg in FORCE_CHECK_FLAGS for arg in context.args)
+    domain_names_list = [arg for arg in context.args if arg not in FORCE_CHECK_FLAGS + SCREENSHOT_FLAGS]
+    if not domain_names_list:
+        await update.message.reply_text("Silakan masukkan domain setelah perintah /cek. Contoh: /cek cek.com")
+        return
+
+    if force_check:
+        cached, missing = {}, domain_names_list
+    else:
+        cached, missing = result_cache.split(domain_names_list)
+    log_message(username, f"Cache: {len(cached)} hit, {len(missing)} miss{' (dipaksa cek baru)' if force_check else ''}")
+
+    results = dict(cached)
+    if missing:
+        domain_names_text = "\n".join(missing)
+        await update.message.reply_text(f"Sedang mengecek domain:\n**{domain_names_text}**\n... Mohon tunggu sebentar.")
+        fresh_results = await _perform_domain_check(missing, username, update, context, screenshot=want_screenshot)
+        if fresh_results is None and not cached:
+            return
+        results.update(fresh_results or {})
+
+    ordered = [results[domain] for domain in domain_names_list if domain in results]
+    await _send_text(update.message.reply_text, f"{RESULT_HEADER}:\n\n{_format_results(ordered, show_age=bool(cached))}")
+
+def _interval_text(seconds):
+    """Interval dalam detik sebagai teks, misalnya "1 jam" atau "30 menit"."""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600} jam"
+    return f"{seconds // 60} menit"
+
+def _activate_schedule(chat_id, username):
+    """Mengaktifkan pengecekan otomatis untuk chat jika belum aktif. Mengembalikan True jika baru diaktifkan."""
+    if batch_scheduler.is_active(chat_id):
+        return False
+    # Menyimpan waktu mulai jadwal ke database; interval per chat (jika pernah diatur) tetap dipakai
+    start_time = datetime.now()
+    domain_store.save_schedule(chat_id, username, start_time)
+    interval, adaptive = domain_store.get_interval(chat_id)
+    batch_scheduler.add_chat(chat_id, username, start_time, interval=interval, adaptive=adaptive)
+    return True
+
+def _current_interval(chat_id):
+    """Interval efektif chat (detik) dan status mode adaptif."""
+    interval, adaptive = domain_store.get_interval(chat_id)
+    return interval or CHECK_INTERVAL_SECONDS, adaptive
+
+def _deactivate_schedule(chat_id):
+    """Menghentikan pengecekan otomatis dan melupakan status yang sudah diberitahukan ke chat."""
+    domain_store.delete_schedule(chat_id)
+    batch_scheduler.remove_chat(chat_id)
+    status_history.forget_chat(chat_id)
+
+def _domain_list_text(domains, prefix="", limit=DOMAIN_LIST_PREVIEW_LIMIT):
+    """Daftar domain untuk pesan Telegram; daftar yang panjang dipotong agar tidak melewati batas pesan."""
+    text = "\n".join(f"{prefix}{domain}" for domain in domains[:limit])
+    if len(domains) > limit:
+        text += f"\n... dan {len(domains) - limit} domain lainnya. Gunakan /export untuk daftar lengkap."
+    return text
+
+def _short_list(domains, limit=20):
+    """Daftar domain dalam satu baris untuk pesan konfirmasi."""
+    text = "**" + "**, **".join(domains[:limit]) + "**"
+    if len(domains) > limit:
+        text += f" dan {len(domains) - limit} lainnya"
+    return text
 
 # Fungsi untuk perintah /tambah
 async def tambah_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -256,56 +308,105 @@ async def tambah_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     chat_id = update.message.chat_id
-    # Menghilangkan spasi ekstra di awal/akhir setiap domain sebelum diproses
-    domains_to_add = [arg.strip().lower() for arg in context.args] 
-    domains = load_domains(chat_id, username)
-    
-    added_domains = []
-    skipped_domains = []
+    # Merapikan input (huruf kecil, tanpa http:// atau path) dan membuang yang bukan domain
+    domains_to_add = [normalize_domain(arg) for arg in context.args]
+    invalid_count = domains_to_add.count(None)
+    domains_to_add = [domain for domain in domains_to_add if domain]
     
-    is_first_domain_added = not domains
-    
-    for domain in domains_to_add:
-        if domain not in domains:
-            domains.append(domain)
-            added_domains.append(domain)
-        else:
-            skipped_domains.append(domain)
+    # Semua domain baru ditulis dalam satu transaksi, duplikat disaring dengan set
+    added_domains, skipped_domains = domain_store.add_domains(chat_id, username, domains_to_add)
             
     if added_domains:
-        save_domains(domains, chat_id, username)
-        added_text = "**" + "**, **".join(added_domains) + "**"
+        added_text = _short_list(added_domains)
         
-        if is_first_domain_added:
-            job_name = f"automatic_check_{chat_id}"
-            # Menyimpan waktu mulai job ke file
-            start_time = datetime.now()
-            save_schedule(chat_id, username, start_time)
-            
-            context.job_queue.run_repeating(cek_otomatis, interval=CHECK_INTERVAL_SECONDS, first=CHECK_INTERVAL_SECONDS, chat_id=chat_id, name=job_name, data={'username': username})
-            await update.message.reply_text(f"Domain {added_text} telah ditambahkan dan pengecekan otomatis setiap 1 jam telah diaktifkan!")
+        if _activate_schedule(chat_id, username):
+            interval, _ = _current_interval(chat_id)
+            await update.message.reply_text(f"Domain {added_text} telah ditambahkan dan pengecekan otomatis setiap {_interval_text(interval)} telah diaktifkan!")
         else:
             await update.message.reply_text(f"Domain {added_text} telah ditambahkan ke daftar cek otomatis.")
     
     if skipped_domains:
-        skipped_text = "**" + "**, **".join(skipped_domains) + "**"
+        skipped_text = _short_list(skipped_domains)
         await update.message.reply_text(f"Domain {skipped_text} sudah ada di daftar dan dilewati.")
 
+    if invalid_count:
+        await update.message.reply_text(f"{invalid_count} input bukan nama domain yang valid dan dilewati.")
+
+
+# Fungsi untuk menerima file .txt/.csv berisi daftar domain
+async def impor_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    document = update.message.document
+    log_message(username, f"Impor file domain: {document.file_name} ({document.file_size} byte)")
+    chat_id = update.message.chat_id
+
+    telegram_file = await document.get_file()
+    buffer = io.BytesIO()
+    await telegram_file.download_to_memory(buffer)
+    buffer.seek(0)
+    # Dibaca baris per baris; karakter yang tidak valid diganti agar satu baris rusak tidak menggagalkan seluruh file
+    lines = io.TextIOWrapper(buffer, encoding="utf-8-sig", errors="replace", newline="")
+    domains_to_add, invalid_count = parse_domain_lines(lines)
+
+    if not domains_to_add:
+        await update.message.reply_text("Tidak ada domain valid di file tersebut. Kirim file .txt/.csv dengan satu domain per baris.")
+        return
+
+    added_domains, skipped_domains = domain_store.add_domains(chat_id, username, domains_to_add)
+    activated = bool(added_domains) and _activate_schedule(chat_id, username)
+    log_message(username, f"Impor selesai: {len(added_domains)} ditambahkan, {len(skipped_domains)} sudah ada, {invalid_count} tidak valid.")
+
+    message = (
+        f"Impor selesai dari {document.file_name}:\n"
+        f"- Ditambahkan: {len(added_domains)}\n"
+        f"- Sudah ada (dilewati): {len(skipped_domains)}\n"
+        f"- Tidak valid (dilewati): {invalid_count}"
+    )
+    if activated:
+        interval, _ = _current_interval(chat_id)
+        message += f"\n\nPengecekan otomatis setiap {_interval_text(interval)} telah diaktifkan!"
+    await update.message.reply_text(message)
+
+
+# Fungsi untuk perintah /export
+async def export_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    log_message(username, "Perintah /export")
+    chat_id = update.message.chat_id
+    domains = domain_store.get_domains(chat_id)
+    if not domains:
+        await update.message.reply_text("Daftar domain untuk cek otomatis masih kosong. Gunakan /tambah untuk menambahkannya.")
+        return
+    content = ("\n".join(domains) + "\n").encode("utf-8")
+    await update.message.reply_document(
+        document=InputFile(io.BytesIO(content), filename=f"domains_{chat_id}.txt"),
+        caption=f"Daftar {len(domains)} domain untuk cek otomatis.",
+    )
+
 
 # Fungsi untuk perintah /hapus
 async def hapus_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
     username = update.message.from_user.username or f"user_{update.message.from_user.id}"
     log_message(username, "Perintah /hapus")
     chat_id = update.message.chat_id
-    domains = load_domains(chat_id, username)
-    if domains:
-        save_domains([], chat_id, username)
-        delete_schedule_file(chat_id, username) # Menghapus file jadwal
-        
-        job_name = f"automatic_check_{chat_id}"
-        current_jobs = context.job_queue.get_jobs_by_name(job_name)
-        for job in current_jobs:
-            job.schedule_removal()
+
+    if context.args:
+        # /hapus domain1 domain2 ... hanya menghapus domain yang disebutkan
+        domains_to_remove = [normalize_domain(arg) or arg.strip().lower() for arg in context.args]
+        removed_domains, missing_domains = domain_store.remove_domains(chat_id, domains_to_remove)
+        if removed_domains:
+            status_history.forget_chat(chat_id, removed_domains)
+            message = f"Domain {_short_list(removed_domains)} telah dihapus dari daftar cek otomatis."
+            if not domain_store.has_domains(chat_id):
+                _deactivate_schedule(chat_id)
+                message += " Daftar sekarang kosong, jadwal pengecekan otomatis dibatalkan."
+            await update.message.reply_text(message)
+        if missing_domains:
+            await update.message.reply_text(f"Domain {_short_list(missing_domains)} tidak ada di daftar.")
+        return
+
+    if domain_store.clear_domains(chat_id):
+        _deactivate_schedule(chat_id)
         
         await update.message.reply_text("Semua domain telah berhasil dihapus dari daftar cek otomatis. Jadwal pengecekan otomatis juga telah dibatalkan.")
     else:
@@ -317,10 +418,10 @@ async def lihat_daftar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     username = update.message.from_user.username or f"user_{update.message.from_user.id}"
     log_message(username, "Perintah /daftar")
     chat_id = update.message.chat_id
-    domains = load_domains(chat_id, username)
+    domains = domain_store.get_domains(chat_id)
     if domains:
-        domain_list_text = "\n".join(domains)
-        await update.message.reply_text(f"Daftar domain untuk cek otomatis:\n\n{domain_list_text}")
+        domain_list_text = _domain_list_text(domains)
+        await update.message.reply_text(f"Daftar {len(domains)} domain untuk cek otomatis:\n\n{domain_list_text}")
     else:
         await update.message.reply_text("Daftar domain untuk cek otomatis masih kosong. Gunakan /tambah untuk menambahkannya.")
 
@@ -329,21 +430,35 @@ async def cek_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     username = update.message.from_user.username or f"user_{update.message.from_user.id}"
     log_message(username, "Perintah /status")
     chat_id = update.message.chat_id
-    job_name = f"automatic_check_{chat_id}"
-    current_jobs = context.job_queue.get_jobs_by_name(job_name)
-    domains = load_domains(chat_id, username)
+    next_run_time = batch_scheduler.next_due(chat_id)
+    domains = domain_store.get_domains(chat_id)
     
-    if current_jobs:
-        # Pengecekan otomatis aktif
-        next_run_time_utc = current_jobs[0].next_run_time
-        next_run_time_local = next_run_time_utc + timedelta(hours=7)
-        next_run_time_str = next_run_time_local.strftime("%H:%M:%S")
-
-        status_message = f"Pengecekan otomatis sedang aktif. Pengecekan berikutnya dijadwalkan pada {next_run_time_str}."
+    if next_run_time:
+        # Pengecekan otomatis aktif (waktu jadwal disimpan dalam waktu lokal server)
+        next_run_time_str = next_run_time.strftime("%H:%M:%S")
+
+        interval, adaptive = _current_interval(chat_id)
+        mode_text = "adaptif" if adaptive else "tetap"
+        status_message = (
+            f"Pengecekan otomatis sedang aktif setiap {_interval_text(interval)} (mode {mode_text}). "
+            f"Pengecekan berikutnya dijadwalkan pada {next_run_time_str}."
+        )
+
+        if circuit_breaker is not None and circuit_breaker.state != CLOSED:
+            status_message += "\nSitus pengecekan sedang bermasalah; pengecekan ditunda dan dicoba lagi otomatis."
+
+        queue_position = check_queue.position(chat_id)
+        if queue_position:
+            state, position, eta_seconds = queue_position
+            if state == "berjalan":
+                status_message += "\nPengecekan untuk domainmu sedang berjalan sekarang."
+            else:
+                eta_str = (datetime.now() + timedelta(seconds=eta_seconds)).strftime("%H:%M:%S")
+                status_message += f"\nPengecekan untuk domainmu sedang antre di posisi {position}, perkiraan mulai pukul {eta_str}."
         
         if domains:
-            domain_list_text = "\n- ".join(domains)
-            status_message += f"\n\nDomain yang sedang dipantau:\n- {domain_list_text}"
+            domain_list_text = _domain_list_text(domains, prefix="- ")
+            status_message += f"\n\nDomain yang sedang dipantau:\n{domain_list_text}"
         else:
             status_message += "\n\nNamun, daftar domain untuk pengecekan otomatis kosong. Gunakan /tambah untuk menambahkan domain."
 
@@ -353,93 +468,353 @@ async def cek_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Pengecekan otomatis tidak sedang berjalan. Gunakan perintah /tambah untuk menambahkan domain dan mengaktifkannya.")
 
 
-# Fungsi yang akan dijalankan oleh JobQueue setiap 1 jam
-async def cek_otomatis(context: ContextTypes.DEFAULT_TYPE):
-    chat_id = context.job.chat_id
-    username = context.job.data.get('username', f"user_{chat_id}")
-    
-    log_message(username, f"Mulai proses pengecekan otomatis (chat ID: {chat_id})")
+# Fungsi untuk perintah /interval
+async def atur_interval(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    log_message(username, "Perintah /interval")
+    chat_id = update.message.chat_id
+    interval, adaptive = _current_interval(chat_id)
 
-    domains_to_check = load_domains(chat_id, username)
-    if domains_to_check:
-        domain_names_text = "\n".join(domains_to_check)
-        await context.bot.send_message(chat_id=chat_id, text=f"Sedang menjalankan pengecekan otomatis untuk domain:\n**{domain_names_text}**\n... Mohon tunggu sebentar.")
-        
-        await _perform_domain_check(domains_to_check, username, None, context)
+    if not context.args:
+        mode_text = "adaptif" if adaptive else "tetap"
+        await update.message.reply_text(
+            f"Interval pengecekan otomatis: setiap {_interval_text(interval)} (mode {mode_text}).\n\n"
+            "Cara mengubah:\n"
+            "- /interval [menit] untuk mengatur interval, contoh: /interval 30\n"
+            "- /interval adaptif agar domain yang stabil makin jarang dicek\n"
+            "- /interval tetap untuk kembali mengecek semua domain setiap interval\n"
+            "- /kritis [domain] untuk menandai domain yang harus selalu sering dicek"
+        )
+        return
+
+    arg = context.args[0].lower()
+    new_interval, new_adaptive = interval, adaptive
+    if arg == "adaptif":
+        new_adaptive = True
+    elif arg == "tetap":
+        new_adaptive = False
+    elif arg.isdigit():
+        new_interval = int(arg) * 60
+        if not MIN_CHECK_INTERVAL_SECONDS <= new_interval <= ADAPTIVE_MAX_INTERVAL_SECONDS:
+            await update.message.reply_text(
+                f"Interval harus antara {MIN_CHECK_INTERVAL_SECONDS // 60} dan {ADAPTIVE_MAX_INTERVAL_SECONDS // 60} menit."
+            )
+            return
     else:
-        job_name = f"automatic_check_{chat_id}"
-        current_jobs = context.job_queue.get_jobs_by_name(job_name)
-        for job in current_jobs:
-            job.schedule_removal()
-            
-        await context.bot.send_message(chat_id=chat_id, text="Daftar domain untuk cek otomatis kosong. Pengecekan otomatis dihentikan.")
+        await update.message.reply_text("Format tidak dikenali. Contoh: /interval 30, /interval adaptif, atau /interval tetap")
+        return
+
+    stored_interval = None if new_interval == CHECK_INTERVAL_SECONDS else new_interval
+    domain_store.set_interval(chat_id, username, stored_interval, new_adaptive)
+    if batch_scheduler.is_active(chat_id):
+        # Jadwal dihitung ulang mulai sekarang dengan pengaturan baru
+        start_time = datetime.now()
+        domain_store.save_schedule(chat_id, username, start_time)
+        batch_scheduler.add_chat(chat_id, username, start_time, interval=stored_interval, adaptive=new_adaptive)
+
+    mode_text = "adaptif" if new_adaptive else "tetap"
+    await update.message.reply_text(f"Pengecekan otomatis diatur setiap {_interval_text(new_interval)} (mode {mode_text}).")
+
+
+# Fungsi untuk perintah /kritis
+async def tandai_kritis(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    log_message(username, "Perintah /kritis")
+    chat_id = update.message.chat_id
+
+    if not context.args:
+        critical = domain_store.get_critical(chat_id)
+        if critical:
+            await update.message.reply_text(f"Domain kritis (dicek setiap {_interval_text(MIN_CHECK_INTERVAL_SECONDS)} dalam mode adaptif):\n\n{_domain_list_text(critical)}")
+        else:
+            await update.message.reply_text("Belum ada domain kritis. Contoh: /kritis domainku.com (atau /kritis hapus domainku.com untuk melepas tanda).")
+        return
+
+    unmark = context.args[0].lower() == "hapus"
+    args = context.args[1:] if unmark else context.args
+    domains = [normalize_domain(arg) or arg.strip().lower() for arg in args]
+    updated = domain_store.set_critical(chat_id, domains, critical=not unmark)
+    missing = [domain for domain in domains if domain not in updated]
+
+    if updated:
+        action = "tidak lagi ditandai kritis" if unmark else "ditandai kritis"
+        await update.message.reply_text(f"Domain {_short_list(updated)} {action}.")
+    if missing:
+        await update.message.reply_text(f"Domain {_short_list(missing)} tidak ada di daftar. Tambahkan dulu dengan /tambah.")
+
+
+# Fungsi untuk perintah /metrics (khusus admin)
+async def lihat_metrik(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    log_message(username, "Perintah /metrics")
+    if update.message.from_user.id not in ADMIN_IDS:
+        await update.message.reply_text("Perintah ini hanya untuk admin bot.")
+        return
+    await update.message.reply_text(f"Metrik bot:\n\n{metrics.summary_text()}")
+
+
+# Fungsi untuk perintah /cache
+async def cek_cache(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    username = update.message.from_user.username or f"user_{update.message.from_user.id}"
+    log_message(username, "Perintah /cache")
+    stats = result_cache.stats()
+    await update.message.reply_text(
+        "Statistik cache hasil pengecekan:\n"
+        f"- Hit: {stats['hits']}\n"
+        f"- Miss: {stats['misses']}\n"
+        f"- Hit rate: {stats['hit_rate']:.1f}%\n"
+        f"- Jumlah domain tersimpan: {stats['entries']}\n"
+        f"- Masa berlaku: {stats['ttl_seconds']} detik"
+    )
+
+
+# --- PENGECEKAN OTOMATIS (DIJALANKAN OLEH BATCH SCHEDULER) ---
+
+async def _run_batch_check(domains, label, chat_ids):
+    """
+    Satu batch gabungan untuk banyak chat; hanya hasil per domain yang dipakai. Batch dari
+    scheduler sudah berukuran maksimal MAX_DOMAINS_PER_SUBMISSION, jadi dikirim utuh sebagai
+    satu submission (tidak dipecah per CHECK_SHARD_SIZE) dan hanya dicoba ulang jika gagal.
+    """
+    results, _, errors = await check_queue.submit_sharded(
+        domains, label, PRIORITY_AUTOMATIC, MAX_DOMAINS_PER_SUBMISSION, CHECK_SHARD_RETRIES, chat_ids=chat_ids
+    )
+    result_cache.put_many(results)
+    status_history.record(results)
+    if errors:
+        raise next(iter(errors.values()))
+    return results
 
+def _format_changes(changes, limit=DOMAIN_LIST_PREVIEW_LIMIT):
+    """
+    Menyusun daftar perubahan status: status lama → status baru. Perubahan sungguhan didahulukan
+    dari domain yang baru mulai dipantau; daftar yang panjang dipotong seperti _domain_list_text.
+    """
+    changes = sorted(changes, key=lambda change: change[1] is None)
+    lines = []
+    for i, (result, previous) in enumerate(changes[:limit]):
+        new_label = _status_label(result.blocked, result.status)
+        if previous is None:
+            lines.append(f"{i+1}. {result.domain} — {new_label} (mulai dipantau)")
+        else:
+            lines.append(f"{i+1}. {result.domain} — {_status_label(previous)} → {new_label}")
+    if len(changes) > limit:
+        new_count = sum(1 for _, previous in changes[limit:] if previous is None)
+        lines.append(f"... dan {len(changes) - limit} domain lainnya ({new_count} di antaranya mulai dipantau).")
+    return "\n".join(lines)
+
+async def _send_auto_results(bot, chat_id, username, results):
+    """
+    Hanya mengirim pesan jika ada domain yang berubah status, ditambah ringkasan berkala jika diaktifkan.
+    Perubahan baru dicatat sebagai sudah diberitahukan setelah pesannya terkirim, sehingga pesan yang
+    gagal dikirim diulang pada putaran berikutnya.
+    """
+    send = partial(bot.send_message, chat_id)
+    if chat_id in outage_notified_chats:
+        outage_notified_chats.discard(chat_id)
+        await bot.send_message(chat_id=chat_id, text="Situs pengecekan sudah bisa diakses lagi. Pengecekan otomatis berjalan normal kembali.")
+        log_message(username, f"Pemberitahuan pemulihan dikirim ke chat {chat_id}.")
+    changes = status_history.changes_for_chat(chat_id, results)
+    if status_history.summary_due(chat_id, SUMMARY_INTERVAL_SECONDS):
+        # Dalam mode adaptif tidak semua domain dicek setiap putaran; lengkapi dari riwayat
+        summary = [results.get(domain) or status_history.latest(domain) for domain in domain_store.get_domains(chat_id)]
+        text = f"Ringkasan pengecekan otomatis domain:\n\n{_format_results([r for r in summary if r], limit=DOMAIN_LIST_PREVIEW_LIMIT)}"
+        if changes:
+            text += f"\n\nPerubahan sejak pengecekan sebelumnya:\n{_format_changes(changes)}"
+        await _send_text(send, text)
+        status_history.mark_notified(chat_id, changes)
+        status_history.mark_summary_sent(chat_id)
+        log_message(username, f"Ringkasan pengecekan otomatis dikirim ke chat {chat_id}.")
+    elif changes:
+        await _send_text(send, f"Perubahan status domain terdeteksi:\n\n{_format_changes(changes)}")
+        status_history.mark_notified(chat_id, changes)
+        log_message(username, f"{len(changes)} perubahan status dikirim ke chat {chat_id}.")
+    else:
+        log_message(username, f"Pengecekan otomatis chat {chat_id}: tidak ada perubahan, tidak ada pesan dikirim.")
+
+async def _send_auto_error(bot, chat_id, username, error):
+    """
+    Saat situs pengecekan bermasalah (circuit breaker terbuka), setiap chat hanya menerima satu
+    pemberitahuan; error berikutnya sampai pengecekan kembali berhasil cukup dicatat di log.
+    """
+    error_message, log_prefix = _describe_error(error)
+    if chat_id in outage_notified_chats:
+        log_message(username, f"{log_prefix} (chat {chat_id} sudah diberi tahu): {_error_detail(error)}")
+        return
+    if isinstance(error, CircuitOpenError):
+        outage_notified_chats.add(chat_id)
+        error_message = ("Situs pengecekan sedang bermasalah, jadi pengecekan otomatis ditunda sementara. "
+                         "Bot terus mencoba di latar belakang dan akan memberi tahu saat pengecekan berjalan lagi.")
+    await bot.send_message(chat_id=chat_id, text=error_message)
+    log_message(username, f"{log_prefix}: {error_message} {_error_detail(error)}")
+
+async def _send_auto_stopped(bot, chat_id, username):
+    domain_store.delete_schedule(chat_id)
+    await bot.send_message(chat_id=chat_id, text="Daftar domain untuk cek otomatis kosong. Pengecekan otomatis dihentikan.")
+    log_message(username, f"Pengecekan otomatis dihentikan (chat ID: {chat_id}), daftar domain kosong.")
+
+def _select_adaptive_domains(chat_id, domains, interval):
+    """Mode adaptif: domain stabil makin jarang dicek, domain kritis/baru berubah dicek setiap MIN_CHECK_INTERVAL_SECONDS."""
+    return select_due_domains(
+        domains,
+        set(domain_store.get_critical(chat_id)),
+        status_history,
+        base_interval=interval,
+        min_interval=MIN_CHECK_INTERVAL_SECONDS,
+        max_interval=ADAPTIVE_MAX_INTERVAL_SECONDS,
+        recent_window=ADAPTIVE_RECENT_CHANGE_SECONDS,
+        backoff_factor=ADAPTIVE_BACKOFF_FACTOR,
+    )
+
+# Satu penjadwal untuk semua chat: domain yang jatuh tempo digabung, dihapus duplikatnya,
+# lalu dicek per MAX_DOMAINS_PER_SUBMISSION domain
+batch_scheduler = BatchScheduler(
+    run_check=_run_batch_check,
+    load_domains=domain_store.get_domains,
+    deliver=_send_auto_results,
+    deliver_error=_send_auto_error,
+    on_empty=_send_auto_stopped,
+    interval=CHECK_INTERVAL_SECONDS,
+    window_seconds=BATCH_WINDOW_SECONDS,
+    batch_size=MAX_DOMAINS_PER_SUBMISSION,
+    after_tick=status_history.save,
+    jitter_seconds=SCHEDULE_JITTER_SECONDS,
+    select_domains=_select_adaptive_domains,
+    adaptive_wake_seconds=MIN_CHECK_INTERVAL_SECONDS,
+)
+
+
+# Gauge dibaca saat metrik diminta, tidak perlu diperbarui manual
+metrics.gauge("nawala_browsers_active", lambda: browser_pool.active, "Sesi Chrome yang hidup")
+metrics.gauge("nawala_browsers_idle", lambda: browser_pool.idle, "Sesi Chrome yang menganggur")
+metrics.gauge("nawala_queue_depth", lambda: check_queue.depth, "Pengecekan yang menunggu di antrean")
+metrics.gauge("nawala_checks_running", lambda: check_queue.running, "Pengecekan yang sedang berjalan")
+metrics.gauge("nawala_scheduled_chats", lambda: len(batch_scheduler.chats), "Chat dengan pengecekan otomatis aktif")
+metrics.gauge("nawala_result_cache_entries", lambda: result_cache.stats()['entries'], "Domain di cache hasil")
+if circuit_breaker is not None:
+    metrics.gauge(
+        "nawala_circuit_state", lambda: {CLOSED: 0, HALF_OPEN: 1}.get(circuit_breaker.state, 2),
+        "State circuit breaker pengecekan (0 = normal, 1 = percobaan, 2 = terbuka)",
+    )
+if shared_job_queue is not None:
+    metrics.gauge("nawala_jobs_pending", lambda: shared_job_queue.counts().get("pending", 0), "Pekerjaan yang menunggu worker")
+    metrics.gauge("nawala_jobs_leased", lambda: shared_job_queue.counts().get("leased", 0), "Pekerjaan yang sedang dicek worker")
+
+async def post_init(application):
+    """Menyiapkan sesi Chrome di background agar bot langsung bisa menerima perintah."""
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+        log_message("bot", f"Endpoint metrik aktif di http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    result_cache.load()
+    status_history.load()
+    if shared_job_queue is not None:
+        # Hasil yang tidak sempat diambil sebelum bot restart tidak akan ditunggu lagi
+        purged = await asyncio.to_thread(shared_job_queue.purge_finished, JOB_WAIT_TIMEOUT_SECONDS)
+        if purged:
+            log_message("bot", f"{purged} hasil pekerjaan lama dihapus dari antrean worker.")
+    check_queue.start()
+    log_message("bot", f"Backend pengecekan: {checker.name}")
+    # Chrome hanya disiapkan di awal jika Selenium adalah backend utama; sebagai cadangan cukup dibuat saat dibutuhkan
+    if backend is selenium_checker:
+        application.create_task(asyncio.to_thread(browser_pool.start))
+
+async def post_shutdown(application):
+    """Menunggu pengecekan yang masih berjalan, lalu menutup semua sesi Chrome saat bot berhenti."""
+    # Pengecekan yang masih berjalan diselesaikan dulu agar hasilnya tetap tersimpan
+    await check_queue.stop(drain_timeout=SHUTDOWN_DRAIN_SECONDS)
+    await checker.aclose()
+    await asyncio.to_thread(browser_pool.shutdown)
+    result_cache.save()
+    status_history.save()
+    domain_store.close()
+    if shared_job_queue is not None:
+        shared_job_queue.close()
 
 def main():
     # Perbaikan di sini: Tambahkan job_queue ke ApplicationBuilder
-    application = ApplicationBuilder().token(TOKEN).build()
+    builder = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        # Update diproses bersamaan agar /daftar, /status, dll tidak menunggu /cek yang sedang berjalan
+        .concurrent_updates(UPDATE_CONCURRENCY)
+        # Request Bot API (kirim pesan/foto/dokumen) dihitung dan diukur durasinya per method
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(TELEGRAM_API_URL)
+    application = builder.build()
     
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("cek", cek_domain))
-    application.add_handler(CommandHandler("tambah", tambah_domain))
-    application.add_handler(CommandHandler("hapus", hapus_domain))
-    application.add_handler(CommandHandler("daftar", lihat_daftar))
-    application.add_handler(CommandHandler("status", cek_status))
+    commands = [
+        ("start", start),
+        ("cek", cek_domain),
+        ("tambah", tambah_domain),
+        ("hapus", hapus_domain),
+        ("daftar", lihat_daftar),
+        ("status", cek_status),
+        ("cache", cek_cache),
+        ("export", export_domain),
+        ("interval", atur_interval),
+        ("kritis", tandai_kritis),
+        ("metrics", lihat_metrik),
+    ]
+    # Setiap handler dibungkus agar durasi dan error-nya tercatat di metrik
+    for command, callback in commands:
+        application.add_handler(CommandHandler(command, timed_handler(command, callback)))
+    application.add_handler(MessageHandler(
+        filters.Document.FileExtension("txt") | filters.Document.FileExtension("csv"),
+        timed_handler("impor", impor_domain),
+    ))
     
     print("Mengecek jadwal otomatis yang tersimpan...")
     
-    # Perbaikan jalur: glob sekarang mencari dari BASE_DIR
-    file_pattern = os.path.join(DATA_FOLDER, f"domains_*.txt")
-    for filename in glob.glob(file_pattern):
-        # Perbaikan regex untuk mencocokkan nama file yang ada di folder user
-        match = re.search(r"domains_(.+)_(\d+)\.txt$", os.path.basename(filename))
-        if match:
-            username_from_file = match.group(1)
-            chat_id_from_file = int(match.group(2))
-            
-            domains = load_domains(chat_id_from_file, username_from_file)
-            start_time = load_schedule(chat_id_from_file, username_from_file)
-            
-            if domains and start_time:
-                job_name = f"automatic_check_{chat_id_from_file}"
-                
-                # Hitung waktu tunda yang diperlukan
-                now = datetime.now()
-                elapsed_time = now - start_time
-                next_check_in_seconds = CHECK_INTERVAL_SECONDS - (elapsed_time.total_seconds() % CHECK_INTERVAL_SECONDS)
-                
-                # Jika waktu tunda negatif (waktu seharusnya sudah lewat), jalankan sekarang
-                if next_check_in_seconds < 0:
-                    next_check_in_seconds = 0
-                
-                # Jadwalkan ulang pekerjaan dengan waktu tunda yang sudah dihitung
-                application.job_queue.run_repeating(
-                    cek_otomatis, 
-                    interval=CHECK_INTERVAL_SECONDS, 
-                    first=next_check_in_seconds, 
-                    chat_id=chat_id_from_file, 
-                    name=job_name,
-                    data={'username': username_from_file}
-                )
-                print(f"  -> Menjadwalkan ulang pengecekan untuk user: {username_from_file} (Chat ID: {chat_id_from_file})")
-            elif domains and not start_time:
-                # Jika file domain ada tapi file jadwal tidak ada, buat jadwal baru
-                print(f"  -> File jadwal tidak ditemukan untuk {username_from_file}. Menjadwalkan ulang dengan waktu saat ini.")
-                job_name = f"automatic_check_{chat_id_from_file}"
-                start_time = datetime.now()
-                save_schedule(chat_id_from_file, username_from_file, start_time)
-                application.job_queue.run_repeating(
-                    cek_otomatis,
-                    interval=CHECK_INTERVAL_SECONDS,
-                    first=CHECK_INTERVAL_SECONDS,
-                    chat_id=chat_id_from_file,
-                    name=job_name,
-                    data={'username': username_from_file}
-                )
-
-
-    print("Bot sudah berjalan...")
-    application.run_polling()
+    # Sekali saja: pindahkan data dari format file lama ke database
+    migrated = migrate_from_files(domain_store, DATA_FOLDER)
+    if migrated:
+        print(f"  -> {migrated} chat dimigrasikan dari file lama ke {DATABASE_FILE}")
+
+    for chat_id, username, start_time, interval, adaptive in domain_store.active_chats():
+        if start_time:
+            # Jadwal berikutnya dihitung dari start_time agar tetap sejalan dengan sebelum restart
+            batch_scheduler.add_chat(chat_id, username, start_time, interval=interval, adaptive=adaptive)
+            print(f"  -> Menjadwalkan ulang pengecekan untuk user: {username} (Chat ID: {chat_id})")
+        else:
+            # Jika domain ada tapi jadwal tidak ada, buat jadwal baru
+            print(f"  -> Jadwal tidak ditemukan untuk {username}. Menjadwalkan ulang dengan waktu saat ini.")
+            start_time = datetime.now()
+            domain_store.save_schedule(chat_id, username, start_time)
+            batch_scheduler.add_chat(chat_id, username, start_time, interval=interval, adaptive=adaptive)
+
+    # Satu job untuk semua chat, menggantikan satu job per chat
+    application.job_queue.run_repeating(batch_scheduler.tick, interval=BATCH_WINDOW_SECONDS, first=BATCH_WINDOW_SECONDS, name="batch_check")
+
+    if BOT_MODE == "webhook":
+        run_webhook(application)
+    else:
+        print("Bot sudah berjalan...")
+        application.run_polling()
+
+def run_webhook(application):
+    """
+    Mode webhook: server HTTP async bawaan python-telegram-bot (butuh python-telegram-bot[webhooks])
+    menerima update langsung dari Telegram sehingga langsung diproses tanpa jeda long polling.
+    Update tanpa header secret token yang benar ditolak.
+    """
+    if not WEBHOOK_URL:
+        print("WEBHOOK_URL wajib diisi untuk BOT_MODE=webhook, misalnya https://bot.domainku.com/telegram")
+        sys.exit(1)
+    secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    url_path = WEBHOOK_PATH if WEBHOOK_PATH is not None else urlparse(WEBHOOK_URL).path.lstrip("/")
+    print(f"Bot sudah berjalan (webhook) di {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{url_path} untuk {WEBHOOK_URL}...")
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=url_path,
+        webhook_url=WEBHOOK_URL,
+        secret_token=secret,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+    )
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
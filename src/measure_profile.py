@@ -0,0 +1,123 @@
+"""
+Mengukur manfaat mode ringan Chrome (CHROME_LEAN_MODE) terhadap salinan lokal halaman pengecekan.
+
+Simpan halaman pengecekan dengan "Save page as... (Webpage, Complete)" ke sebuah folder
+(file utamanya index.html), lalu jalankan:
+
+    python src/measure_profile.py folder_salinan --runs 5
+
+Setiap mode (standar dan ringan) dijalankan di Chrome baru; yang dilaporkan adalah rata-rata
+waktu muat halaman (Navigation Timing) dan total RSS semua proses Chrome setelah halaman dimuat.
+"""
+import argparse
+import functools
+import os
+import statistics
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from browser_pool import build_chrome_options, apply_blocked_urls, lean_blocked_urls
+from config import CHROMEDRIVER_PATH
+
+# psutil opsional; tanpa psutil RSS dibaca dari /proc (hanya Linux)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_folder(folder):
+    """Menyajikan folder salinan halaman di port acak localhost. Mengembalikan (server, url)."""
+    handler = functools.partial(_QuietHandler, directory=folder)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+def _children_linux(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+            children.extend(_children_linux(int(entry)))
+    return children
+
+def _rss_linux(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def process_tree_rss(pid, include_self=False):
+    """Total RSS semua turunan proses pid (dan pid itu sendiri jika include_self), atau None jika tidak bisa diukur."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = process.children(recursive=True) + ([process] if include_self else [])
+        except psutil.Error:
+            return None
+        total = 0
+        for child in processes:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    if os.path.isdir("/proc"):
+        pids = _children_linux(pid) + ([pid] if include_self else [])
+        return sum(_rss_linux(p) for p in pids)
+    return None
+
+def measure(url, lean, runs, driver_path):
+    """Memuat url sebanyak runs kali di satu sesi Chrome. Mengembalikan (daftar waktu muat ms, RSS byte)."""
+    service = Service(executable_path=driver_path, service_log_path=os.devnull)
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(lean))
+    try:
+        if lean:
+            apply_blocked_urls(driver, lean_blocked_urls())
+        load_times = []
+        for _ in range(runs):
+            # Cache dikosongkan agar setiap percobaan mengunduh ulang aset yang tidak diblokir
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get(url)
+            load_times.append(driver.execute_script(
+                "const t = performance.timing; return t.loadEventEnd - t.navigationStart;"
+            ))
+        # Semua proses Chrome berjalan di bawah proses chromedriver
+        return load_times, process_tree_rss(service.process.pid)
+    finally:
+        driver.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan profil Chrome standar dan ringan.")
+    parser.add_argument("folder", help="Folder salinan halaman pengecekan (berisi index.html)")
+    parser.add_argument("--runs", type=int, default=5, help="Jumlah pemuatan halaman per mode")
+    parser.add_argument("--driver", default=CHROMEDRIVER_PATH, help="Lokasi chromedriver")
+    args = parser.parse_args()
+
+    server, url = serve_folder(os.path.abspath(args.folder))
+    try:
+        for label, lean in (("standar", False), ("ringan", True)):
+            load_times, rss = measure(url, lean, args.runs, args.driver)
+            rss_text = f"{rss / 1024 / 1024:.0f} MB" if rss is not None else "tidak terukur"
+            print(f"{label:8} muat rata-rata {statistics.mean(load_times):7.0f} ms "
+                  f"(median {statistics.median(load_times):.0f} ms), RSS Chrome {rss_text}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
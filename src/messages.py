@@ -0,0 +1,34 @@
+# Batas panjang satu pesan Telegram (karakter)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Awalan balasan /cek; benchmark memakai awalan yang sama untuk membedakan hasil dari kegagalan
+RESULT_HEADER = "Hasil pengecekan domain"
+ERROR_PREFIX = "Terjadi error"
+DEFERRED_PREFIX = "Situs pengecekan sedang bermasalah"
+PARTIAL_FAILURE_PREFIX = "Sebagian domain gagal dicek"
+CHECK_FAILED_PREFIXES = (ERROR_PREFIX, DEFERRED_PREFIX, PARTIAL_FAILURE_PREFIX)
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """
+    Memecah teks panjang menjadi beberapa pesan yang masing-masing tidak melewati batas Telegram.
+    Pemecahan dilakukan di akhir baris; baris tunggal yang lebih panjang dari batas dipotong paksa.
+    """
+    chunks = []
+    current = None
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current is not None:
+                chunks.append(current)
+                current = None
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current is None:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            chunks.append(current)
+            current = line
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,208 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram.request import HTTPXRequest
+
+# Batas bucket histogram durasi (detik), dari operasi ringan sampai pengecekan ratusan domain
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+class Metrics:
+    """
+    Penampung metrik sederhana tanpa dependensi: counter, histogram durasi (span)
+    dan gauge yang nilainya dibaca saat diminta. Aman dipakai dari thread Selenium
+    maupun dari event loop. Bisa ditampilkan dalam format teks Prometheus.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def gauge(self, name, read_value, help_text=None):
+        """Mendaftarkan gauge; read_value() dipanggil setiap kali metrik diminta."""
+        self._gauges[name] = read_value
+        if help_text:
+            self.describe(name, help_text)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Mengukur durasi satu tahap: with metrics.span("wait_results"): ..."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe("nawala_stage_seconds", time.monotonic() - started, stage=stage, **labels)
+
+    # --- Keluaran ---
+
+    def _snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (h.count, h.total, h.max, list(h.buckets)) for key, h in self._histograms.items()
+            }
+        gauges = {}
+        for name, read_value in self._gauges.items():
+            try:
+                gauges[name] = read_value()
+            except Exception:
+                continue
+        return counters, histograms, gauges
+
+    @staticmethod
+    def _labels_text(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self):
+        """Semua metrik dalam format teks Prometheus (exposition format 0.0.4)."""
+        counters, histograms, gauges = self._snapshot()
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name in declared:
+                return
+            declared.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(name, "counter")
+            lines.append(f"{name}{self._labels_text(labels)} {value}")
+        for (name, labels), (count, total, _, buckets) in sorted(histograms.items()):
+            declare(name, "histogram")
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f"{name}_bucket{self._labels_text(labels, [('le', bound)])} {bucket_count}")
+            lines.append(f"{name}_bucket{self._labels_text(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{self._labels_text(labels)} {total:.6f}")
+            lines.append(f"{name}_count{self._labels_text(labels)} {count}")
+        for name, value in sorted(gauges.items()):
+            declare(name, "gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_text(self):
+        """Ringkasan yang mudah dibaca untuk perintah /metrics di Telegram."""
+        counters, histograms, gauges = self._snapshot()
+        uptime_hours = (time.time() - self.started_at) / 3600
+        lines = [f"Uptime: {uptime_hours:.1f} jam"]
+
+        if gauges:
+            lines.append("\nSaat ini:")
+            lines.extend(f"- {name}: {value}" for name, value in sorted(gauges.items()))
+        if counters:
+            lines.append("\nPenghitung:")
+            for (name, labels), value in sorted(counters.items()):
+                label_text = ", ".join(f"{k}={v}" for k, v in labels)
+                lines.append(f"- {name}{f' ({label_text})' if label_text else ''}: {value}")
+        if histograms:
+            lines.append("\nDurasi (jumlah / rata-rata / maksimum):")
+            for (name, labels), (count, total, maximum, _) in sorted(histograms.items(), key=lambda item: dict(item[0][1]).get("stage", "")):
+                labels = dict(labels)
+                stage = labels.pop("stage", name)
+                detail = ", ".join(str(v) for v in labels.values())
+                lines.append(f"- {stage}{f' ({detail})' if detail else ''}: {count}x / {total / count:.2f} dtk / {maximum:.2f} dtk")
+        return "\n".join(lines)
+
+# Satu penampung untuk seluruh bot, diisi dari modul mana pun
+metrics = Metrics()
+metrics.describe("nawala_stage_seconds", "Durasi setiap tahap pengecekan dan handler perintah")
+metrics.describe("nawala_checks_total", "Jumlah pengecekan per prioritas dan hasilnya")
+metrics.describe("nawala_domains_checked_total", "Jumlah domain yang dicek")
+metrics.describe("nawala_backend_fallbacks_total", "Backend utama gagal dan beralih ke backend cadangan")
+metrics.describe("nawala_check_failures_total", "Pengecekan gagal per jenis exception")
+metrics.describe("nawala_browser_launches_total", "Jumlah sesi Chrome yang dibuat")
+metrics.describe("nawala_telegram_requests_total", "Request ke Bot API per method (pesan, foto, dokumen, ...)")
+metrics.describe("nawala_circuit_opened_total", "Berapa kali circuit breaker pengecekan terbuka")
+metrics.describe("nawala_circuit_rejections_total", "Pengecekan yang langsung ditolak karena circuit breaker terbuka")
+metrics.describe("nawala_handler_errors_total", "Handler perintah yang berakhir dengan exception")
+
+def timed_handler(command, callback):
+    """Membungkus handler perintah agar durasi dan error-nya tercatat."""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        try:
+            with metrics.span("handler", command=command):
+                return await callback(update, context)
+        except Exception as e:
+            metrics.inc("nawala_handler_errors_total", command=command, exception=type(e).__name__)
+            raise
+    return wrapper
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest milik python-telegram-bot yang mencatat jumlah dan durasi request Bot API per method."""
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        metrics.inc("nawala_telegram_requests_total", method=api_method)
+        with metrics.span("telegram", method=api_method):
+            return await super().do_request(url, method, request_data=request_data, **kwargs)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Menjalankan endpoint /metrics gaya Prometheus di thread terpisah. Mengembalikan server-nya."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from results import DomainResult
+
+class ResultCache:
+    """
+    Cache hasil pengecekan per domain dengan masa berlaku (TTL) dan batas jumlah
+    entri (LRU: entri yang paling lama tidak dipakai dibuang lebih dulu).
+    Jika path diisi, isi cache bisa disimpan/dimuat dari file JSON.
+    """
+
+    def __init__(self, ttl_seconds, max_entries, path=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(domain):
+        return domain.strip().lower()
+
+    def _is_fresh(self, result, now=None):
+        return ((now or datetime.now()) - result.checked_at).total_seconds() <= self.ttl_seconds
+
+    def get(self, domain):
+        """Mengembalikan DomainResult jika masih segar, atau None jika tidak ada/kedaluwarsa."""
+        key = self._key(domain)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(entry):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, result):
+        """Menyimpan DomainResult; domain yang tidak ditemukan di halaman hasil tidak disimpan."""
+        if not result.found:
+            return
+        key = self._key(result.domain)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put_many(self, results):
+        for result in results.values():
+            self.put(result)
+
+    def split(self, domains):
+        """Memisahkan domain menjadi ({domain: DomainResult} yang ada di cache, [domain yang harus dicek])."""
+        cached = {}
+        missing = []
+        for domain in domains:
+            entry = self.get(domain)
+            if entry is None:
+                missing.append(domain)
+            else:
+                cached[domain] = entry
+        return cached, missing
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = (self.hits / total * 100) if total else 0.0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': hit_rate,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+    # --- Persistensi ke disk ---
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error membaca file cache {self.path}: {e}")
+            return
+        now = datetime.now()
+        try:
+            results = [DomainResult.from_dict(item) for item in data]
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Format file cache {self.path} tidak dikenali, cache diabaikan: {e}")
+            return
+        with self._lock:
+            # Urutkan dari yang paling lama agar urutan LRU tetap benar
+            for result in sorted(results, key=lambda r: r.checked_at):
+                if self._is_fresh(result, now):
+                    self._entries[self._key(result.domain)] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = [result.to_dict() for result in self._entries.values()]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f)
+        except IOError as e:
+            print(f"Error menulis ke file cache {self.path}: {e}")
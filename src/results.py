@@ -0,0 +1,44 @@
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional
+
+# Kata kunci status di halaman hasil; "not blocked" dicek lebih dulu karena juga mengandung "blocked"
+NOT_BLOCKED_KEYWORDS = ("not blocked", "tidak diblokir", "tidak terblokir", "aman")
+BLOCKED_KEYWORDS = ("blocked", "diblokir", "terblokir")
+
+def parse_blocked(status):
+    """Menentukan apakah teks status berarti terblokir (True), aman (False), atau tidak jelas (None)."""
+    if not status:
+        return None
+    text = status.lower()
+    if any(keyword in text for keyword in NOT_BLOCKED_KEYWORDS):
+        return False
+    if any(keyword in text for keyword in BLOCKED_KEYWORDS):
+        return True
+    return None
+
+@dataclass
+class DomainResult:
+    """Hasil pengecekan satu domain."""
+    domain: str
+    blocked: Optional[bool]
+    status: Optional[str]
+    checked_at: datetime
+
+    @classmethod
+    def from_status(cls, domain, status, checked_at=None):
+        return cls(domain, parse_blocked(status), status, checked_at or datetime.now())
+
+    @property
+    def found(self):
+        """False jika domain tidak muncul di tabel hasil."""
+        return self.status is not None
+
+    def to_dict(self):
+        data = asdict(self)
+        data['checked_at'] = self.checked_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['domain'], data['blocked'], data['status'], datetime.fromisoformat(data['checked_at']))
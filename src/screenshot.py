@@ -0,0 +1,83 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from selenium.webdriver.common.by import By
+
+# Pillow opsional: tanpa Pillow screenshot tetap dikirim sebagai PNG asli
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+class Screenshot:
+    """Gambar hasil pengecekan di memori, siap dikirim ke Telegram tanpa file sementara."""
+
+    def __init__(self, data, filename):
+        self.data = data
+        self.filename = filename
+        # Hash isi gambar, dipakai untuk memakai ulang file_id Telegram untuk gambar yang sama
+        self.digest = hashlib.sha256(data).hexdigest()
+
+    def as_file(self):
+        return io.BytesIO(self.data)
+
+def capture_element_png(driver, selector):
+    """
+    Mengambil screenshot elemen hasil (selector CSS) langsung sebagai byte PNG.
+    Jika elemen tidak ditemukan, seluruh body yang diambil.
+    """
+    elements = driver.find_elements(By.CSS_SELECTOR, selector) if selector else []
+    element = elements[0] if elements else driver.find_element(By.TAG_NAME, 'body')
+    return element.screenshot_as_png
+
+def compress_png(png_bytes, max_width=0, jpeg_quality=0):
+    """
+    Mengecilkan screenshot jika Pillow terpasang: diperkecil ke max_width piksel dan,
+    jika jpeg_quality diisi, di-encode ulang sebagai JPEG bila hasilnya lebih kecil.
+    Mengembalikan Screenshot.
+    """
+    if Image is None or (not max_width and not jpeg_quality):
+        return Screenshot(png_bytes, "nawala_check.png")
+
+    image = Image.open(io.BytesIO(png_bytes))
+    if max_width and image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if jpeg_quality:
+        image.convert("RGB").save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+        filename = "nawala_check.jpg"
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+        filename = "nawala_check.png"
+    data = buffer.getvalue()
+    if len(data) >= len(png_bytes):
+        return Screenshot(png_bytes, "nawala_check.png")
+    return Screenshot(data, filename)
+
+class FileIdCache:
+    """
+    Menyimpan file_id Telegram dari screenshot yang sudah pernah diunggah, berdasarkan
+    hash isinya, agar gambar yang sama cukup dikirim ulang lewat file_id tanpa upload.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            file_id = self._entries.get(digest)
+            if file_id is not None:
+                self._entries.move_to_end(digest)
+            return file_id
+
+    def put(self, digest, file_id):
+        with self._lock:
+            self._entries[digest] = file_id
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from checker import CheckerBackend
+from logs import log_message
+from results import DomainResult
+from screenshot import Screenshot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    domains TEXT NOT NULL,
+    screenshot INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_until REAL,
+    results TEXT,
+    screenshot_data BLOB,
+    screenshot_filename TEXT,
+    error_type TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, priority, id);
+"""
+
+# Exception dari worker dibangun ulang di bot agar pesan error ke pengguna tetap sama seperti mode lokal
+_KNOWN_ERRORS = {
+    "TimeoutException": TimeoutException,
+    "NoSuchElementException": NoSuchElementException,
+    "WebDriverException": WebDriverException,
+}
+
+class RemoteCheckError(Exception):
+    """Pengecekan gagal di worker dengan exception yang tidak dikenali bot."""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+class SharedJobQueue:
+    """
+    Antrean pekerjaan pengecekan bersama di satu file SQLite (mode WAL) yang bisa dipakai
+    beberapa proses di satu mesin (WAL tidak berfungsi di filesystem jaringan): bot memasukkan
+    pekerjaan, worker mengambilnya dengan lease. Pekerjaan yang lease-nya habis (worker mati/hang)
+    bisa diambil worker lain sampai max_attempts kali, setelah itu ditandai gagal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # isolation_level=None: transaksi diatur manual dengan BEGIN IMMEDIATE saat mengambil pekerjaan
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Sisi bot ---
+
+    def enqueue(self, domains, label, priority, screenshot=False, max_attempts=3):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (priority, label, domains, screenshot, max_attempts, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (priority, label, json.dumps(list(domains)), 1 if screenshot else 0, max(1, max_attempts), time.time()),
+            )
+        return cursor.lastrowid
+
+    def get_finished(self, job_id):
+        """Mengembalikan baris pekerjaan jika sudah selesai/gagal, atau None jika belum."""
+        with self._lock:
+            self._expire_leases()
+            row = self._conn.execute(
+                "SELECT status, results, screenshot_data, screenshot_filename, error_type, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None or row[0] not in ("done", "failed"):
+            return None
+        return row
+
+    def delete(self, job_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def cancel(self, job_id):
+        """Membatalkan pekerjaan yang belum diambil worker (misalnya karena bot berhenti menunggu)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ? AND status = 'pending'", (job_id,))
+
+    def purge_finished(self, max_age_seconds):
+        """Menghapus pekerjaan selesai yang tidak pernah diambil hasilnya (misalnya bot restart)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (time.time() - max_age_seconds,)
+            )
+        return cursor.rowcount
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    # --- Sisi worker ---
+
+    def _expire_leases(self):
+        """Pekerjaan dengan lease habis yang sudah mencapai max_attempts ditandai gagal."""
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', error_type = 'WorkerLost', "
+            "error = 'Worker berhenti atau tidak merespons saat mengecek domain.', finished_at = ? "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+            (time.time(), time.time()),
+        )
+
+    def claim(self, worker_id, lease_seconds):
+        """
+        Mengambil satu pekerjaan (prioritas terkecil lalu paling lama) secara atomik:
+        yang masih pending, atau yang lease-nya habis dan masih boleh dicoba ulang.
+        Mengembalikan dict pekerjaan atau None jika antrean kosong.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_leases()
+                row = self._conn.execute(
+                    "SELECT id, priority, label, domains, screenshot, attempts FROM jobs "
+                    "WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                    "ORDER BY priority, id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker_id = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (worker_id, now + lease_seconds, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        job_id, priority, label, domains, screenshot, attempts = row
+        return {
+            "id": job_id, "priority": priority, "label": label, "domains": json.loads(domains),
+            "screenshot": bool(screenshot), "attempt": attempts + 1,
+        }
+
+    def extend_lease(self, job_id, worker_id, lease_seconds):
+        """Memperpanjang lease selama pengecekan masih berjalan. False jika pekerjaan sudah diambil alih."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, results, shot=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', results = ?, screenshot_data = ?, screenshot_filename = ?, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (
+                    json.dumps([result.to_dict() for result in results.values()]),
+                    shot.data if shot else None,
+                    shot.filename if shot else None,
+                    time.time(), job_id, worker_id,
+                ),
+            )
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Mencatat kegagalan pengecekan. Pekerjaan langsung ditandai gagal tanpa dikembalikan ke
+        antrean: percobaan ulang otomatis hanya untuk worker yang mati (lease habis), sedangkan
+        error pengecekan biasa diteruskan ke bot yang punya aturan coba ulang dan circuit breaker sendiri.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error_type = ?, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                # Exception Selenium menyimpan pesan aslinya di .msg; str() menambahkan awalan "Message:"
+                (type(error).__name__, getattr(error, "msg", None) or str(error), time.time(), job_id, worker_id),
+            )
+
+class QueueChecker(CheckerBackend):
+    """
+    Backend untuk CHECK_MODE=queue: pengecekan tidak dijalankan di proses bot, melainkan
+    dimasukkan ke SharedJobQueue lalu ditunggu hasilnya dari worker (src/worker.py).
+    """
+
+    name = "queue"
+    supports_screenshot = True
+
+    def __init__(self, queue, poll_seconds=0.5, wait_timeout=600, max_attempts=3):
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self.wait_timeout = wait_timeout
+        self.max_attempts = max_attempts
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        job_id = await asyncio.to_thread(
+            self.queue.enqueue, domain_names_list, username, 1 if priority is None else priority, screenshot, self.max_attempts
+        )
+        log_message(username, f"Pekerjaan #{job_id} ({len(domain_names_list)} domain) dikirim ke antrean worker.")
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while True:
+                row = await asyncio.to_thread(self.queue.get_finished, job_id)
+                if row is not None:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Tidak ada worker yang menyelesaikan pekerjaan #{job_id} dalam {self.wait_timeout} detik.")
+                await asyncio.sleep(self.poll_seconds)
+        except BaseException:
+            await asyncio.to_thread(self.queue.cancel, job_id)
+            raise
+
+        await asyncio.to_thread(self.queue.delete, job_id)
+        status, results_json, shot_data, shot_filename, error_type, error = row
+        if status == "failed":
+            error_class = _KNOWN_ERRORS.get(error_type)
+            raise error_class(error) if error_class else RemoteCheckError(error_type, error)
+
+        results = {}
+        for item in json.loads(results_json):
+            result = DomainResult.from_dict(item)
+            results[result.domain] = result
+        shot = Screenshot(shot_data, shot_filename) if shot_data else None
+        log_message(username, f"Hasil pekerjaan #{job_id} diterima dari worker.")
+        return {domain: results.get(domain) or DomainResult.from_status(domain, None) for domain in domain_names_list}, shot
@@ -0,0 +1,265 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL REFERENCES chats(chat_id) ON DELETE CASCADE,
+    domain TEXT NOT NULL,
+    critical INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (chat_id, domain)
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    chat_id INTEGER PRIMARY KEY REFERENCES chats(chat_id) ON DELETE CASCADE,
+    start_time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_settings (
+    chat_id INTEGER PRIMARY KEY REFERENCES chats(chat_id) ON DELETE CASCADE,
+    interval_seconds INTEGER,
+    adaptive INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class DomainStore:
+    """
+    Penyimpanan daftar domain dan jadwal semua chat dalam satu database SQLite
+    (mode WAL). Setiap perubahan ditulis per baris dalam satu transaksi, bukan
+    menulis ulang seluruh daftar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _upsert_chat(self, chat_id, username):
+        self._conn.execute(
+            "INSERT INTO chats (chat_id, username) VALUES (?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET username = excluded.username",
+            (chat_id, username),
+        )
+
+    # --- Domain ---
+
+    def get_domains(self, chat_id):
+        """Daftar domain sebuah chat sesuai urutan penambahan."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT domain FROM subscriptions WHERE chat_id = ? ORDER BY id", (chat_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def has_domains(self, chat_id):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM subscriptions WHERE chat_id = ? LIMIT 1", (chat_id,)).fetchone()
+        return row is not None
+
+    def add_domains(self, chat_id, username, domains):
+        """
+        Menambahkan domain dalam satu transaksi. Duplikat (di input maupun yang sudah
+        tersimpan) disaring dengan set, lalu hanya domain baru yang ditulis.
+        Mengembalikan (ditambahkan, sudah_ada).
+        """
+        added = []
+        skipped = []
+        with self._lock, self._conn:
+            self._upsert_chat(chat_id, username)
+            existing = {row[0] for row in self._conn.execute(
+                "SELECT domain FROM subscriptions WHERE chat_id = ?", (chat_id,)
+            )}
+            for domain in domains:
+                if domain in existing:
+                    skipped.append(domain)
+                else:
+                    existing.add(domain)
+                    added.append(domain)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO subscriptions (chat_id, domain) VALUES (?, ?)",
+                ((chat_id, domain) for domain in added),
+            )
+        return added, skipped
+
+    def remove_domains(self, chat_id, domains):
+        """Menghapus domain tertentu dalam satu transaksi. Mengembalikan (dihapus, tidak_ada)."""
+        with self._lock, self._conn:
+            existing = {row[0] for row in self._conn.execute(
+                "SELECT domain FROM subscriptions WHERE chat_id = ?", (chat_id,)
+            )}
+            removed = [domain for domain in dict.fromkeys(domains) if domain in existing]
+            missing = [domain for domain in dict.fromkeys(domains) if domain not in existing]
+            self._conn.executemany(
+                "DELETE FROM subscriptions WHERE chat_id = ? AND domain = ?",
+                ((chat_id, domain) for domain in removed),
+            )
+        return removed, missing
+
+    def clear_domains(self, chat_id):
+        """Menghapus semua domain sebuah chat. Mengembalikan jumlah domain yang dihapus."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,))
+        return cursor.rowcount
+
+    def set_critical(self, chat_id, domains, critical=True):
+        """Menandai (atau menghapus tanda) domain kritis. Mengembalikan domain yang ada di daftar chat."""
+        with self._lock, self._conn:
+            updated = []
+            for domain in domains:
+                cursor = self._conn.execute(
+                    "UPDATE subscriptions SET critical = ? WHERE chat_id = ? AND domain = ?",
+                    (1 if critical else 0, chat_id, domain),
+                )
+                if cursor.rowcount:
+                    updated.append(domain)
+        return updated
+
+    def get_critical(self, chat_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT domain FROM subscriptions WHERE chat_id = ? AND critical = 1 ORDER BY id", (chat_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # --- Jadwal ---
+
+    def save_schedule(self, chat_id, username, start_time):
+        with self._lock, self._conn:
+            self._upsert_chat(chat_id, username)
+            self._conn.execute(
+                "INSERT INTO schedules (chat_id, start_time) VALUES (?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET start_time = excluded.start_time",
+                (chat_id, start_time.isoformat()),
+            )
+
+    def load_schedule(self, chat_id):
+        with self._lock:
+            row = self._conn.execute("SELECT start_time FROM schedules WHERE chat_id = ?", (chat_id,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def delete_schedule(self, chat_id):
+        """Menghentikan jadwal chat; pengaturan /interval di chat_settings tetap disimpan."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM schedules WHERE chat_id = ?", (chat_id,))
+
+    def set_interval(self, chat_id, username, interval_seconds=None, adaptive=None):
+        """
+        Menyimpan interval pengecekan per chat (None = interval default) dan/atau mode adaptif.
+        Parameter yang dibiarkan None untuk adaptive tidak diubah.
+        """
+        with self._lock, self._conn:
+            self._upsert_chat(chat_id, username)
+            self._conn.execute(
+                "INSERT INTO chat_settings (chat_id, interval_seconds) VALUES (?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET interval_seconds = excluded.interval_seconds",
+                (chat_id, interval_seconds),
+            )
+            if adaptive is not None:
+                self._conn.execute("UPDATE chat_settings SET adaptive = ? WHERE chat_id = ?", (1 if adaptive else 0, chat_id))
+
+    def get_interval(self, chat_id):
+        """Mengembalikan (interval_detik atau None, adaptif)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT interval_seconds, adaptive FROM chat_settings WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def active_chats(self):
+        """
+        Semua chat yang punya minimal satu domain, beserta username, waktu mulai
+        jadwal (None jika belum ada), interval per chat (None = default) dan mode
+        adaptif, dalam satu query untuk startup bot.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.chat_id, c.username, s.start_time, cs.interval_seconds, COALESCE(cs.adaptive, 0) FROM chats c "
+                "LEFT JOIN schedules s ON s.chat_id = c.chat_id "
+                "LEFT JOIN chat_settings cs ON cs.chat_id = c.chat_id "
+                "WHERE EXISTS (SELECT 1 FROM subscriptions sub WHERE sub.chat_id = c.chat_id)"
+            ).fetchall()
+        return [
+            (chat_id, username, datetime.fromisoformat(start_time) if start_time else None, interval_seconds, bool(adaptive))
+            for chat_id, username, start_time, interval_seconds, adaptive in rows
+        ]
+
+    # --- Meta ---
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+# --- MIGRASI DARI FORMAT FILE LAMA (domains_*.txt / schedule_*.json) ---
+
+def migrate_from_files(store, data_folder):
+    """
+    Memindahkan data dari file domains_*.txt dan schedule_*.json ke database, sekali saja.
+    File lama tidak dihapus agar tetap ada sebagai cadangan.
+    Mengembalikan jumlah chat yang dimigrasikan.
+    """
+    if store.get_meta("files_migrated"):
+        return 0
+
+    migrated = 0
+    for filename in glob.glob(os.path.join(data_folder, "domains_*.txt")):
+        basename = os.path.basename(filename)
+        # Format baru: domains_{username}_{chat_id}.txt, format lama: domains_{chat_id}.txt
+        match = re.search(r"^domains_(?:(.+)_)?(-?\d+)\.txt$", basename)
+        if not match:
+            print(f"  -> Melewati file dengan nama tidak dikenal: {basename}")
+            continue
+        chat_id = int(match.group(2))
+        username = match.group(1) or f"user_{chat_id}"
+        try:
+            with open(filename, "r") as f:
+                domains = [line.strip() for line in f if line.strip()]
+        except IOError as e:
+            print(f"Error membaca file {filename}: {e}")
+            continue
+
+        if domains:
+            store.add_domains(chat_id, username, domains)
+
+        schedule_name = basename.replace("domains_", "schedule_", 1)[:-len(".txt")] + ".json"
+        schedule_path = os.path.join(data_folder, schedule_name)
+        if os.path.exists(schedule_path):
+            try:
+                with open(schedule_path, "r") as f:
+                    start_time = datetime.fromisoformat(json.load(f)["start_time"])
+                store.save_schedule(chat_id, username, start_time)
+            except (IOError, json.JSONDecodeError, KeyError, ValueError) as e:
+                print(f"Error membaca atau memproses file jadwal {schedule_path}: {e}")
+
+        migrated += 1
+        print(f"  -> Migrasi {len(domains)} domain untuk user: {username} (Chat ID: {chat_id})")
+
+    store.set_meta("files_migrated", datetime.now().isoformat())
+    return migrated
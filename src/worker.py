@@ -0,0 +1,110 @@
+"""
+Worker pengecekan untuk CHECK_MODE=queue. Worker mengambil pekerjaan dari antrean bersama
+(JOB_QUEUE_FILE), mengecek domain dengan backend CHECKER_BACKEND, lalu menyimpan hasilnya
+untuk dikirim bot. Jalankan sebanyak yang dibutuhkan di mesin yang sama dengan bot (antrean
+SQLite tidak boleh dibagi lewat folder jaringan):
+
+    python src/worker.py --id worker-1 --concurrency 4
+
+Worker bisa ditambah atau dihentikan kapan saja tanpa mengubah bot. Ctrl+C / SIGTERM
+menghentikan pengambilan pekerjaan baru dan menunggu pengecekan yang sedang berjalan.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+from config import (
+    CHECKER_BACKEND, JOB_QUEUE_FILE, JOB_LEASE_SECONDS, JOB_POLL_SECONDS, WORKER_CONCURRENCY, METRICS_HOST,
+)
+from backends import build_browser_pool, build_selenium_checker, build_checker
+from shared_queue import SharedJobQueue
+from metrics import metrics, start_metrics_server
+from logs import log_message
+
+metrics.describe("nawala_worker_jobs_total", "Pekerjaan dari antrean bersama yang diproses worker ini")
+
+async def _keep_lease(queue, job, worker_id, lease_seconds):
+    """Memperpanjang lease secara berkala selama pengecekan berjalan."""
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        extended = await asyncio.to_thread(queue.extend_lease, job["id"], worker_id, lease_seconds)
+        if not extended:
+            log_message(worker_id, f"Lease pekerjaan #{job['id']} sudah diambil alih worker lain.")
+            return
+
+async def _process(queue, checker, job, worker_id, lease_seconds):
+    label = f"{worker_id}:{job['label']}"
+    log_message(worker_id, f"Mengecek pekerjaan #{job['id']} ({len(job['domains'])} domain, percobaan ke-{job['attempt']}).")
+    heartbeat = asyncio.create_task(_keep_lease(queue, job, worker_id, lease_seconds))
+    try:
+        with metrics.span("check", priority="worker"):
+            results, shot = await checker.check(job["domains"], label, screenshot=job["screenshot"])
+    except Exception as e:
+        log_message(worker_id, f"ERROR pekerjaan #{job['id']}: {type(e).__name__}: {e}")
+        metrics.inc("nawala_worker_jobs_total", result="error")
+        await asyncio.to_thread(queue.fail, job["id"], worker_id, e)
+        return
+    finally:
+        heartbeat.cancel()
+    metrics.inc("nawala_worker_jobs_total", result="ok")
+    metrics.inc("nawala_domains_checked_total", len(job["domains"]))
+    await asyncio.to_thread(queue.complete, job["id"], worker_id, results, shot)
+
+async def _slot(queue, checker, worker_id, lease_seconds, poll_seconds, stopping):
+    """Satu slot pengecekan: ambil pekerjaan, cek, ulangi sampai worker diminta berhenti."""
+    while not stopping.is_set():
+        job = await asyncio.to_thread(queue.claim, worker_id, lease_seconds)
+        if job is None:
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await _process(queue, checker, job, worker_id, lease_seconds)
+
+async def run_worker(worker_id, concurrency, queue_file, lease_seconds, poll_seconds):
+    queue = SharedJobQueue(queue_file)
+    pool = build_browser_pool(size=concurrency)
+    selenium_checker = build_selenium_checker(pool, max_workers=concurrency)
+    checker = build_checker(CHECKER_BACKEND, selenium_checker, max_connections=concurrency)
+    if checker is selenium_checker:
+        await asyncio.to_thread(pool.start)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: SIGINT tetap menjadi KeyboardInterrupt
+            pass
+
+    log_message(worker_id, f"Worker berjalan dengan {concurrency} slot, backend {checker.name}, antrean {queue_file}.")
+    try:
+        await asyncio.gather(*(
+            _slot(queue, checker, worker_id, lease_seconds, poll_seconds, stopping) for _ in range(concurrency)
+        ))
+    finally:
+        log_message(worker_id, "Worker berhenti.")
+        await checker.aclose()
+        await asyncio.to_thread(pool.shutdown)
+        queue.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker pengecekan domain untuk CHECK_MODE=queue.")
+    parser.add_argument("--id", default=f"{socket.gethostname()}-{os.getpid()}", help="Nama worker di log dan antrean")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Jumlah pengecekan bersamaan")
+    parser.add_argument("--queue-file", default=JOB_QUEUE_FILE, help="File SQLite antrean bersama")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Port endpoint /metrics worker (0 = mati)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, METRICS_HOST)
+    try:
+        asyncio.run(run_worker(args.id, max(1, args.concurrency), args.queue_file, JOB_LEASE_SECONDS, JOB_POLL_SECONDS))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul bot di src/ saling mengimpor sebagai skrip (import config, import checker, ...)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
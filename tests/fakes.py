@@ -0,0 +1,86 @@
+"""Server HTTP lokal dan pengganti Selenium yang dipakai bersama oleh beberapa file tes."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def serve(handler):
+    """Menjalankan handler di port acak 127.0.0.1. Mengembalikan (server, url); panggil server.shutdown() setelahnya."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def json_endpoint(respond, received=None):
+    """
+    Handler POST yang menjawab dengan respond(body_json) -> (status_code, payload).
+    Body setiap request dicatat di list received jika diberikan.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            if received is not None:
+                received.append((self.path, body))
+            status_code, payload = respond(body)
+            data = json.dumps(payload).encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+# --- Pengganti Selenium ---
+
+class FakeElement:
+    def send_keys(self, text):
+        pass
+
+    def click(self):
+        pass
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+class FakeDriver:
+    """Driver Selenium palsu: form selalu siap, halaman hasil berisi baris rows (list sel per baris)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def find_element(self, by, value):
+        return FakeElement()
+
+    def find_elements(self, by, value):
+        return []
+
+    def execute_script(self, script, *args):
+        return len(self.rows) if script.endswith(".length;") else self.rows
+
+class FakeSession:
+    session_id = 1
+    uses = 1
+
+    def __init__(self, driver):
+        self.driver = driver
+
+class FakePool:
+    """Pengganti ChromePool untuk SeleniumChecker; mencatat argumen broken setiap release()."""
+
+    url = "http://nawala.test"
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.released = []
+
+    def acquire(self):
+        return FakeSession(FakeDriver(self.rows))
+
+    def release(self, session, broken=False):
+        self.released.append(broken)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from adaptive import select_due_domains
+from history import StatusHistory
+from results import DomainResult
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+SETTINGS = dict(base_interval=3600, min_interval=900, max_interval=86400, recent_window=6 * 3600, backoff_factor=4)
+
+def _record(history, when, **statuses):
+    history.record({
+        domain: DomainResult.from_status(domain, status, when) for domain, status in statuses.items()
+    })
+
+def _due_minutes(history, domains, critical=(), minutes=(15, 30, 60, 120, 300)):
+    """Menit-menit (sejak START) di mana domain pertama dianggap jatuh tempo."""
+    return [m for m in minutes if domains[0] in select_due_domains(
+        domains, set(critical), history, now=START + timedelta(minutes=m), **SETTINGS
+    )]
+
+def test_new_stable_domain_is_checked_at_base_interval(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    _record(history, START, **{"a.com": "Not Blocked"})
+    assert history.domains["a.com"]["changed_at"] is None
+    assert _due_minutes(history, ["a.com"]) == [60, 120, 300]
+
+def test_unchecked_domain_is_always_due(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    assert select_due_domains(["baru.com"], set(), history, now=START, **SETTINGS) == ["baru.com"]
+
+def test_changed_domain_is_checked_at_min_interval(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    _record(history, START - timedelta(days=2), **{"a.com": "Not Blocked"})
+    _record(history, START, **{"a.com": "Blocked"})
+    assert history.changed_at("a.com") == START
+    assert _due_minutes(history, ["a.com"]) == [15, 30, 60, 120, 300]
+
+def test_stable_domain_backs_off_and_critical_stays_fast(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    # Pertama dicek 2 hari lalu dan tidak pernah berubah: interval (stabil sejak first_seen) / 4,
+    # jatuh tempo sekitar 16 jam setelah pengecekan terakhir
+    _record(history, START - timedelta(days=2), **{"a.com": "Not Blocked", "b.com": "Not Blocked"})
+    _record(history, START, **{"a.com": "Not Blocked", "b.com": "Not Blocked"})
+    assert _due_minutes(history, ["a.com"], minutes=(60, 300, 900, 960)) == [960]
+    assert _due_minutes(history, ["b.com"], critical=["b.com"]) == [15, 30, 60, 120, 300]
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from batch_scheduler import BatchScheduler, chunk_domains
+
+def _scheduler(jitter_seconds=600, interval=3600):
+    async def noop(*args, **kwargs):
+        return None
+    return BatchScheduler(
+        run_check=noop, load_domains=lambda chat_id: [], deliver=noop, deliver_error=noop, on_empty=noop,
+        interval=interval, window_seconds=60, batch_size=100, jitter_seconds=jitter_seconds,
+    )
+
+def test_new_chat_waits_a_full_interval_plus_jitter():
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    for chat_id in range(50):
+        scheduler = _scheduler()
+        scheduler.add_chat(chat_id, "u", start_time=now, now=now)
+        delay = (scheduler.next_due(chat_id) - now).total_seconds()
+        assert 3600 <= delay <= 3600 + 600
+
+def test_new_chat_without_jitter_waits_exactly_one_interval():
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    scheduler = _scheduler(jitter_seconds=0)
+    scheduler.add_chat(1, "u", start_time=now, now=now)
+    assert scheduler.next_due(1) == now + timedelta(seconds=3600)
+
+def test_restart_keeps_schedule_phase():
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    scheduler = _scheduler(jitter_seconds=0)
+    scheduler.add_chat(1, "u", start_time=start, now=start + timedelta(hours=5, minutes=10))
+    assert scheduler.next_due(1) == start + timedelta(hours=6)
+
+def test_chunk_domains():
+    assert chunk_domains(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
@@ -0,0 +1,78 @@
+import time
+from selenium.common.exceptions import WebDriverException
+from browser_pool import BrowserSession, ChromePool
+
+URL = "http://nawala.test/"
+
+class FakeDriver:
+    """Driver palsu: get() lambat seperti memuat halaman sungguhan."""
+
+    def __init__(self, load_seconds=0.0, fail_reload=False):
+        self.load_seconds = load_seconds
+        self.fail_reload = fail_reload
+        self.current_url = URL
+        self.loads = 0
+        self.quit_called = False
+
+    def get(self, url):
+        time.sleep(self.load_seconds)
+        if self.fail_reload:
+            raise WebDriverException("halaman gagal dimuat")
+        self.loads += 1
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+    def quit(self):
+        self.quit_called = True
+
+class FakePool(ChromePool):
+    def __init__(self, driver_factory, **kwargs):
+        super().__init__(URL, "chromedriver", **kwargs)
+        self.driver_factory = driver_factory
+        self.drivers = []
+
+    def _create_session(self):
+        driver = self.driver_factory()
+        self.drivers.append(driver)
+        return BrowserSession(driver, len(self.drivers))
+
+def test_release_does_not_wait_for_page_reload():
+    pool = FakePool(lambda: FakeDriver(load_seconds=0.5), size=1)
+    session = pool.acquire()
+    started = time.monotonic()
+    pool.release(session)
+    assert time.monotonic() - started < 0.2
+    # Sesi baru bisa dipinjam lagi setelah reload selesai, dan tetap sesi yang sama
+    assert pool.acquire(timeout=5) is session
+    assert session.driver.loads == 1
+    pool.release(session)
+    pool.shutdown()
+
+def test_session_failing_reload_is_replaced():
+    pool = FakePool(lambda: FakeDriver(fail_reload=True), size=1)
+    session = pool.acquire()
+    pool.release(session)
+    replacement = pool.acquire(timeout=5)
+    assert replacement is not session
+    assert session.driver.quit_called
+    assert pool.active == 1
+    pool.shutdown()
+
+def test_shutdown_closes_sessions_still_reloading():
+    pool = FakePool(lambda: FakeDriver(load_seconds=0.3), size=1)
+    session = pool.acquire()
+    pool.release(session)
+    pool.shutdown()
+    assert session.driver.quit_called
+    assert pool.active == 0
+    assert pool.idle == 0
+
+def test_worn_out_session_is_closed_immediately():
+    pool = FakePool(lambda: FakeDriver(), size=1, max_uses=1)
+    session = pool.acquire()
+    pool.release(session)
+    assert session.driver.quit_called
+    assert session.driver.loads == 0
+    assert pool.active == 0
+    pool.shutdown()
@@ -0,0 +1,85 @@
+import asyncio
+from check_queue import CheckQueue, PRIORITY_AUTOMATIC, PRIORITY_MANUAL
+from results import DomainResult
+
+class NotRetryable(Exception):
+    retryable = False
+
+def _results(domains):
+    return {d: DomainResult.from_status(d, "Not Blocked") for d in domains}, None
+
+def test_manual_checks_run_before_queued_automatic_checks():
+    order = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def run_check(domains, label, screenshot, priority):
+            order.append(label)
+            await gate.wait()
+            return _results(domains)
+
+        queue = CheckQueue(run_check, workers=1)
+        queue.start()
+        first = asyncio.create_task(queue.submit(["a.com"], "otomatis-1", PRIORITY_AUTOMATIC))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(queue.submit(["b.com"], "otomatis-2", PRIORITY_AUTOMATIC))
+        manual = asyncio.create_task(queue.submit(["c.com"], "manual", PRIORITY_MANUAL, chat_ids=[7]))
+        await asyncio.sleep(0.01)
+        assert queue.running == 1
+        assert queue.depth == 2
+        assert queue.position(7)[:2] == ("antre", 1)
+        gate.set()
+        await asyncio.gather(first, second, manual)
+        await queue.stop()
+
+    asyncio.run(run())
+    assert order == ["otomatis-1", "manual", "otomatis-2"]
+
+def _sharded(run_check, domains, **kwargs):
+    async def run():
+        queue = CheckQueue(run_check, workers=2)
+        queue.start()
+        try:
+            return await queue.submit_sharded(domains, "tes", shard_size=2, **kwargs)
+        finally:
+            await queue.stop()
+    return asyncio.run(run())
+
+def test_failed_shard_is_retried_without_rerunning_other_shards():
+    calls = []
+
+    async def run_check(domains, label, screenshot, priority):
+        calls.append(tuple(domains))
+        if domains == ["c.com", "d.com"] and calls.count(("c.com", "d.com")) == 1:
+            raise TimeoutError("shard lambat")
+        return _results(domains)
+
+    results, shots, errors = _sharded(run_check, ["a.com", "b.com", "c.com", "d.com", "e.com"], retries=1)
+    assert list(results) == ["a.com", "b.com", "c.com", "d.com", "e.com"]
+    assert errors == {}
+    assert shots == []
+    assert sorted(calls) == [("a.com", "b.com"), ("c.com", "d.com"), ("c.com", "d.com"), ("e.com",)]
+
+def test_shard_failing_every_attempt_is_reported_per_domain():
+    async def run_check(domains, label, screenshot, priority):
+        if "c.com" in domains:
+            raise TimeoutError("shard lambat")
+        return _results(domains)
+
+    results, _, errors = _sharded(run_check, ["a.com", "b.com", "c.com"], retries=2)
+    assert list(results) == ["a.com", "b.com"]
+    assert list(errors) == ["c.com"]
+    assert isinstance(errors["c.com"], TimeoutError)
+
+def test_non_retryable_error_is_not_retried():
+    calls = []
+
+    async def run_check(domains, label, screenshot, priority):
+        calls.append(tuple(domains))
+        raise NotRetryable("circuit breaker terbuka")
+
+    results, _, errors = _sharded(run_check, ["a.com", "b.com", "c.com"], retries=3)
+    assert results == {}
+    assert len(calls) == 2
+    assert set(errors) == {"a.com", "b.com", "c.com"}
@@ -0,0 +1,32 @@
+import pytest
+from checker import CheckerBackend, extract_results
+
+class FakeDriver:
+    """Pengganti driver Selenium: execute_script mengembalikan sel-sel baris hasil."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_script(self, script, *args):
+        return self.rows
+
+def test_extract_results_matches_domain_cell_exactly():
+    driver = FakeDriver([["abc.com", "Blocked"], ["bc.com", "Not Blocked"]])
+    results = extract_results(driver, "tr", ["bc.com", "abc.com"])
+    assert results["bc.com"].blocked is False
+    assert results["bc.com"].status == "Not Blocked"
+    assert results["abc.com"].blocked is True
+    assert results["abc.com"].status == "Blocked"
+
+def test_extract_results_normalizes_cells_and_reports_missing_domains():
+    driver = FakeDriver([["1", "HTTPS://Example.com/", "Blocked"]])
+    results = extract_results(driver, "tr", ["example.com", "missing.com"])
+    assert results["example.com"].blocked is True
+    assert results["missing.com"].status is None
+
+def test_backend_without_check_fails_on_construction():
+    class Incomplete(CheckerBackend):
+        name = "belum-selesai"
+
+    with pytest.raises(TypeError):
+        Incomplete()
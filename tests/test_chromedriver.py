@@ -0,0 +1,180 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import stat
+import zipfile
+from http.server import BaseHTTPRequestHandler
+import pytest
+import requests
+import chromedriver
+from chromedriver import DriverError
+from fakes import serve
+
+DRIVER_VERSION = "126.0.6478.126"
+ETAG = '"manifest-v1"'
+
+def _script(path, output):
+    """Program palsu yang hanya mencetak output untuk --version."""
+    path.write_text(f"#!/bin/sh\necho '{output}'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+def _driver_zip(version=DRIVER_VERSION):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("chromedriver-linux64/chromedriver", f"#!/bin/sh\necho 'ChromeDriver {version} (abc)'\n")
+    return buffer.getvalue()
+
+class StandIn:
+    """Replika lokal storage Chrome for Testing: daftar versi (dengan ETag) dan arsip driver."""
+
+    def __init__(self):
+        self.requests = []
+        self.archive = _driver_zip()
+        self.archive_headers = {}
+        self.server, self.url = serve(self._handler())
+        self.manifest_url = f"{self.url}/manifest.json"
+
+    def manifest(self):
+        return {"milestones": {"126": {"version": DRIVER_VERSION, "downloads": {"chromedriver": [
+            {"platform": chromedriver.platform_name(), "url": f"{self.url}/chromedriver.zip"},
+        ]}}}}
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests.append((self.path, self.headers.get("If-None-Match")))
+                if self.path == "/manifest.json":
+                    if self.headers.get("If-None-Match") == ETAG:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    body = json.dumps(stand_in.manifest()).encode()
+                    headers = {"ETag": ETAG, "Content-Length": str(len(body))}
+                else:
+                    body = stand_in.archive
+                    headers = {"Content-Length": str(len(body)), **stand_in.archive_headers}
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+@pytest.fixture
+def stand_in():
+    stand_in = StandIn()
+    yield stand_in
+    stand_in.server.shutdown()
+
+@pytest.fixture
+def driver_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "driver"
+    folder.mkdir()
+    save_path = str(folder / "chromedriver")
+    monkeypatch.setattr(chromedriver, "SAVE_PATH", save_path)
+    monkeypatch.setattr(chromedriver, "STATE_PATH", save_path + ".json")
+    monkeypatch.setattr(chromedriver, "MANIFEST_CACHE_PATH", str(folder / "chromedriver-manifest.json"))
+    return folder
+
+@pytest.fixture
+def chrome(tmp_path):
+    return _script(tmp_path / "chrome", "Google Chrome 126.0.6478.55")
+
+def test_installs_driver_and_records_state(stand_in, driver_dir, chrome):
+    assert chromedriver.ensure_chromedriver(chrome, manifest_url=stand_in.manifest_url)
+    assert stand_in.paths() == ["/manifest.json", "/chromedriver.zip"]
+    assert chromedriver.installed_driver_matches("126.0.6478.55", chromedriver.platform_name())
+    assert json.loads((driver_dir / "chromedriver.json").read_text())["driver_version"] == DRIVER_VERSION
+
+def test_matching_driver_needs_no_network(stand_in, driver_dir, chrome, monkeypatch):
+    assert chromedriver.ensure_chromedriver(chrome, manifest_url=stand_in.manifest_url)
+    stand_in.requests.clear()
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("Tidak boleh ada akses jaringan jika driver sudah cocok.")
+
+    monkeypatch.setattr(chromedriver.requests, "Session", no_network)
+    assert chromedriver.ensure_chromedriver(chrome, manifest_url=stand_in.manifest_url)
+    assert stand_in.requests == []
+
+def test_changed_driver_file_is_downloaded_again(stand_in, driver_dir, chrome):
+    assert chromedriver.ensure_chromedriver(chrome, manifest_url=stand_in.manifest_url)
+    with open(chromedriver.SAVE_PATH, "a") as f:
+        f.write("# diubah\n")
+    assert not chromedriver.installed_driver_matches("126.0.6478.55", chromedriver.platform_name())
+
+def test_manifest_304_reuses_cache(stand_in, driver_dir):
+    with requests.Session() as session:
+        first = chromedriver.fetch_manifest(session, stand_in.manifest_url)
+        second = chromedriver.fetch_manifest(session, stand_in.manifest_url)
+    assert first == second == stand_in.manifest()
+    assert [etag for _, etag in stand_in.requests] == [None, ETAG]
+
+def test_cached_manifest_used_when_network_fails(stand_in, driver_dir):
+    with requests.Session() as session:
+        manifest = chromedriver.fetch_manifest(session, stand_in.manifest_url)
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+    with requests.Session() as session:
+        assert chromedriver.fetch_manifest(session, stand_in.manifest_url) == manifest
+
+def test_manifest_without_cache_or_network_raises(driver_dir):
+    server, url = serve(BaseHTTPRequestHandler)
+    server.shutdown()
+    server.server_close()
+    with requests.Session() as session, pytest.raises(DriverError):
+        chromedriver.fetch_manifest(session, f"{url}/manifest.json")
+
+def _install(stand_in):
+    with requests.Session() as session:
+        chromedriver.download_and_extract_chromedriver(
+            session, DRIVER_VERSION, f"{stand_in.url}/chromedriver.zip", chromedriver.platform_name()
+        )
+
+@pytest.mark.parametrize("archive, headers", [
+    # MD5 dari x-goog-hash tidak cocok dengan isi arsip
+    (_driver_zip(), {"x-goog-hash": "crc32c=AAAAAA==,md5=" + base64.b64encode(hashlib.md5(b"lain").digest()).decode()}),
+    # Nilai md5 bukan base64 yang valid
+    (_driver_zip(), {"x-goog-hash": "md5=bukan-base64!"}),
+    # Arsip terpotong, tetapi ukurannya sesuai Content-Length
+    (_driver_zip()[:-40], {}),
+], ids=["md5-salah", "md5-tidak-valid", "zip-terpotong"])
+def test_broken_archive_is_rejected(stand_in, driver_dir, archive, headers):
+    stand_in.archive = archive
+    stand_in.archive_headers = headers
+    with pytest.raises(DriverError):
+        _install(stand_in)
+    assert os.listdir(driver_dir) == []
+
+def test_truncated_download_is_rejected(stand_in, driver_dir):
+    # Server mengumumkan Content-Length lebih besar dari yang benar-benar dikirim
+    stand_in.archive_headers = {"Content-Length": str(len(stand_in.archive) + 100)}
+    with pytest.raises(DriverError):
+        _install(stand_in)
+    assert os.listdir(driver_dir) == []
+
+def test_valid_md5_is_accepted(stand_in, driver_dir):
+    digest = base64.b64encode(hashlib.md5(stand_in.archive).digest()).decode()
+    stand_in.archive_headers = {"x-goog-hash": f"crc32c=AAAAAA==,md5={digest}"}
+    _install(stand_in)
+    assert os.path.exists(chromedriver.SAVE_PATH)
+
+def test_wrong_driver_version_keeps_old_driver(stand_in, driver_dir):
+    old_driver = driver_dir / "chromedriver"
+    old_driver.write_text("lama")
+    stand_in.archive = _driver_zip("125.0.6422.141")
+    with pytest.raises(DriverError):
+        _install(stand_in)
+    assert old_driver.read_text() == "lama"
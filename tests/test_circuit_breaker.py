@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from selenium.common.exceptions import TimeoutException
+from checker import CheckerBackend, SeleniumChecker
+from circuit_breaker import CircuitBreaker, CircuitBreakerChecker, CircuitOpenError, CLOSED, OPEN
+from results import DomainResult
+from fakes import FakePool
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class StubBackend(CheckerBackend):
+    name = "stub"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        self.calls += 1
+        if self.fail:
+            raise TimeoutException("situs lambat")
+        return {d: DomainResult.from_status(d, "Blocked") for d in domain_names_list}, None
+
+def _check(checker):
+    return asyncio.run(checker.check(["a.com"], "tes"))
+
+def _selenium_checker(rows):
+    return SeleniumChecker(FakePool(rows), max_workers=1, row_selector="tr", result_timeout=0.1)
+
+def test_breaker_opens_after_failure_ratio_and_rejects_without_calling_backend():
+    backend = StubBackend(fail=True)
+    breaker = CircuitBreaker(failure_ratio=0.5, min_calls=2, cooldown=30, clock=FakeClock())
+    checker = CircuitBreakerChecker(backend, breaker)
+    for _ in range(2):
+        with pytest.raises(TimeoutException):
+            _check(checker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        _check(checker)
+    assert backend.calls == 2
+
+def test_half_open_probe_closes_or_doubles_cooldown():
+    clock = FakeClock()
+    backend = StubBackend(fail=True)
+    breaker = CircuitBreaker(min_calls=1, cooldown=30, max_cooldown=45, clock=clock)
+    checker = CircuitBreakerChecker(backend, breaker)
+    with pytest.raises(TimeoutException):
+        _check(checker)
+
+    clock.now += 30
+    with pytest.raises(TimeoutException):
+        _check(checker)
+    assert breaker.state == OPEN
+    assert breaker.cooldown == 45
+
+    clock.now += 45
+    backend.fail = False
+    results, _ = _check(checker)
+    assert results["a.com"].blocked is True
+    assert breaker.state == CLOSED
+    assert breaker.cooldown == 30
+
+def test_selenium_check_without_any_result_is_a_failure():
+    checker = _selenium_checker([])
+    try:
+        with pytest.raises(TimeoutException):
+            _check(checker)
+    finally:
+        asyncio.run(checker.aclose())
+    # Browser sendiri masih sehat, sesi tidak dibuang
+    assert checker.pool.released == [False]
+
+def test_breaker_counts_empty_selenium_results_as_failures():
+    breaker = CircuitBreaker(min_calls=2, clock=FakeClock())
+    checker = CircuitBreakerChecker(_selenium_checker([]), breaker)
+    try:
+        for _ in range(2):
+            with pytest.raises(TimeoutException):
+                _check(checker)
+    finally:
+        asyncio.run(checker.aclose())
+    assert breaker.state == OPEN
+
+def test_selenium_partial_results_still_succeed():
+    checker = _selenium_checker([["a.com", "Blocked"]])
+    try:
+        results, _ = asyncio.run(checker.check(["a.com", "b.com"], "tes"))
+    finally:
+        asyncio.run(checker.aclose())
+    assert results["a.com"].blocked is True
+    assert results["b.com"].status is None
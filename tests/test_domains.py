@@ -0,0 +1,41 @@
+import io
+import pytest
+from domains import normalize_domain, parse_domain_lines
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Example.COM", "example.com"),
+    ("https://www.example.com/path?q=1#x", "www.example.com"),
+    ("user@example.com:8080", "example.com"),
+    ("example.com.", "example.com"),
+    ("'example.com'", "example.com"),
+    ("bücher.de", "xn--bcher-kva.de"),
+])
+def test_normalize_domain_accepts_and_cleans(raw, expected):
+    assert normalize_domain(raw) == expected
+
+@pytest.mark.parametrize("raw", [
+    "",
+    "localhost",
+    "192.168.1.1",
+    "-awal.com",
+    "akhir-.com",
+    "garis_bawah.com",
+    "a" * 64 + ".com",
+    ("a" * 60 + ".") * 5 + "com",
+])
+def test_normalize_domain_rejects_invalid_input(raw):
+    assert normalize_domain(raw) is None
+
+def test_parse_domain_lines_reads_csv_and_text():
+    content = io.StringIO(
+        "domain,catatan\n"
+        "example.com,utama\n"
+        "# komentar example.org\n"
+        "https://EXAMPLE.com/ lain.net\n"
+        "\n"
+        "bukan_domain, 10.0.0.1\n"
+    )
+    domains, invalid = parse_domain_lines(content)
+    assert domains == ["example.com", "lain.net"]
+    # "domain", "catatan", "utama", "bukan_domain" dan "10.0.0.1" tidak valid
+    assert invalid == 5
@@ -0,0 +1,24 @@
+from history import StatusHistory
+from results import DomainResult
+
+def _results(**statuses):
+    return {domain: DomainResult.from_status(domain, status) for domain, status in statuses.items()}
+
+def test_changes_are_not_marked_until_notified(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    results = _results(**{"a.com": "Blocked", "b.com": "Not Blocked"})
+
+    changes = history.changes_for_chat(1, results)
+    assert [(r.domain, previous) for r, previous in changes] == [("a.com", None), ("b.com", None)]
+    # Pengiriman gagal: perubahan yang sama tetap muncul lagi di putaran berikutnya
+    assert len(history.changes_for_chat(1, results)) == 2
+
+    history.mark_notified(1, changes)
+    assert history.changes_for_chat(1, results) == []
+
+def test_changes_report_previous_notified_state(tmp_path):
+    history = StatusHistory(str(tmp_path / "history.json"))
+    history.mark_notified(1, history.changes_for_chat(1, _results(**{"a.com": "Not Blocked"})))
+
+    changes = history.changes_for_chat(1, _results(**{"a.com": "Blocked", "c.com": None}))
+    assert [(r.domain, r.blocked, previous) for r, previous in changes] == [("a.com", True, False)]
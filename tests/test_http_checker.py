@@ -0,0 +1,133 @@
+import asyncio
+import httpx
+import pytest
+from selenium.common.exceptions import TimeoutException
+from checker import CheckerBackend, FallbackChecker, SeleniumChecker
+from http_checker import HttpChecker, parse_http_results
+from results import DomainResult
+from fakes import FakePool, json_endpoint, serve
+
+@pytest.fixture
+def endpoint():
+    """Endpoint /api/check lokal; tes mengatur jawabannya lewat endpoint.respond."""
+    class Endpoint:
+        def __init__(self):
+            self.received = []
+
+        def respond(self, body):
+            return 200, {"results": [{"domain": d, "status": "Not Blocked"} for d in body["domains"]]}
+
+    stand_in = Endpoint()
+    server, url = serve(json_endpoint(lambda body: stand_in.respond(body), stand_in.received))
+    stand_in.url = f"{url}/api/check"
+    yield stand_in
+    server.shutdown()
+
+class RecordingBackend(CheckerBackend):
+    """Backend cadangan palsu yang mencatat domain yang dicek."""
+
+    name = "palsu"
+
+    def __init__(self):
+        self.calls = []
+
+    async def check(self, domain_names_list, username, screenshot=False, priority=None):
+        self.calls.append(list(domain_names_list))
+        return {d: DomainResult.from_status(d, "Not Blocked") for d in domain_names_list}, None
+
+async def _check(checker, domains, screenshot=False):
+    try:
+        return await checker.check(domains, "tes", screenshot=screenshot)
+    finally:
+        await checker.aclose()
+
+# --- parse_http_results ---
+
+def test_parse_http_results_accepts_wrapped_and_plain_lists():
+    wrapped = parse_http_results({"results": [{"domain": "A.com", "status": "Blocked"}]}, ["a.com"])
+    plain = parse_http_results([{"domain": "a.com", "blocked": False}], ["a.com"])
+    data = parse_http_results({"data": [{"domain": "a.com", "status": "Not Blocked"}]}, ["a.com"])
+    assert wrapped["a.com"].blocked is True
+    assert plain["a.com"].blocked is False
+    assert plain["a.com"].status == "Not Blocked"
+    assert data["a.com"].blocked is False
+
+def test_parse_http_results_fills_missing_domains_and_skips_bad_items():
+    results = parse_http_results({"results": ["x", {"status": "Blocked"}, {"domain": "a.com", "status": "Blocked"}]},
+                                 ["a.com", "b.com"])
+    assert results["a.com"].found
+    assert not results["b.com"].found
+
+def test_parse_http_results_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        parse_http_results("bukan json list", ["a.com"])
+
+# --- HttpChecker ---
+
+def test_http_checker_posts_domains_and_reads_results(endpoint):
+    # Jawaban memakai bentuk lain dari kontrak: dibungkus "data", blokir sebagai boolean, huruf besar
+    endpoint.respond = lambda body: (200, {"data": [
+        {"domain": d.upper(), "blocked": d.startswith("satu")} for d in body["domains"]
+    ]})
+    domains = ["satu.example.com", "dua.example.com"]
+    results, shot = asyncio.run(_check(HttpChecker(endpoint.url, timeout=5), domains))
+    assert endpoint.received == [("/api/check", {"domains": domains})]
+    assert shot is None
+    assert list(results) == domains
+    assert results["satu.example.com"].blocked is True
+    assert results["satu.example.com"].status == "Blocked"
+    assert results["dua.example.com"].blocked is False
+
+def test_http_checker_raises_on_http_error(endpoint):
+    endpoint.respond = lambda body: (500, {"error": "down"})
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(_check(HttpChecker(endpoint.url, timeout=5), ["a.com"]))
+
+def test_http_checker_raises_when_no_domain_found(endpoint):
+    endpoint.respond = lambda body: (200, {"results": []})
+    with pytest.raises(ValueError):
+        asyncio.run(_check(HttpChecker(endpoint.url, timeout=5), ["a.com"]))
+
+# --- FallbackChecker ---
+
+@pytest.mark.parametrize("status_code, payload", [(503, {"error": "down"}), (200, {"results": []})])
+def test_fallback_checker_switches_backend(endpoint, status_code, payload):
+    endpoint.respond = lambda body: (status_code, payload)
+    fallback = RecordingBackend()
+    checker = FallbackChecker(HttpChecker(endpoint.url, timeout=5), fallback)
+    results, _ = asyncio.run(_check(checker, ["a.com", "b.com"]))
+    assert fallback.calls == [["a.com", "b.com"]]
+    assert results["a.com"].blocked is False
+
+def test_fallback_checker_uses_selenium_when_http_fails(endpoint):
+    endpoint.respond = lambda body: (502, {"error": "bad gateway"})
+    pool = FakePool([["a.com", "Blocked"], ["b.com", "Not Blocked"]])
+    selenium = SeleniumChecker(pool, max_workers=1, row_selector="tr", result_timeout=0.1)
+    checker = FallbackChecker(HttpChecker(endpoint.url, timeout=5), selenium)
+    results, _ = asyncio.run(_check(checker, ["a.com", "b.com"]))
+    assert len(endpoint.received) == 1
+    assert pool.released == [False]
+    assert results["a.com"].blocked is True
+    assert results["b.com"].blocked is False
+
+def test_fallback_checker_reports_selenium_failure_after_http_failure(endpoint):
+    endpoint.respond = lambda body: (502, {"error": "bad gateway"})
+    selenium = SeleniumChecker(FakePool([]), max_workers=1, row_selector="tr", result_timeout=0.1)
+    checker = FallbackChecker(HttpChecker(endpoint.url, timeout=5), selenium)
+    with pytest.raises(TimeoutException):
+        asyncio.run(_check(checker, ["a.com"]))
+
+def test_fallback_checker_keeps_primary_result(endpoint):
+    fallback = RecordingBackend()
+    checker = FallbackChecker(HttpChecker(endpoint.url, timeout=5), fallback)
+    results, _ = asyncio.run(_check(checker, ["a.com"]))
+    assert fallback.calls == []
+    assert results["a.com"].status == "Not Blocked"
+
+def test_fallback_checker_uses_fallback_for_screenshots(endpoint):
+    fallback = RecordingBackend()
+    fallback.supports_screenshot = True
+    checker = FallbackChecker(HttpChecker(endpoint.url, timeout=5), fallback)
+    asyncio.run(_check(checker, ["a.com"], screenshot=True))
+    assert fallback.calls == [["a.com"]]
+    assert endpoint.received == []
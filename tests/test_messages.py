@@ -0,0 +1,15 @@
+from messages import split_message, TELEGRAM_MESSAGE_LIMIT
+
+def test_short_message_is_not_split():
+    assert split_message("Hasil:\n\n1. a.com — Tidak diblokir") == ["Hasil:\n\n1. a.com — Tidak diblokir"]
+
+def test_long_message_is_split_on_line_boundaries():
+    lines = [f"{i + 1}. domain{i}.example.com — Tidak diblokir (mulai dipantau)" for i in range(500)]
+    chunks = split_message("\n".join(lines))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= TELEGRAM_MESSAGE_LIMIT for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == lines
+
+def test_overlong_single_line_is_cut():
+    chunks = split_message("x" * 10000, limit=4096)
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 1808]
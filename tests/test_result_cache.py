@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from result_cache import ResultCache
+from results import DomainResult
+
+def _result(domain, age_seconds=0, status="Not Blocked"):
+    return DomainResult.from_status(domain, status, datetime.now() - timedelta(seconds=age_seconds))
+
+def test_expired_entries_are_misses_and_dropped():
+    cache = ResultCache(ttl_seconds=60, max_entries=10)
+    cache.put(_result("baru.com", age_seconds=10))
+    cache.put(_result("lama.com", age_seconds=120))
+    cached, missing = cache.split(["BARU.com", "lama.com"])
+    assert list(cached) == ["BARU.com"]
+    assert missing == ["lama.com"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(ttl_seconds=60, max_entries=2)
+    cache.put(_result("a.com"))
+    cache.put(_result("b.com"))
+    assert cache.get("a.com") is not None
+    cache.put(_result("c.com"))
+    assert cache.get("b.com") is None
+    assert cache.get("a.com") is not None
+    assert cache.get("c.com") is not None
+
+def test_not_found_results_are_not_cached():
+    cache = ResultCache(ttl_seconds=60, max_entries=10)
+    cache.put(DomainResult.from_status("hilang.com", None))
+    assert cache.stats()["entries"] == 0
+
+def test_save_and_load_keep_only_fresh_entries(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ResultCache(ttl_seconds=60, max_entries=10, path=path)
+    cache.put(_result("segar.com", age_seconds=5, status="Blocked"))
+    cache.put(_result("hampir.com", age_seconds=59))
+    cache.save()
+
+    loaded = ResultCache(ttl_seconds=30, max_entries=10, path=path)
+    loaded.load()
+    assert loaded.get("segar.com").blocked is True
+    assert loaded.get("hampir.com") is None
+
+def test_load_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{bukan json")
+    cache = ResultCache(ttl_seconds=60, max_entries=10, path=str(path))
+    cache.load()
+    assert cache.stats()["entries"] == 0
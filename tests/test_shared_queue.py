@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from results import DomainResult
+from shared_queue import SharedJobQueue, QueueChecker, RemoteCheckError
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SharedJobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    queue.close()
+
+def test_claim_takes_lowest_priority_first(queue):
+    queue.enqueue(["a.com"], "auto", priority=2)
+    manual = queue.enqueue(["b.com"], "manual", priority=0)
+    job = queue.claim("w1", lease_seconds=60)
+    assert job["id"] == manual
+    assert job["attempt"] == 1
+    assert job["domains"] == ["b.com"]
+
+def test_fail_does_not_requeue(queue):
+    job_id = queue.enqueue(["a.com"], "tes", priority=1, max_attempts=3)
+    job = queue.claim("w1", lease_seconds=60)
+    queue.fail(job["id"], "w1", RuntimeError("situs error"))
+    assert queue.claim("w2", lease_seconds=60) is None
+    status, *_, error_type, error = queue.get_finished(job_id)
+    assert (status, error_type, error) == ("failed", "RuntimeError", "situs error")
+
+def test_expired_lease_is_retried_until_max_attempts(queue):
+    job_id = queue.enqueue(["a.com"], "tes", priority=1, max_attempts=2)
+    assert queue.claim("w1", lease_seconds=-1)["attempt"] == 1
+    # Worker pertama "mati": lease habis, pekerjaan diambil worker lain
+    retried = queue.claim("w2", lease_seconds=-1)
+    assert retried["id"] == job_id
+    assert retried["attempt"] == 2
+    assert queue.claim("w3", lease_seconds=60) is None
+    status, *_, error_type, _ = queue.get_finished(job_id)
+    assert (status, error_type) == ("failed", "WorkerLost")
+
+def test_lost_worker_cannot_complete_job_taken_over(queue):
+    queue.enqueue(["a.com"], "tes", priority=1)
+    job = queue.claim("w1", lease_seconds=-1)
+    queue.claim("w2", lease_seconds=60)
+    assert not queue.extend_lease(job["id"], "w1", 60)
+    queue.complete(job["id"], "w1", {"a.com": DomainResult.from_status("a.com", "Blocked")})
+    assert queue.get_finished(job["id"]) is None
+
+async def _fake_worker(queue, worker_id, error=None):
+    """Worker palsu: mengambil satu pekerjaan lalu menyelesaikan atau menggagalkannya."""
+    while True:
+        job = await asyncio.to_thread(queue.claim, worker_id, 60)
+        if job is not None:
+            break
+        await asyncio.sleep(0.01)
+    if error is not None:
+        queue.fail(job["id"], worker_id, error)
+    else:
+        queue.complete(job["id"], worker_id, {d: DomainResult.from_status(d, "Blocked") for d in job["domains"]})
+
+def test_queue_checker_round_trip(queue):
+    checker = QueueChecker(queue, poll_seconds=0.01, wait_timeout=5)
+
+    async def run():
+        results, _ = await asyncio.gather(checker.check(["a.com", "b.com"], "tes"), _fake_worker(queue, "w1"))
+        return results[0]
+
+    results = asyncio.run(run())
+    assert [r.blocked for r in results.values()] == [True, True]
+    assert queue.counts() == {}
+
+def test_queue_checker_reraises_worker_error(queue):
+    checker = QueueChecker(queue, poll_seconds=0.01, wait_timeout=5)
+
+    async def run():
+        await asyncio.gather(checker.check(["a.com"], "tes"), _fake_worker(queue, "w1", ValueError("rusak")))
+
+    with pytest.raises(RemoteCheckError):
+        asyncio.run(run())
+
+def test_queue_checker_times_out_and_cancels_pending_job(queue):
+    checker = QueueChecker(queue, poll_seconds=0.01, wait_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        asyncio.run(checker.check(["a.com"], "tes"))
+    assert queue.counts() == {}
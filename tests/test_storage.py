@@ -0,0 +1,56 @@
+from datetime import datetime
+from storage import DomainStore, migrate_from_files
+
+def test_interval_survives_schedule_deletion(tmp_path):
+    store = DomainStore(str(tmp_path / "bot.db"))
+    store.add_domains(1, "u", ["a.com"])
+    store.save_schedule(1, "u", datetime(2026, 1, 1, 12, 0))
+    store.set_interval(1, "u", 1800, adaptive=True)
+
+    store.delete_schedule(1)
+    assert store.load_schedule(1) is None
+    assert store.get_interval(1) == (1800, True)
+    assert store.active_chats() == [(1, "u", None, 1800, True)]
+    store.close()
+
+def test_set_interval_does_not_create_schedule(tmp_path):
+    store = DomainStore(str(tmp_path / "bot.db"))
+    store.set_interval(1, "u", None, adaptive=False)
+    assert store.load_schedule(1) is None
+    assert store.get_interval(1) == (None, False)
+    store.close()
+
+def test_critical_flag_is_part_of_subscriptions(tmp_path):
+    store = DomainStore(str(tmp_path / "bot.db"))
+    store.add_domains(1, "u", ["a.com", "b.com"])
+    assert store.set_critical(1, ["b.com", "tidak-ada.com"]) == ["b.com"]
+    assert store.get_critical(1) == ["b.com"]
+    store.set_critical(1, ["b.com"], critical=False)
+    assert store.get_critical(1) == []
+    store.close()
+
+def test_migrate_from_files_imports_domains_and_schedules_once(tmp_path):
+    data = tmp_path / "user"
+    data.mkdir()
+    (data / "domains_budi_1.txt").write_text("a.com\n\nb.com\na.com\n")
+    (data / "schedule_budi_1.json").write_text('{"start_time": "2026-01-01T12:00:00"}')
+    # Format lama tanpa username, jadwal rusak dilewati tanpa menggagalkan migrasi
+    (data / "domains_-2.txt").write_text("c.com\n")
+    (data / "schedule_-2.json").write_text("{rusak")
+    (data / "domains_tanpa_id.txt").write_text("d.com\n")
+
+    store = DomainStore(str(data / "bot.db"))
+    assert migrate_from_files(store, str(data)) == 2
+    assert store.get_domains(1) == ["a.com", "b.com"]
+    assert store.load_schedule(1) == datetime(2026, 1, 1, 12, 0)
+    assert store.get_domains(-2) == ["c.com"]
+    assert store.load_schedule(-2) is None
+    assert sorted(chat for chat, *_ in store.active_chats()) == [-2, 1]
+    assert [username for chat, username, *_ in store.active_chats() if chat == -2] == ["user_-2"]
+
+    # Migrasi hanya sekali; file lama tetap ada sebagai cadangan
+    (data / "domains_budi_1.txt").write_text("baru.com\n")
+    assert migrate_from_files(store, str(data)) == 0
+    assert store.get_domains(1) == ["a.com", "b.com"]
+    assert (data / "domains_budi_1.txt").exists()
+    store.close()